@@ -0,0 +1,149 @@
+"""
+Сравнение пропускной способности синхронного и асинхронного чтения.
+
+WSGI: синхронные эндпоинты `/api/v1/...` в пуле потоков, по одному
+тестовому клиенту на поток. ASGI: эндпоинты `/api/v1/async/...`
+через AsyncClient, конкурентность ограничена семафором.
+Данные создаются во временной тестовой базе.
+
+Запуск из корня репозитория:
+    python benchmarks/async_reads.py --requests 2000 --concurrency 50
+"""
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# common настраивает Django до импорта проекта.
+from common import test_database
+
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient, Client
+
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+URLS = (
+    '/api/v1/posts/?limit=20',
+    '/api/v1/posts/{post_id}/',
+    '/api/v1/posts/{post_id}/comments/?limit=20',
+    '/api/v1/groups/',
+)
+
+
+def seed(posts: int) -> int:
+    """
+    Создает авторов, группы, посты и комментарии.
+
+    Args:
+        posts: Количество постов
+    Returns:
+        int: Идентификатор поста с комментариями
+    """
+    authors = User.objects.bulk_create(
+        User(username=f'bench_{number}') for number in range(50)
+    )
+    groups = Group.objects.bulk_create(
+        Group(title=f'Группа {number}', slug=f'group-{number}',
+              description='Группа')
+        for number in range(10)
+    )
+    created = Post.objects.bulk_create(
+        Post(
+            author=authors[number % len(authors)],
+            group=groups[number % len(groups)],
+            text=f'Пост {number}'
+        )
+        for number in range(posts)
+    )
+    Comment.objects.bulk_create(
+        Comment(author=author, post=created[0], text='Комментарий')
+        for author in authors
+    )
+    return created[0].pk
+
+
+def run_wsgi(urls: list[str], concurrency: int) -> float:
+    """
+    Выполняет запросы к синхронным эндпоинтам в пуле потоков.
+
+    Args:
+        urls: Адреса запросов
+        concurrency: Число потоков
+    Returns:
+        float: Длительность в секундах
+    """
+    local = threading.local()
+
+    def fetch(url: str) -> int:
+        if not hasattr(local, 'client'):
+            local.client = Client()
+        return local.client.get(url).status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        statuses = list(executor.map(fetch, urls))
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, statuses
+    return elapsed
+
+
+async def run_asgi(urls: list[str], concurrency: int) -> float:
+    """
+    Выполняет запросы к асинхронным эндпоинтам в цикле событий.
+
+    Args:
+        urls: Адреса запросов
+        concurrency: Число одновременных запросов
+    Returns:
+        float: Длительность в секундах
+    """
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(url: str) -> int:
+        async with semaphore:
+            response = await client.get(
+                url.replace('/api/v1/', '/api/v1/async/', 1)
+            )
+            return response.status_code
+
+    started = time.perf_counter()
+    statuses = await asyncio.gather(*(fetch(url) for url in urls))
+    elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, statuses
+    return elapsed
+
+
+def main() -> None:
+    """Создает данные, выполняет оба прогона и печатает результат."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--posts', type=int, default=1000)
+    options = parser.parse_args()
+
+    with test_database():
+        post_id = seed(options.posts)
+        urls = [
+            URLS[number % len(URLS)].format(post_id=post_id)
+            for number in range(options.requests)
+        ]
+        results = {
+            'WSGI (потоки)': run_wsgi(urls, options.concurrency),
+            'ASGI (async ORM)': asyncio.run(
+                run_asgi(urls, options.concurrency)
+            ),
+        }
+
+    print(f'{options.requests} запросов, конкурентность '
+          f'{options.concurrency}')
+    for name, elapsed in results.items():
+        print(f'{name:<18} {elapsed:8.2f} с '
+              f'{options.requests / elapsed:10.1f} запросов/с')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Общая подготовка замеров: настройка Django и временная тестовая база.
+
+Модуль импортируется скриптами из каталога `benchmarks` до импорта
+моделей и представлений проекта.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'yatube_api'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube_api.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+
+
+@contextmanager
+def test_database(name: Optional[str] = None,
+                  keep: bool = False) -> Iterator[bool]:
+    """
+    Создает тестовую базу на время замера.
+
+    Args:
+        name: Путь к файлу базы или None для базы в памяти
+        keep: Сохранить базу после замера и использовать уже созданную
+    Yields:
+        bool: True, если база с данными уже существовала
+    """
+    existed = bool(name and keep and Path(name).exists())
+    if name:
+        connection.settings_dict['TEST']['NAME'] = str(name)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, keepdb=keep)
+    try:
+        yield existed
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=keep
+        )
+        teardown_test_environment()
+
+
+def disable_throttling() -> None:
+    """Отключает ограничение частоты записи: замер не упирается в 429."""
+    override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': {}
+    }).enable()
+
+
+def best_time(run: Callable[[], object], repeat: int) -> float:
+    """
+    Измеряет лучшее время выполнения.
+
+    Args:
+        run: Измеряемая функция
+        repeat: Число прогонов
+    Returns:
+        float: Время в секундах
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
@@ -0,0 +1,42 @@
+"""
+Воспроизводимые наборы данных для замеров.
+
+Набор задается числом постов: пользователей в 10 раз меньше, групп —
+в 1000 раз, комментариев вдвое больше, чем постов, подписок — по пять
+на пользователя в среднем. Данные создает `posts.seeding.Seeder`
+(команда `seed_data`) с фиксированным зерном, поэтому каждый запуск
+получает одни и те же строки.
+"""
+# common настраивает Django до импорта проекта.
+import common  # noqa: F401
+
+from posts.seeding import Seeder
+
+DATASETS = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+
+def seed_dataset(posts: int, seed: int = 1) -> dict[str, int]:
+    """
+    Заполняет пустую базу набором данных.
+
+    Args:
+        posts: Число постов
+        seed: Зерно генератора
+    Returns:
+        dict: Число созданных строк по таблицам
+    """
+    users = max(100, posts // 10)
+    return Seeder(
+        users=users,
+        groups=max(10, posts // 1000),
+        posts=posts,
+        comments=posts * 2,
+        follows=users * 5,
+        seed=seed
+    ).run()
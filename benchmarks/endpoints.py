@@ -0,0 +1,508 @@
+"""
+Задержка, запросы к базе и память каждого маршрута API.
+
+Для набора данных из `datasets.DATASETS` каждый маршрут `api/urls.py`
+вызывается через тестовый клиент: сначала прогрев с подсчетом запросов
+к базе, затем `--requests` замеров задержки (p50, p95, p99) и
+`--memory-requests` вызовов под tracemalloc (пик выделенной памяти).
+Объекты, которые запрос изменяет или удаляет, создаются перед каждым
+вызовом вне замера. Маршруты djoser для писем (активация, сброс пароля)
+не замеряются. Ограничение частоты записи отключено, изображения
+обрабатываются в запросе `finish`: фоновый поток писал бы в базу
+параллельно с замером.
+
+База с большим набором создается долго, поэтому ее можно сохранить
+в файл и использовать повторно (записи маршрутов в ней накапливаются):
+    python benchmarks/endpoints.py --dataset 1m --database /tmp/bench-1m.db
+
+Запуск из корня репозитория:
+    python benchmarks/endpoints.py --dataset 10k --json result.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+import uuid
+from functools import partial
+from io import BytesIO
+from itertools import count
+from typing import Any, Callable, NamedTuple, Optional
+
+# common настраивает Django до импорта проекта.
+from common import disable_throttling, test_database
+from datasets import DATASETS, seed_dataset
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from PIL import Image
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from posts.counters import change_followers_counters
+from posts.models import Comment, Follow, Group, Post, Profile
+from posts.uploads import append_chunk, start_upload
+
+User = get_user_model()
+
+PASSWORD = 'Bench-password-2024'
+# Имена новых пользователей не повторяются и в сохраненной базе.
+RUN = uuid.uuid4().hex[:8]
+numbers = count()
+
+
+class Route(NamedTuple):
+    """Замеряемый маршрут."""
+
+    name: str
+    method: str
+    path: str
+    data: Any = None
+    # Создает объекты для вызова вне замера и возвращает параметры
+    # для подстановки в путь и тело.
+    prepare: Optional[Callable[[dict], dict]] = None
+    content_type: str = 'application/json'
+    headers: Optional[dict] = None
+    is_async: bool = False
+
+
+def png_bytes() -> bytes:
+    """
+    Returns:
+        bytes: Небольшое изображение PNG
+    """
+    buffer = BytesIO()
+    Image.new('RGB', (32, 32), 'red').save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+PNG = png_bytes()
+
+
+def new_username(prefix: str) -> str:
+    """Имя пользователя, не занятое в этом и прошлых запусках."""
+    return f'{prefix}_{RUN}_{next(numbers)}'
+
+
+def new_post(context: dict) -> dict:
+    """Пост пользователя замера."""
+    post = Post.objects.create(author=context['user'], text='Пост')
+    return {'post': post.pk}
+
+
+def new_comment(context: dict) -> dict:
+    """Комментарий пользователя замера к популярному посту."""
+    comment = Comment.objects.create(
+        author=context['user'], post_id=context['popular_post'],
+        text='Комментарий'
+    )
+    return {'comment': comment.pk}
+
+
+def new_authors(context: dict, size: int = 10) -> dict:
+    """Новые пользователи для подписки."""
+    usernames = [new_username('author') for _ in range(size)]
+    User.objects.bulk_create(User(username=name) for name in usernames)
+    return {'following': usernames}
+
+
+def new_follows(context: dict) -> dict:
+    """Подписки пользователя замера на новых авторов."""
+    usernames = new_authors(context)['following']
+    authors = list(
+        User.objects.filter(username__in=usernames).values_list(
+            'pk', flat=True
+        )
+    )
+    Follow.objects.bulk_create(
+        Follow(user=context['user'], following_id=pk) for pk in authors
+    )
+    change_followers_counters(context['user'].pk, authors, 1)
+    return {'following': usernames}
+
+
+def new_upload(context: dict) -> dict:
+    """Загрузка без принятых частей."""
+    upload = start_upload(context['user'].pk, 'photo.png', len(PNG))
+    return {'upload': upload.pk}
+
+
+def full_upload(context: dict) -> dict:
+    """Загрузка, принятая полностью."""
+    upload = start_upload(context['user'].pk, 'photo.png', len(PNG))
+    append_chunk(upload, 0, BytesIO(PNG))
+    return {'upload': upload.pk}
+
+
+ROUTES = (
+    Route('api-root', 'GET', '/api/v1/'),
+    Route('users-list', 'GET', '/api/v1/users/'),
+    Route('users-create', 'POST', '/api/v1/users/',
+          data={'username': '{username}', 'password': PASSWORD},
+          prepare=lambda context: {'username': new_username('user')}),
+    Route('users-me', 'GET', '/api/v1/users/me/'),
+    Route('users-detail', 'GET', '/api/v1/users/{user_id}/'),
+    Route('jwt-create', 'POST', '/api/v1/jwt/create/',
+          data={'username': 'bench', 'password': PASSWORD}),
+    Route('jwt-refresh', 'POST', '/api/v1/jwt/refresh/',
+          data={'refresh': '{refresh}'}),
+    Route('jwt-verify', 'POST', '/api/v1/jwt/verify/',
+          data={'token': '{access}'}),
+    Route('posts-list', 'GET', '/api/v1/posts/?limit=20'),
+    Route('posts-list-offset', 'GET',
+          '/api/v1/posts/?limit=20&offset=1000'),
+    Route('posts-list-fields', 'GET',
+          '/api/v1/posts/?limit=20&fields=id,text'),
+    Route('posts-search', 'GET',
+          '/api/v1/posts/?search=море+кофе&limit=20'),
+    Route('posts-detail', 'GET', '/api/v1/posts/{popular_post}/'),
+    Route('posts-create', 'POST', '/api/v1/posts/',
+          data={'text': 'Новый пост', 'group': '{group}'}),
+    Route('posts-bulk', 'POST', '/api/v1/posts/bulk/',
+          data=[{'text': 'Пост из пакета'}] * 10),
+    Route('posts-update', 'PATCH', '/api/v1/posts/{own_post}/',
+          data={'text': 'Измененный пост'}),
+    Route('posts-delete', 'DELETE', '/api/v1/posts/{post}/',
+          prepare=new_post),
+    Route('comments-list', 'GET',
+          '/api/v1/posts/{popular_post}/comments/?limit=20'),
+    Route('comments-detail', 'GET',
+          '/api/v1/posts/{popular_post}/comments/{own_comment}/'),
+    Route('comments-create', 'POST',
+          '/api/v1/posts/{popular_post}/comments/',
+          data={'text': 'Новый комментарий'}),
+    Route('comments-update', 'PATCH',
+          '/api/v1/posts/{popular_post}/comments/{own_comment}/',
+          data={'text': 'Измененный комментарий'}),
+    Route('comments-delete', 'DELETE',
+          '/api/v1/posts/{popular_post}/comments/{comment}/',
+          prepare=new_comment),
+    Route('groups-list', 'GET', '/api/v1/groups/'),
+    Route('groups-detail', 'GET', '/api/v1/groups/{group}/'),
+    Route('follow-list', 'GET', '/api/v1/follow/'),
+    Route('follow-create', 'POST', '/api/v1/follow/',
+          data={'following': '{following[0]}'},
+          prepare=lambda context: new_authors(context, 1)),
+    Route('follow-bulk', 'POST', '/api/v1/follow/bulk/',
+          data={'following': '{following}'}, prepare=new_authors),
+    Route('follow-bulk-delete', 'POST', '/api/v1/follow/bulk/delete/',
+          data={'following': '{following}'}, prepare=new_follows),
+    Route('feed', 'GET', '/api/v1/feed/?limit=20'),
+    Route('uploads-create', 'POST', '/api/v1/uploads/',
+          data={'filename': 'photo.png', 'total_size': len(PNG)}),
+    Route('uploads-chunk', 'PATCH', '/api/v1/uploads/{upload}/', data=PNG,
+          content_type='application/offset+octet-stream',
+          headers={'HTTP_UPLOAD_OFFSET': '0'}, prepare=new_upload),
+    Route('uploads-detail', 'GET', '/api/v1/uploads/{upload}/',
+          prepare=new_upload),
+    Route('uploads-finish', 'POST', '/api/v1/uploads/{upload}/finish/',
+          data={'post': '{own_post}'}, prepare=full_upload),
+    Route('uploads-delete', 'DELETE', '/api/v1/uploads/{upload}/',
+          prepare=new_upload),
+    Route('async-posts-list', 'GET', '/api/v1/async/posts/?limit=20',
+          is_async=True),
+    Route('async-posts-detail', 'GET', '/api/v1/async/posts/{popular_post}/',
+          is_async=True),
+    Route('async-comments-list', 'GET',
+          '/api/v1/async/posts/{popular_post}/comments/?limit=20',
+          is_async=True),
+    Route('async-comments-detail', 'GET',
+          '/api/v1/async/posts/{popular_post}/comments/{own_comment}/',
+          is_async=True),
+    Route('async-groups-list', 'GET', '/api/v1/async/groups/',
+          is_async=True),
+    Route('async-groups-detail', 'GET', '/api/v1/async/groups/{group}/',
+          is_async=True),
+    Route('async-follow-list', 'GET', '/api/v1/async/follow/',
+          is_async=True),
+)
+
+
+def create_context() -> dict:
+    """
+    Создает пользователя замера и объекты, к которым обращаются маршруты.
+    В сохраненной базе использует созданные в прошлый раз.
+
+    Returns:
+        dict: Параметры для подстановки в пути и тела запросов
+    """
+    user = User.objects.filter(username='bench').first()
+    if user is None:
+        user = User.objects.create_user('bench', password=PASSWORD)
+        # Подписки на самых популярных авторов заполняют ленту.
+        authors = Profile.objects.exclude(user=user).order_by(
+            '-followers_count'
+        ).values_list('user_id', flat=True)[:20]
+        for author_id in authors:
+            Follow.objects.create(user=user, following_id=author_id)
+    popular_post = Post.objects.order_by('-comments_count').values_list(
+        'pk', flat=True
+    ).first()
+    own_post, _ = Post.objects.get_or_create(author=user, text='Пост замера')
+    own_comment, _ = Comment.objects.get_or_create(
+        author=user, post_id=popular_post, text='Комментарий замера'
+    )
+    refresh = RefreshToken.for_user(user)
+    return {
+        'user': user,
+        'user_id': user.pk,
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'popular_post': popular_post,
+        'own_post': own_post.pk,
+        'own_comment': own_comment.pk,
+        'group': Group.objects.order_by('pk').values_list(
+            'pk', flat=True
+        ).first(),
+    }
+
+
+def fill(value: Any, params: dict) -> Any:
+    """
+    Подставляет параметры в строки тела запроса.
+
+    Args:
+        value: Тело или его часть
+        params: Параметры
+    Returns:
+        Any: Тело с подставленными значениями
+    """
+    if isinstance(value, dict):
+        return {key: fill(item, params) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, params) for item in value]
+    if isinstance(value, str) and value.startswith('{'):
+        # Значение целиком из параметра сохраняет его тип.
+        key = value.strip('{}')
+        if '[' in key:
+            name, index = key.rstrip(']').split('[')
+            return params[name][int(index)]
+        return params[key]
+    return value
+
+
+def build_request(route: Route, context: dict) -> tuple[str, dict]:
+    """
+    Готовит путь и аргументы клиента для одного вызова маршрута.
+
+    Args:
+        route: Маршрут
+        context: Общие параметры замера
+    Returns:
+        tuple: Путь и аргументы метода клиента
+    """
+    params = dict(context)
+    if route.prepare:
+        params.update(route.prepare(context))
+    kwargs = dict(route.headers or {})
+    if route.data is not None:
+        data = route.data
+        if route.content_type == 'application/json':
+            data = json.dumps(fill(data, params))
+        kwargs.update(data=data, content_type=route.content_type)
+    return route.path.format(**params), kwargs
+
+
+def call(client: Client, route: Route, path: str, kwargs: dict) -> Any:
+    """
+    Выполняет запрос тестовым клиентом.
+
+    Returns:
+        Response: Ответ
+    """
+    return getattr(client, route.method.lower())(path, **kwargs)
+
+
+def check(route: Route, response: Any) -> None:
+    """
+    Проверяет, что маршрут ответил успешно, иначе замер бессмыслен.
+
+    Raises:
+        RuntimeError: Ответ с ошибкой
+    """
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f'{route.name}: {response.status_code} {response.content[:200]}'
+        )
+
+
+def measure_sync(route: Route, context: dict, client: Client,
+                 options: argparse.Namespace) -> dict:
+    """
+    Замеряет синхронный маршрут.
+
+    Args:
+        route: Маршрут
+        context: Общие параметры замера
+        client: Клиент с токеном пользователя замера
+        options: Параметры запуска
+    Returns:
+        dict: Задержки в секундах, запросы к базе и пики памяти в байтах
+    """
+    queries = []
+    for _ in range(options.warmup):
+        path, kwargs = build_request(route, context)
+        with CaptureQueriesContext(connection) as captured:
+            check(route, call(client, route, path, kwargs))
+        queries.append(len(captured))
+    latencies = []
+    for _ in range(options.requests):
+        path, kwargs = build_request(route, context)
+        started = time.perf_counter()
+        response = call(client, route, path, kwargs)
+        latencies.append(time.perf_counter() - started)
+        check(route, response)
+    memory = []
+    tracemalloc.start()
+    try:
+        for _ in range(options.memory_requests):
+            path, kwargs = build_request(route, context)
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            call(client, route, path, kwargs)
+            memory.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return {'latencies': latencies, 'queries': queries, 'memory': memory}
+
+
+async def measure_async(route: Route, context: dict, client: AsyncClient,
+                        options: argparse.Namespace) -> dict:
+    """
+    Замеряет асинхронный маршрут в одном цикле событий.
+    Запросы асинхронного ORM выполняются в общем потоке sync_to_async,
+    поэтому запросы к базе считаются в нем.
+
+    Args:
+        route: Маршрут
+        context: Общие параметры замера
+        client: Асинхронный клиент с токеном пользователя замера
+        options: Параметры запуска
+    Returns:
+        dict: Задержки в секундах, запросы к базе и пики памяти в байтах
+    """
+    path = route.path.format(**context)
+    # AsyncClient не переносит заголовки по умолчанию в scope ASGI.
+    method = partial(
+        getattr(client, route.method.lower()), headers=client.auth_headers
+    )
+    queries = []
+    for _ in range(options.warmup):
+        captured = CaptureQueriesContext(connection)
+        await sync_to_async(captured.__enter__)()
+        response = await method(path)
+        await sync_to_async(captured.__exit__)(None, None, None)
+        check(route, response)
+        # Прокси connection указывает на соединение того потока,
+        # в котором к нему обращаются.
+        queries.append(await sync_to_async(len)(captured))
+    latencies = []
+    for _ in range(options.requests):
+        started = time.perf_counter()
+        response = await method(path)
+        latencies.append(time.perf_counter() - started)
+        check(route, response)
+    memory = []
+    tracemalloc.start()
+    try:
+        for _ in range(options.memory_requests):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await method(path)
+            memory.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return {'latencies': latencies, 'queries': queries, 'memory': memory}
+
+
+def summarize(samples: dict) -> dict:
+    """
+    Сводит замеры маршрута.
+
+    Args:
+        samples: Результат `measure_sync` или `measure_async`
+    Returns:
+        dict: Перцентили задержки в мс, запросы и память в КиБ
+    """
+    cuts = statistics.quantiles(
+        samples['latencies'], n=100, method='inclusive'
+    )
+    return {
+        'p50_ms': cuts[49] * 1e3,
+        'p95_ms': cuts[94] * 1e3,
+        'p99_ms': cuts[98] * 1e3,
+        'queries': max(samples['queries']),
+        'memory_kib': statistics.median(samples['memory']) / 1024,
+    }
+
+
+def main() -> None:
+    """Создает набор данных, замеряет маршруты и печатает таблицу."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--dataset', choices=DATASETS, default='1k')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--memory-requests', type=int, default=5)
+    parser.add_argument('--route', action='append',
+                        help='Замерить только эти маршруты.')
+    parser.add_argument('--database',
+                        help='Файл базы, который сохраняется между '
+                             'запусками с тем же набором.')
+    parser.add_argument('--json', help='Файл для результата в JSON.')
+    options = parser.parse_args()
+
+    routes = [
+        route for route in ROUTES
+        if not options.route or route.name in options.route
+    ]
+    disable_throttling()
+    results = {}
+    with tempfile.TemporaryDirectory() as media_root, \
+            override_settings(MEDIA_ROOT=media_root,
+                              POST_IMAGE_WORKERS=0), \
+            test_database(options.database, keep=bool(options.database)) \
+            as existed:
+        if not existed:
+            started = time.perf_counter()
+            sizes = seed_dataset(DATASETS[options.dataset], options.seed)
+            print(f'Набор {options.dataset}: {sizes}, '
+                  f'{time.perf_counter() - started:.0f} с')
+        context = create_context()
+        headers = {'Authorization': f'Bearer {context["access"]}'}
+        client = Client(headers=headers)
+        async_client = AsyncClient()
+        async_client.auth_headers = headers
+        for route in routes:
+            cache.clear()
+            if route.is_async:
+                samples = asyncio.run(
+                    measure_async(route, context, async_client, options)
+                )
+            else:
+                samples = measure_sync(route, context, client, options)
+            results[route.name] = summarize(samples)
+
+    print(f'{"маршрут":<24} {"p50 мс":>8} {"p95 мс":>8} {"p99 мс":>8} '
+          f'{"запросов":>9} {"КиБ":>8}')
+    for name, result in results.items():
+        print(f'{name:<24} {result["p50_ms"]:8.2f} {result["p95_ms"]:8.2f} '
+              f'{result["p99_ms"]:8.2f} {result["queries"]:9} '
+              f'{result["memory_kib"]:8.1f}')
+    if options.json:
+        with open(options.json, 'w') as file:
+            json.dump({
+                'dataset': options.dataset,
+                'seed': options.seed,
+                'requests': options.requests,
+                'routes': results,
+            }, file, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
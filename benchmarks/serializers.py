@@ -0,0 +1,97 @@
+"""
+Стоимость строки списка: ModelSerializer против сериализатора values().
+
+Для каждого набора измеряется выборка и сериализация `--rows` строк
+(лучшее из `--repeat` прогонов) во временной тестовой базе.
+
+Запуск из корня репозитория:
+    python benchmarks/serializers.py --rows 1000 --repeat 5
+"""
+import argparse
+
+# common настраивает Django до импорта проекта.
+from common import best_time, test_database
+
+from django.contrib.auth import get_user_model
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.fast_serializers import CommentValuesSerializer, PostValuesSerializer
+from api.serializers import CommentSerializer, PostSerializer
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+def seed(rows: int) -> None:
+    """
+    Создает посты и комментарии к первому посту.
+
+    Args:
+        rows: Количество постов и комментариев
+    """
+    authors = User.objects.bulk_create(
+        User(username=f'bench_{number}') for number in range(50)
+    )
+    group = Group.objects.create(
+        title='Группа', slug='group', description='Группа'
+    )
+    posts = Post.objects.bulk_create(
+        Post(
+            author=authors[number % len(authors)],
+            group=group if number % 2 else None,
+            text=f'Пост {number}'
+        )
+        for number in range(rows)
+    )
+    Comment.objects.bulk_create(
+        Comment(
+            author=authors[number % len(authors)],
+            post=posts[0],
+            text=f'Комментарий {number}'
+        )
+        for number in range(rows)
+    )
+
+
+def main() -> None:
+    """Создает данные, выполняет замеры и печатает стоимость строки."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    options = parser.parse_args()
+
+    with test_database():
+        seed(options.rows)
+        context = {
+            'request': Request(APIRequestFactory().get('/api/v1/posts/'))
+        }
+        cases = (
+            ('posts', PostSerializer, PostValuesSerializer,
+             Post.objects.select_related('author', 'group')),
+            ('comments', CommentSerializer, CommentValuesSerializer,
+             Comment.objects.select_related('author')),
+        )
+        print(f'{options.rows} строк, мкс на строку')
+        print(f'{"":<10} {"ModelSerializer":>16} {"values()":>10} '
+              f'{"ускорение":>10}')
+        for name, serializer, values_serializer, queryset in cases:
+            before = best_time(
+                lambda: serializer(
+                    queryset.all(), many=True, context=context
+                ).data,
+                options.repeat
+            )
+            after = best_time(
+                lambda: values_serializer(
+                    values_serializer.values(queryset.all()), context=context
+                ).data,
+                options.repeat
+            )
+            print(f'{name:<10} {before / options.rows * 1e6:16.1f} '
+                  f'{after / options.rows * 1e6:10.1f} '
+                  f'{before / after:9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Пропускная способность чтения при параллельной записи постов.
+
+Читатели запрашивают `/api/v1/posts/?limit=20`, писатели в это время
+создают посты через `POST /api/v1/posts/`. Каждый профиль базы
+(`DB_PROFILE`, а для `queue` еще и очередь записи) прогоняется
+в отдельном процессе, потому что настройки читаются при импорте.
+База — временный файл: журнал WAL в памяти не работает.
+
+Запуск из корня репозитория:
+    python benchmarks/sqlite_concurrency.py --duration 5 --readers 8
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+# common настраивает Django до импорта проекта.
+from common import disable_throttling, test_database
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from rest_framework_simplejwt.tokens import AccessToken
+
+from posts.models import Post
+
+User = get_user_model()
+
+PROFILES = {
+    'default': {'DB_PROFILE': 'default'},
+    'production': {'DB_PROFILE': 'production'},
+    'queue': {'DB_PROFILE': 'production', 'WRITE_QUEUE_ENABLED': '1'},
+}
+
+
+def seed(posts: int, writers: int) -> list[str]:
+    """
+    Создает посты и авторов для писателей.
+
+    Args:
+        posts: Количество постов
+        writers: Количество писателей
+    Returns:
+        list: Токены доступа писателей
+    """
+    authors = User.objects.bulk_create(
+        User(username=f'bench_{number}')
+        for number in range(max(writers, 10))
+    )
+    Post.objects.bulk_create(
+        Post(author=authors[number % len(authors)], text=f'Пост {number}')
+        for number in range(posts)
+    )
+    return [
+        str(AccessToken.for_user(author)) for author in authors[:writers]
+    ]
+
+
+class Load:
+    """Читатели и писатели с общими счетчиками и сроком окончания."""
+
+    def __init__(self, duration: float) -> None:
+        """
+        Args:
+            duration: Длительность в секундах
+        """
+        self.counts = {'reads': 0, 'writes': 0, 'errors': 0}
+        self.lock = threading.Lock()
+        self.deadline = time.perf_counter() + duration
+
+    def request(self, name: str, send: Callable[[], Any]) -> None:
+        """
+        Отправляет запрос и учитывает его результат.
+
+        Args:
+            name: Счетчик успешных запросов
+            send: Функция отправки запроса
+        """
+        try:
+            status = send().status_code
+        except Exception:
+            # "database is locked" без профиля приходит исключением.
+            status = 500
+        with self.lock:
+            self.counts[name if status < 400 else 'errors'] += 1
+
+    def read(self) -> None:
+        """Читает список постов до окончания срока."""
+        client = Client()
+        try:
+            while time.perf_counter() < self.deadline:
+                self.request('reads', lambda: client.get(
+                    '/api/v1/posts/?limit=20'
+                ))
+        finally:
+            connection.close()
+
+    def write(self, token: str) -> None:
+        """
+        Создает посты до окончания срока.
+
+        Args:
+            token: Токен доступа писателя
+        """
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+        try:
+            while time.perf_counter() < self.deadline:
+                self.request('writes', lambda: client.post(
+                    '/api/v1/posts/', {'text': 'Новый пост'},
+                    content_type='application/json'
+                ))
+        finally:
+            connection.close()
+
+
+def run_threads(readers: int, tokens: list[str],
+                duration: float) -> dict[str, int]:
+    """
+    Запускает читателей и писателей на заданное время.
+
+    Args:
+        readers: Количество потоков чтения
+        tokens: Токены потоков записи
+        duration: Длительность в секундах
+    Returns:
+        dict: Число успешных чтений, записей и ошибок
+    """
+    load = Load(duration)
+    threads = [threading.Thread(target=load.read) for _ in range(readers)]
+    threads += [
+        threading.Thread(target=load.write, args=(token,))
+        for token in tokens
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return load.counts
+
+
+def run_profile(options: argparse.Namespace) -> None:
+    """
+    Замеряет текущий профиль во временной базе и печатает JSON.
+
+    Args:
+        options: Параметры запуска
+    """
+    disable_throttling()
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(str(Path(directory) / 'bench.sqlite3')):
+            tokens = seed(options.posts, options.writers)
+            connection.close()
+            counts = run_threads(options.readers, tokens, options.duration)
+    print(json.dumps(counts))
+
+
+def main() -> None:
+    """Прогоняет профили в отдельных процессах и печатает сравнение."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--duration', type=float, default=5)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--posts', type=int, default=1000)
+    parser.add_argument('--profile', choices=PROFILES)
+    options = parser.parse_args()
+
+    if options.profile:
+        run_profile(options)
+        return
+
+    print(f'{options.readers} читателей, {options.writers} писателей, '
+          f'{options.duration:g} с')
+    print(f'{"профиль":<12} {"чтений/с":>10} {"записей/с":>10} '
+          f'{"ошибок":>8}')
+    for profile, environ in PROFILES.items():
+        output = subprocess.run(
+            [sys.executable, __file__, *sys.argv[1:],
+             '--profile', profile],
+            env={**os.environ, **environ},
+            capture_output=True, text=True, check=True
+        ).stdout
+        counts = json.loads(output.strip().splitlines()[-1])
+        print(f'{profile:<12} '
+              f'{counts["reads"] / options.duration:10.1f} '
+              f'{counts["writes"] / options.duration:10.1f} '
+              f'{counts["errors"]:8}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,15 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path):
+    settings.CACHES = {
+        'default': {
+            **settings.CACHES['default'], 'LOCATION': str(tmp_path / 'cache')
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def throttle_state(settings, tmp_path):
+    settings.THROTTLE_STATE_PATH = tmp_path / 'throttle.state'
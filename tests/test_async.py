@@ -0,0 +1,60 @@
+from http import HTTPStatus
+
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestAsyncReadAPI:
+
+    URLS = (
+        '/api/v1/posts/',
+        '/api/v1/posts/?limit=1&offset=1',
+        '/api/v1/posts/{post_id}/',
+        '/api/v1/posts/{post_id}/comments/',
+        '/api/v1/posts/{post_id}/comments/{comment_id}/',
+        '/api/v1/groups/',
+        '/api/v1/groups/{group_id}/',
+        '/api/v1/follow/',
+        '/api/v1/follow/?search=another',
+        '/api/v1/posts/100500/',
+        '/api/v1/posts/100500/comments/',
+    )
+
+    def async_get(self, url, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        return async_to_sync(AsyncClient().get)(url, headers=headers)
+
+    @pytest.mark.parametrize('url', URLS)
+    def test_async_matches_sync(self, user_client, token, post, post_2,
+                                another_post, comment_1_post, group_1,
+                                follow_1, follow_5, url):
+        url = url.format(
+            post_id=post.id, comment_id=comment_1_post.id, group_id=group_1.id
+        )
+        async_url = url.replace('/api/v1/', '/api/v1/async/', 1)
+        response = user_client.get(url)
+        async_response = self.async_get(async_url, token['access'])
+        assert async_response.status_code == response.status_code, (
+            f'Проверьте, что `{async_url}` возвращает тот же статус, что и '
+            f'`{url}`.'
+        )
+        assert async_response.content == response.content.replace(
+            b'/api/v1/', b'/api/v1/async/'
+        ), (
+            f'Проверьте, что `{async_url}` возвращает те же данные, что и '
+            f'`{url}`.'
+        )
+
+    def test_async_follow_not_auth(self):
+        url = '/api/v1/async/follow/'
+        response = self.async_get(url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{url}` возвращает ответ со статусом 401.'
+        )
+        assert response.headers.get('WWW-Authenticate'), (
+            f'Проверьте, что ответ 401 `{url}` содержит заголовок '
+            '`WWW-Authenticate`.'
+        )
@@ -0,0 +1,61 @@
+from http import HTTPStatus
+import multiprocessing
+
+import pytest
+
+from api.authentication import auth_namespace
+from api.cache import bump_version
+
+
+def bump_user_version(user_id):
+    bump_version(auth_namespace(user_id))
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCachedJWTAuthentication:
+
+    url = '/api/v1/follow/'
+
+    def test_user_cached_between_requests(self, user_client,
+                                          django_assert_num_queries):
+        user_client.get(self.url)
+        # Остается только запрос подписок: пользователь берется из кэша.
+        with django_assert_num_queries(1):
+            response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный запрос с тем же JWT-токеном '
+            'возвращает ответ со статусом 200.'
+        )
+
+    def test_deactivated_user_rejected(self, user_client, user):
+        user_client.get(self.url)
+        user.is_active = False
+        user.save()
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что после деактивации пользователя его токен '
+            'перестает приниматься, несмотря на кэш.'
+        )
+
+    def test_password_change_reloads_user(self, user_client, user,
+                                          django_assert_num_queries):
+        user_client.get(self.url)
+        user.set_password('new-password-123')
+        user.save()
+        with django_assert_num_queries(2):
+            user_client.get(self.url)
+
+    def test_deactivation_in_other_process(self, user_client, user):
+        user_client.get(self.url)
+        # Другой процесс деактивирует пользователя и сбрасывает версию.
+        type(user).objects.filter(pk=user.pk).update(is_active=False)
+        process = multiprocessing.get_context('fork').Process(
+            target=bump_user_version, args=(user.pk,)
+        )
+        process.start()
+        process.join()
+        response = user_client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что деактивация пользователя в одном процессе '
+            'сбрасывает кэш пользователей во всех процессах.'
+        )
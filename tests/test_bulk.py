@@ -0,0 +1,210 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.views import FollowViewSet
+from posts.models import Follow, Post, TimelineEntry
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostBulkAPI:
+
+    url = '/api/v1/posts/bulk/'
+
+    def test_bulk_create_not_auth(self, client):
+        response = client.post(
+            self.url, data=[{'text': 'Пост'}], content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что POST-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_bulk_create(self, user_client, user, another_user, group_1,
+                         follow_4):
+        data = [
+            {'text': f'Пост {number}', 'group': group_1.id}
+            for number in range(3)
+        ] + [{'text': 'Пост без группы'}]
+        response = user_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.url}` с валидными данными '
+            'возвращает ответ со статусом 201.'
+        )
+        test_data = response.json()
+        assert [item['text'] for item in test_data] == [
+            item['text'] for item in data
+        ], (
+            f'Проверьте, что `{self.url}` возвращает созданные посты в '
+            'порядке запроса.'
+        )
+        assert all(item['author'] == user.username for item in test_data), (
+            f'Проверьте, что автором постов из `{self.url}` становится '
+            'автор запроса.'
+        )
+        assert Post.objects.filter(author=user).count() == len(data)
+
+        group_1.refresh_from_db()
+        assert group_1.posts_count == 3, (
+            'Проверьте, что пакетное создание постов обновляет счетчик '
+            'постов группы.'
+        )
+        assert TimelineEntry.objects.filter(
+            user=another_user
+        ).count() == len(data), (
+            'Проверьте, что посты, созданные пакетом, попадают в ленты '
+            'подписчиков автора.'
+        )
+
+    def test_bulk_create_invalid(self, user_client, user):
+        data = [{'text': 'Пост'}, {'group': 100500}, {'text': 'Пост'}]
+        response = user_client.post(self.url, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.url}` с невалидным '
+            'элементом возвращает ответ со статусом 400.'
+        )
+        errors = response.json()
+        assert isinstance(errors, list) and len(errors) == len(data), (
+            f'Проверьте, что ответ `{self.url}` содержит ошибки по каждому '
+            'элементу запроса.'
+        )
+        assert not errors[0] and not errors[2] and 'text' in errors[1], (
+            f'Проверьте, что ошибки в ответе `{self.url}` относятся к '
+            'невалидному элементу.'
+        )
+        assert not Post.objects.exists(), (
+            'Проверьте, что при ошибке в пачке ни один пост не создается.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFollowBulkAPI:
+
+    url = '/api/v1/follow/bulk/'
+    delete_url = '/api/v1/follow/bulk/delete/'
+    AUTHORS = 20
+
+    @pytest.fixture
+    def authors(self, django_user_model):
+        authors = django_user_model.objects.bulk_create(
+            django_user_model(username=f'author_{number}')
+            for number in range(self.AUTHORS)
+        )
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Пост {author.username}')
+            for author in authors
+        )
+        return authors
+
+    def test_bulk_follow(self, user_client, user, authors, another_user,
+                         follow_1, django_assert_max_num_queries):
+        usernames = [author.username for author in authors]
+        # Пользователь, имена, затем в транзакции вставка, счетчики
+        # с созданием профилей, знаменитости, посты и лента — не зависит
+        # от числа авторов.
+        with django_assert_max_num_queries(13):
+            response = user_client.post(
+                self.url,
+                data={'following': usernames + [another_user.username]},
+                format='json'
+            )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.url}` возвращает ответ со '
+            'статусом 201.'
+        )
+        assert sorted(
+            item['following'] for item in response.json()
+        ) == sorted(usernames), (
+            f'Проверьте, что `{self.url}` возвращает только новые подписки.'
+        )
+        assert user.follower.count() == self.AUTHORS + 1
+        assert TimelineEntry.objects.filter(
+            user=user, post__author__in=authors
+        ).count() == self.AUTHORS, (
+            'Проверьте, что пакетная подписка заполняет ленту постами '
+            'авторов.'
+        )
+        user.profile.refresh_from_db()
+        assert user.profile.following_count == self.AUTHORS, (
+            'Проверьте, что пакетная подписка обновляет счетчик подписок.'
+        )
+        assert authors[0].profile.followers_count == 1, (
+            'Проверьте, что пакетная подписка обновляет счетчики '
+            'подписчиков авторов.'
+        )
+
+    def test_bulk_follow_race(self, user_client, user, authors,
+                              monkeypatch):
+        get_batch_authors = FollowViewSet.get_batch_authors
+
+        def follow_in_parallel(view, request):
+            batch = get_batch_authors(view, request)
+            # Параллельный запрос успевает подписаться до вставки.
+            Follow.objects.create(user=user, following=authors[0])
+            return batch
+
+        monkeypatch.setattr(
+            FollowViewSet, 'get_batch_authors', follow_in_parallel
+        )
+        response = user_client.post(
+            self.url,
+            data={'following': [authors[0].username, authors[1].username]},
+            format='json'
+        )
+        assert [item['following'] for item in response.json()] == [
+            authors[1].username
+        ], (
+            f'Проверьте, что `{self.url}` не возвращает подписки, '
+            'созданные параллельным запросом.'
+        )
+        user.profile.refresh_from_db()
+        assert user.profile.following_count == 1, (
+            'Проверьте, что пакетная подписка учитывает в счетчиках только '
+            'вставленные ею подписки.'
+        )
+
+    @pytest.mark.parametrize('username', ('unknown_user', 'TestUser'))
+    def test_bulk_follow_invalid(self, user_client, user, authors, username):
+        response = user_client.post(
+            self.url,
+            data={'following': [authors[0].username, username]},
+            format='json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что POST-запрос к `{self.url}` с несуществующим '
+            'автором или самим пользователем возвращает ответ со статусом '
+            '400.'
+        )
+        assert not user.follower.exists(), (
+            'Проверьте, что при ошибке в списке подписки не создаются.'
+        )
+
+    def test_bulk_unfollow(self, user_client, user, authors,
+                           django_assert_max_num_queries):
+        usernames = [author.username for author in authors]
+        user_client.post(
+            self.url, data={'following': usernames}, format='json'
+        )
+        # Пользователь, имена, затем в транзакции удаление подписок,
+        # записей лент, проверка порога знаменитостей и два счетчика —
+        # не зависит от числа авторов.
+        with django_assert_max_num_queries(8):
+            response = user_client.post(
+                self.delete_url,
+                data={'following': usernames[:5]},
+                format='json'
+            )
+        assert response.status_code == HTTPStatus.NO_CONTENT, (
+            f'Проверьте, что POST-запрос к `{self.delete_url}` возвращает '
+            'ответ со статусом 204.'
+        )
+        assert user.follower.count() == self.AUTHORS - 5
+        assert not TimelineEntry.objects.filter(
+            user=user, post__author__in=authors[:5]
+        ).exists(), (
+            'Проверьте, что пакетная отписка убирает посты авторов из ленты.'
+        )
+        user.profile.refresh_from_db()
+        assert user.profile.following_count == self.AUTHORS - 5, (
+            'Проверьте, что пакетная отписка обновляет счетчик подписок.'
+        )
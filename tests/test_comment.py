@@ -108,6 +108,32 @@ class TestCommentAPI:
             db_comment=comment
         )
 
+    @pytest.mark.parametrize(
+        'query', ('limit=1', 'page_size=1')
+    )
+    def test_comments_get_paginated(self, user_client, post, comment_1_post,
+                                    comment_2_post, comment_1_another_post,
+                                    query):
+        url = f'{self.comments_url.format(post_id=post.id)}?{query}'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.comments_url}` с '
+            f'параметрами `{query}` возвращает ответ со статусом 200.'
+        )
+        test_data = response.json()
+        assert isinstance(test_data, dict) and 'results' in test_data, (
+            f'Проверьте, что GET-запрос к `{self.comments_url}` с '
+            f'параметрами `{query}` возвращает страницу с полем `results`.'
+        )
+        assert len(test_data['results']) == 1, (
+            f'Проверьте, что GET-запрос к `{self.comments_url}` с '
+            f'параметрами `{query}` возвращает один комментарий.'
+        )
+        assert test_data['next'], (
+            f'Проверьте, что страница `{self.comments_url}` со вторым '
+            'комментарием поста доступна по ссылке `next`.'
+        )
+
     def test_comment_create_by_unauth(self, client, post, comment_1_post):
         comment_cnt = Comment.objects.count()
 
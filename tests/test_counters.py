@@ -0,0 +1,164 @@
+from http import HTTPStatus
+from io import BytesIO
+
+from django.core.management import call_command
+from PIL import Image
+import pytest
+
+from api.serializers import PostSerializer
+from posts.models import Comment, Group, Post, Profile
+from posts.uploads import append_chunk, finish_upload, start_upload
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCounters:
+
+    def test_comments_count(self, user_client, post):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        response = user_client.post(url, data={'text': 'Коммент'})
+        assert response.status_code == HTTPStatus.CREATED
+        post.refresh_from_db()
+        assert post.comments_count == 1, (
+            'Проверьте, что создание комментария увеличивает '
+            '`comments_count` поста.'
+        )
+        assert user_client.get(
+            f'/api/v1/posts/{post.id}/'
+        ).json()['comments_count'] == 1, (
+            'Проверьте, что ответ `/api/v1/posts/{id}/` содержит поле '
+            '`comments_count`.'
+        )
+
+        user_client.delete(f'{url}{response.json()["id"]}/')
+        post.refresh_from_db()
+        assert post.comments_count == 0, (
+            'Проверьте, что удаление комментария уменьшает '
+            '`comments_count` поста.'
+        )
+
+    def test_posts_count(self, user_client, group_1, group_2):
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'Пост', 'group': group_1.id}
+        )
+        post_url = f'/api/v1/posts/{response.json()["id"]}/'
+        user_client.patch(post_url, data={'group': group_2.id})
+        counts = dict(Group.objects.values_list('slug', 'posts_count'))
+        assert counts == {group_1.slug: 0, group_2.slug: 1}, (
+            'Проверьте, что перенос поста в другую группу обновляет '
+            '`posts_count` обеих групп.'
+        )
+
+        user_client.delete(post_url)
+        group_2.refresh_from_db()
+        assert group_2.posts_count == 0, (
+            'Проверьте, что удаление поста уменьшает `posts_count` группы.'
+        )
+
+    def test_follow_counts(self, user_client, user, another_user):
+        user_client.post(
+            '/api/v1/follow/', data={'following': another_user.username}
+        )
+        test_data = user_client.get('/api/v1/users/me/').json()
+        assert test_data['following_count'] == 1, (
+            'Проверьте, что подписка увеличивает `following_count` '
+            'подписчика.'
+        )
+        assert Profile.objects.get(
+            user=another_user
+        ).followers_count == 1, (
+            'Проверьте, что подписка увеличивает `followers_count` автора.'
+        )
+
+    def test_users_list_loads_profiles_together(
+            self, user_client, user, django_user_model,
+            django_assert_max_num_queries):
+        django_user_model.objects.filter(pk=user.pk).update(is_staff=True)
+        for number in range(5):
+            author = django_user_model.objects.create(
+                username=f'author_{number}'
+            )
+            Profile.objects.create(user=author, followers_count=number)
+        # Пользователь по токену и список вместе с профилями.
+        with django_assert_max_num_queries(2):
+            response = user_client.get('/api/v1/users/')
+        assert response.status_code == HTTPStatus.OK
+        assert sorted(
+            item['followers_count'] for item in response.json()
+        ) == [0, 0, 1, 2, 3, 4], (
+            'Проверьте, что список `/api/v1/users/` содержит счетчики '
+            'профилей.'
+        )
+
+    def test_posts_count_resets_groups_cache(self, user_client, group_1):
+        user_client.get('/api/v1/groups/')
+        user_client.post(
+            '/api/v1/posts/', data={'text': 'Пост', 'group': group_1.id}
+        )
+        user_client.post(
+            '/api/v1/posts/bulk/',
+            data=[{'text': 'Пост', 'group': group_1.id}],
+            format='json'
+        )
+        test_data = user_client.get('/api/v1/groups/').json()
+        assert test_data[0]['posts_count'] == 2, (
+            'Проверьте, что изменение `posts_count` сбрасывает кэш '
+            'ответов `/api/v1/groups/`.'
+        )
+
+    def test_comments_count_changes_posts_etag(self, user_client, post):
+        url = '/api/v1/posts/'
+        etag = user_client.get(url).headers['ETag']
+        user_client.post(
+            f'{url}{post.id}/comments/', data={'text': 'Коммент'}
+        )
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что изменение `comments_count` меняет `ETag` '
+            f'ответа `{url}`.'
+        )
+        assert response.json()[0]['comments_count'] == 1
+
+    def test_post_save_keeps_comments_count(self, post, settings,
+                                            tmp_path):
+        settings.MEDIA_ROOT = tmp_path
+        settings.POST_IMAGE_WORKERS = 0
+        Post.objects.filter(pk=post.pk).update(comments_count=5)
+        serializer = PostSerializer(
+            post, data={'text': 'Новый текст'}, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        buffer = BytesIO()
+        Image.new('RGB', (10, 10)).save(buffer, 'PNG')
+        upload = start_upload(post.author_id, 'photo.png', buffer.tell())
+        buffer.seek(0)
+        append_chunk(upload, 0, buffer)
+        finish_upload(upload, post)
+
+        post.refresh_from_db()
+        assert (post.text, post.comments_count) == ('Новый текст', 5), (
+            'Проверьте, что изменение поста и прикрепление изображения '
+            'не перезаписывают `comments_count`.'
+        )
+        assert post.image
+
+    def test_recount_counters_command(self, post, group_1, comment_1_post,
+                                      comment_2_post, follow_1):
+        Post.objects.update(comments_count=5)
+        Group.objects.update(posts_count=0)
+        Comment.objects.filter(pk=comment_2_post.pk).delete()
+
+        call_command('recount_counters', batch_size=1)
+
+        post.refresh_from_db()
+        group_1.refresh_from_db()
+        assert (post.comments_count, group_1.posts_count) == (1, 1), (
+            'Проверьте, что команда `recount_counters` исправляет '
+            'разошедшиеся счетчики постов и групп.'
+        )
+        profile = Profile.objects.get(user=follow_1.following)
+        assert profile.followers_count == 1, (
+            'Проверьте, что команда `recount_counters` создает недостающие '
+            'профили и пересчитывает подписчиков.'
+        )
@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+from django.test import override_settings
+import pytest
+
+from posts.models import Follow, Post, TimelineEntry
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFeedAPI:
+
+    url = '/api/v1/feed/'
+
+    def get_feed_ids(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что GET-запрос авторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 200.'
+        )
+        return [item['id'] for item in response.json()['results']]
+
+    def test_feed_not_auth(self, client):
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_feed_backfilled_on_follow(self, user_client, post,
+                                       another_post, follow_1):
+        assert self.get_feed_ids(user_client) == [another_post.id], (
+            f'Проверьте, что `{self.url}` после подписки содержит посты '
+            'автора и не содержит чужих постов.'
+        )
+
+    def test_feed_fan_out_on_publish(self, user_client, another_user,
+                                     another_post, follow_1):
+        new_post = Post.objects.create(author=another_user, text='Новый')
+        assert self.get_feed_ids(user_client) == [
+            new_post.id, another_post.id
+        ], (
+            f'Проверьте, что новый пост автора попадает в начало `{self.url}` '
+            'его подписчиков.'
+        )
+
+    def test_feed_dropped_on_unfollow(self, user_client, another_post,
+                                      follow_1):
+        Follow.objects.filter(pk=follow_1.pk).delete()
+        assert self.get_feed_ids(user_client) == [], (
+            f'Проверьте, что после отписки посты автора удаляются из '
+            f'`{self.url}`.'
+        )
+
+    @override_settings(FEED_CELEBRITY_FOLLOWERS=2)
+    def test_feed_restored_below_celebrity_threshold(
+            self, user_client, user, user_2, another_user, follow_1,
+            follow_3):
+        post = Post.objects.create(author=another_user, text='Пост')
+        assert not TimelineEntry.objects.exists()
+
+        Follow.objects.filter(pk=follow_3.pk).delete()
+        assert list(TimelineEntry.objects.values_list(
+            'user_id', 'post_id'
+        )) == [(user.id, post.id)], (
+            'Проверьте, что после отписки, опустившей автора ниже '
+            '`FEED_CELEBRITY_FOLLOWERS`, его посты раздаются в ленты '
+            'оставшихся подписчиков.'
+        )
+        assert self.get_feed_ids(user_client) == [post.id]
+
+    @override_settings(FEED_CELEBRITY_FOLLOWERS=2)
+    def test_feed_restored_after_bulk_unfollow(self, user_client, user_2,
+                                               another_user, follow_1,
+                                               follow_3):
+        post = Post.objects.create(author=another_user, text='Пост')
+        user_client.post(
+            '/api/v1/follow/bulk/delete/',
+            data={'following': [another_user.username]},
+            format='json'
+        )
+        assert list(TimelineEntry.objects.values_list(
+            'user_id', 'post_id'
+        )) == [(user_2.id, post.id)], (
+            'Проверьте, что пакетная отписка, опустившая автора ниже '
+            '`FEED_CELEBRITY_FOLLOWERS`, раздает его посты в ленты '
+            'оставшихся подписчиков.'
+        )
+
+    @override_settings(FEED_CELEBRITY_FOLLOWERS=1)
+    def test_feed_merges_celebrity_posts(self, user_client, user, user_2,
+                                         another_user, post_2, follow_1,
+                                         follow_5):
+        posts = [
+            Post.objects.create(author=author, text=f'Пост {number}')
+            for number, author in enumerate(
+                (another_user, user_2, another_user, user_2)
+            )
+        ]
+        assert not TimelineEntry.objects.filter(user=user).exists(), (
+            'Проверьте, что посты авторов с числом подписчиков не меньше '
+            '`FEED_CELEBRITY_FOLLOWERS` не раздаются в ленты.'
+        )
+
+        received_ids = []
+        url = f'{self.url}?page_size=3'
+        while url:
+            response = user_client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что страницы `{self.url}` возвращают ответ со '
+                'статусом 200.'
+            )
+            test_data = response.json()
+            received_ids += [item['id'] for item in test_data['results']]
+            url = test_data['next']
+        assert received_ids == [post.id for post in reversed(posts)], (
+            f'Проверьте, что `{self.url}` сливает посты авторов-знаменитостей '
+            'в порядке публикации без повторов и пропусков.'
+        )
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSparseFieldsets:
+
+    @pytest.mark.parametrize('url, fields', (
+        ('/api/v1/posts/?fields=id,author', ['id', 'author']),
+        ('/api/v1/posts/?fields=text,id&limit=1', ['id', 'text']),
+        ('/api/v1/posts/?fields=group&page_size=1', ['group']),
+        ('/api/v1/posts/{post_id}/?fields=author,pub_date',
+         ['author', 'pub_date']),
+        ('/api/v1/posts/{post_id}/comments/?fields=author', ['author']),
+        ('/api/v1/posts/{post_id}/comments/{comment_id}/?fields=id,post',
+         ['id', 'post']),
+        ('/api/v1/groups/?fields=slug', ['slug']),
+        ('/api/v1/groups/{group_id}/?fields=id,title', ['id', 'title']),
+    ))
+    def test_fields_trim_output(self, user_client, post, post_2, group_1,
+                                comment_1_post, url, fields):
+        url = url.format(
+            post_id=post.id, comment_id=comment_1_post.id, group_id=group_1.id
+        )
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        test_data = response.json()
+        if isinstance(test_data, dict):
+            test_data = test_data.get('results', [test_data])
+        assert test_data and all(
+            list(item) == fields for item in test_data
+        ), (
+            f'Проверьте, что `{url}` возвращает только поля из параметра '
+            '`fields` в порядке полей сериализатора.'
+        )
+
+    def test_fields_narrow_columns(self, user_client, post, comment_1_post):
+        url = '/api/v1/posts/?fields=id,author'
+        with CaptureQueriesContext(connection) as context:
+            user_client.get(url)
+        select = next(
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "posts_post"' in query['sql']
+            and 'MAX(' not in query['sql']
+        )
+        assert '"posts_post"."text"' not in select, (
+            f'Проверьте, что `{url}` не читает колонки незапрошенных полей.'
+        )
+        assert 'posts_group' not in select, (
+            f'Проверьте, что `{url}` не присоединяет таблицы незапрошенных '
+            'полей.'
+        )
+
+    def test_fields_cursor_pagination(self, user_client, post, post_2):
+        response = user_client.get('/api/v1/posts/?fields=text&page_size=1')
+        next_url = response.json()['next']
+        assert next_url, (
+            'Проверьте, что курсорная пагинация работает с параметром '
+            '`fields`.'
+        )
+        response = user_client.get(next_url)
+        assert response.json()['results'] == [{'text': post.text}], (
+            'Проверьте, что вторая страница с `fields` содержит следующий '
+            'пост.'
+        )
+
+    def test_unknown_field(self, user_client, post):
+        url = '/api/v1/posts/?fields=id,password'
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{url}` с неизвестным полем '
+            'возвращает ответ со статусом 400.'
+        )
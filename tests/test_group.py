@@ -1,10 +1,16 @@
 from http import HTTPStatus
+import multiprocessing
 
 import pytest
 
+from api.cache import bump_version
 from posts.models import Group
 
 
+def bump_groups_version():
+    bump_version('groups')
+
+
 @pytest.mark.django_db(transaction=True)
 class TestGroupAPI:
 
@@ -113,3 +119,46 @@ class TestGroupAPI:
             'виде словаря.'
         )
         self.check_group_info(test_data, '/api/v1/groups/{group_id}/')
+
+    def test_group_list_cached(self, client, group_1,
+                               django_assert_num_queries):
+        client.get(self.group_url)
+        with django_assert_num_queries(0):
+            response = client.get(self.group_url)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что повторный GET-запрос к '
+            f'`{self.group_url}` возвращает ответ со статусом 200.'
+        )
+
+        group_3 = Group.objects.create(title='Группа 3', slug='group_3')
+        test_data = client.get(self.group_url).json()
+        assert group_3.id in [group['id'] for group in test_data], (
+            f'Проверьте, что кэш ответа `{self.group_url}` сбрасывается '
+            'при создании группы.'
+        )
+
+        Group.objects.filter(pk=group_3.pk).delete()
+        group_1.title = 'Новое название'
+        group_1.save()
+        response = client.get(
+            self.group_detail_url.format(group_id=group_1.id)
+        )
+        assert response.json()['title'] == group_1.title, (
+            f'Проверьте, что кэш ответа `{self.group_detail_url}` '
+            'сбрасывается при изменении группы.'
+        )
+
+    def test_group_cache_reset_in_all_processes(self, client, group_1):
+        client.get(self.group_url)
+        # Другой процесс меняет группу в базе и сбрасывает версию кэша.
+        Group.objects.filter(pk=group_1.pk).update(title='Новое название')
+        process = multiprocessing.get_context('fork').Process(
+            target=bump_groups_version
+        )
+        process.start()
+        process.join()
+        test_data = client.get(self.group_url).json()
+        assert test_data[0]['title'] == 'Новое название', (
+            f'Проверьте, что кэш ответа `{self.group_url}` сбрасывается '
+            'во всех процессах, а не только в процессе, изменившем группу.'
+        )
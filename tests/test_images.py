@@ -0,0 +1,115 @@
+from http import HTTPStatus
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+import pytest
+
+from posts.images import run_in_worker
+from posts.models import Post
+
+EXIF_ORIENTATION = 0x0112
+EXIF_MAKE = 0x010F
+
+
+@pytest.fixture
+def media_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WORKERS = 0
+    return settings
+
+
+def make_jpeg(width=1600, height=1000):
+    exif = Image.Exif()
+    exif[EXIF_MAKE] = 'Camera'
+    # Поворот на 90°: после обработки ширина и высота меняются местами.
+    exif[EXIF_ORIENTATION] = 6
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(
+        buffer, 'JPEG', exif=exif
+    )
+    return SimpleUploadedFile(
+        'photo.jpg', buffer.getvalue(), content_type='image/jpeg'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostImages:
+
+    url = '/api/v1/posts/'
+
+    def test_post_image_variants(self, user_client, media_settings):
+        response = user_client.post(
+            self.url, data={'text': 'Пост с фото', 'image': make_jpeg()}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.url}` с изображением '
+            'возвращает ответ со статусом 201.'
+        )
+        post = Post.objects.get(pk=response.json()['id'])
+
+        response = user_client.get(f'{self.url}{post.id}/')
+        variants = response.json()['image_variants']
+        assert set(variants) == set(media_settings.POST_IMAGE_VARIANTS), (
+            'Проверьте, что пост отдает ссылки на все варианты изображения '
+            'в поле `image_variants`.'
+        )
+        assert variants['thumbnail'].startswith('http://testserver/media/'), (
+            'Проверьте, что ссылки на варианты изображения абсолютные.'
+        )
+
+        post.refresh_from_db()
+        for name, (width, height) in (
+            media_settings.POST_IMAGE_VARIANTS.items()
+        ):
+            with default_storage.open(post.image_variants[name]) as file:
+                image = Image.open(file)
+                image.load()
+            assert image.width <= width and image.height <= height, (
+                f'Проверьте, что вариант `{name}` уменьшен до {width}x{height}.'
+            )
+            assert image.height > image.width, (
+                'Проверьте, что варианты повернуты по тегу EXIF Orientation.'
+            )
+            assert not image.getexif(), (
+                'Проверьте, что варианты изображения не содержат EXIF.'
+            )
+
+    def test_post_without_image(self, user_client, post):
+        response = user_client.get(f'{self.url}{post.id}/')
+        assert response.json()['image_variants'] == {}, (
+            'Проверьте, что у поста без изображения поле `image_variants` '
+            'пустое.'
+        )
+
+    def test_replaced_image_discards_stale_variants(self, user, media_settings):
+        post = Post.objects.create(author=user, text='Пост', image=make_jpeg())
+        post.refresh_from_db()
+        first_variants = post.image_variants
+        post.image = make_jpeg(200, 100)
+        post.save()
+        post.refresh_from_db()
+        assert post.image_variants['source'] == post.image.name, (
+            'Проверьте, что после замены изображения варианты строятся '
+            'заново.'
+        )
+        assert not any(
+            default_storage.exists(path)
+            for name, path in first_variants.items() if name != 'source'
+        ), (
+            'Проверьте, что файлы вариантов прежнего изображения удаляются.'
+        )
+
+    def test_worker_failure_logged(self, post, media_settings, caplog):
+        name = default_storage.save('posts/broken.jpg', ContentFile(b'x'))
+        Post.objects.filter(pk=post.pk).update(image=name)
+        run_in_worker(post.pk, name)
+        assert any(
+            record.levelname == 'ERROR' and record.exc_info
+            for record in caplog.records
+        ), (
+            'Проверьте, что ошибка обработки изображения в фоновом потоке '
+            'записывается в журнал.'
+        )
@@ -127,6 +127,45 @@ class TestPostAPI:
             db_post=db_post
         )
 
+    @pytest.mark.usefixtures('post', 'post_2', 'another_post')
+    def test_posts_get_cursor_paginated(self, user_client):
+        page_size = 2
+        response = user_client.get(
+            f'{self.post_list_url}?page_size={page_size}'
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Убедитесь, что GET-запрос с параметром `page_size` к '
+            f'`{self.post_list_url}` возвращает ответ со статусом 200.'
+        )
+        test_data = response.json()
+        assert isinstance(test_data, dict) and 'next' in test_data, (
+            'Убедитесь, что GET-запрос с параметром `page_size` к '
+            f'`{self.post_list_url}` возвращает страницу курсорной '
+            'пагинации со ссылкой `next`.'
+        )
+        assert 'count' not in test_data, (
+            'Убедитесь, что курсорная пагинация не считает общее '
+            'количество постов.'
+        )
+        received_ids = [item['id'] for item in test_data['results']]
+
+        response = user_client.get(test_data['next'])
+        assert response.status_code == HTTPStatus.OK, (
+            'Убедитесь, что ссылка `next` курсорной пагинации '
+            f'`{self.post_list_url}` возвращает ответ со статусом 200.'
+        )
+        test_data = response.json()
+        received_ids += [item['id'] for item in test_data['results']]
+        assert test_data['next'] is None, (
+            'Убедитесь, что последняя страница курсорной пагинации не '
+            'содержит ссылку `next`.'
+        )
+        expected_ids = list(Post.objects.values_list('id', flat=True))
+        assert received_ids == expected_ids, (
+            'Убедитесь, что курсорная пагинация возвращает все посты в '
+            'порядке `Post.Meta.ordering` без повторов и пропусков.'
+        )
+
     def test_post_create_auth_with_invalid_data(self, user_client):
         posts_count = Post.objects.count()
         response = user_client.post(self.post_list_url, data={})
@@ -0,0 +1,176 @@
+import multiprocessing
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+import pytest
+
+from api.cache import bump_version
+from posts.models import Comment, Follow, Post
+
+
+def bump_posts_version():
+    bump_version('posts')
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudget:
+
+    ROWS = 15
+    # Один запрос тратится на загрузку пользователя по JWT-токену,
+    # списки постов и комментариев добавляют запрос для ETag.
+    QUERY_BUDGETS = {
+        '/api/v1/posts/': 3,
+        '/api/v1/posts/?limit=10&offset=2': 4,
+        '/api/v1/posts/?page_size=10': 3,
+        '/api/v1/posts/{post_id}/': 2,
+        '/api/v1/posts/{post_id}/comments/': 3,
+        '/api/v1/posts/{post_id}/comments/{comment_id}/': 2,
+        '/api/v1/groups/': 2,
+        '/api/v1/follow/': 2,
+        # Знаменитости из подписок, лента и посты страницы.
+        '/api/v1/feed/': 4,
+    }
+
+    @pytest.fixture
+    def many_rows(self, django_user_model, user, group_1, group_2):
+        authors = django_user_model.objects.bulk_create(
+            django_user_model(username=f'author_{number}')
+            for number in range(self.ROWS)
+        )
+        posts = Post.objects.bulk_create(
+            Post(
+                author=author,
+                text=f'Пост {author.username}',
+                group=group_1 if number % 2 else group_2
+            )
+            for number, author in enumerate(authors)
+        )
+        post = posts[0]
+        comments = Comment.objects.bulk_create(
+            Comment(author=author, post=post, text='Коммент')
+            for author in authors
+        )
+        Follow.objects.bulk_create(
+            Follow(user=user, following=author) for author in authors
+        )
+        return post, comments[0]
+
+    @pytest.mark.parametrize('url', QUERY_BUDGETS)
+    def test_endpoint_query_budget(self, user_client, many_rows, url,
+                                   django_assert_max_num_queries):
+        post, comment = many_rows
+        with django_assert_max_num_queries(self.QUERY_BUDGETS[url]):
+            response = user_client.get(
+                url.format(post_id=post.id, comment_id=comment.id)
+            )
+        assert response.status_code == 200, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+
+    def test_comment_create_query_budget(self, user_client, post,
+                                         django_assert_max_num_queries):
+        # Пользователь, пост, затем вставка комментария и счетчик поста
+        # в одной транзакции (BEGIN и COMMIT тоже считаются).
+        with django_assert_max_num_queries(6):
+            response = user_client.post(
+                f'/api/v1/posts/{post.id}/comments/',
+                data={'text': 'Новый комментарий'}
+            )
+        assert response.status_code == 201, (
+            'Проверьте, что POST-запрос к `/api/v1/posts/{post_id}/comments/` '
+            'возвращает ответ со статусом 201.'
+        )
+
+    def test_comments_of_missing_post(self, user_client):
+        response = user_client.get('/api/v1/posts/100500/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что GET-запрос к комментариям несуществующего поста '
+            'возвращает ответ со статусом 404.'
+        )
+
+    @pytest.mark.parametrize(
+        'url', ('/api/v1/posts/', '/api/v1/posts/{post_id}/comments/')
+    )
+    def test_conditional_get(self, user_client, post, comment_1_post, url,
+                             django_assert_max_num_queries):
+        url = url.format(post_id=post.id)
+        response = user_client.get(url)
+        etag = response.headers.get('ETag')
+        assert etag and response.headers.get('Last-Modified'), (
+            f'Проверьте, что ответ `{url}` содержит заголовки `ETag` и '
+            '`Last-Modified`.'
+        )
+
+        # Пользователь и агрегат для ETag, без выборки и сериализации.
+        with django_assert_max_num_queries(2):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным `ETag` '
+            'возвращает ответ со статусом 304.'
+        )
+
+        comment_1_post.text = 'Изменённый комментарий'
+        comment_1_post.save()
+        post.text = 'Изменённый пост'
+        post.save()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Проверьте, что после изменения данных GET-запрос к `{url}` '
+            'со старым `ETag` возвращает ответ со статусом 200.'
+        )
+
+    def test_conditional_get_after_write_in_other_process(
+            self, user_client, post, another_post):
+        url = '/api/v1/posts/'
+        etag = user_client.get(url).headers['ETag']
+        # Другой процесс изменяет пост, не меняя MAX(pub_date), и сбрасывает
+        # версию; сигналы текущего процесса об этом не знают.
+        Post.objects.filter(pk=post.pk).update(text='Изменённый пост')
+        process = multiprocessing.get_context('fork').Process(
+            target=bump_posts_version
+        )
+        process.start()
+        process.join()
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Проверьте, что `ETag` ответа `{url}` меняется во всех '
+            'процессах после изменения поста в одном из них.'
+        )
+
+    def test_follow_create_without_pre_check(self, user_client, user,
+                                             another_user):
+        url = '/api/v1/follow/'
+        data = {'following': another_user.username}
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data=data)
+        assert response.status_code == 201, (
+            f'Проверьте, что POST-запрос к `{url}` возвращает ответ со '
+            'статусом 201.'
+        )
+        queries = [query['sql'] for query in context.captured_queries]
+        insert = next(
+            number for number, sql in enumerate(queries)
+            if sql.startswith('INSERT INTO "posts_follow"')
+        )
+        assert not any(
+            sql.startswith('SELECT') and 'FROM "posts_follow"' in sql
+            for sql in queries[:insert]
+        ), (
+            'Проверьте, что создание подписки не проверяет дубликат '
+            'отдельным запросом перед вставкой.'
+        )
+
+        for username, message in (
+            (another_user.username, 'Вы уже подписаны на этого пользователя'),
+            (user.username, 'Нельзя подписаться на самого себя'),
+        ):
+            response = user_client.post(url, data={'following': username})
+            assert response.status_code == 400, (
+                f'Проверьте, что нарушение ограничений подписки в `{url}` '
+                'возвращает ответ со статусом 400.'
+            )
+            assert response.json() == {'following': [message]}, (
+                f'Проверьте, что `{url}` сообщает, какое ограничение '
+                'подписки нарушено.'
+            )
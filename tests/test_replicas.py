@@ -0,0 +1,123 @@
+from http import HTTPStatus
+import sqlite3
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.core.cache import cache
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import AsyncClient, RequestFactory
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+import pytest
+
+from api.middleware import ReplicaRoutingMiddleware
+from api.routers import ReplicaRouter
+from posts.models import Post
+
+
+@pytest.fixture
+def replica(settings, tmp_path, user, another_user):
+    # Копия базы на момент фикстуры: дальнейшие записи в нее не попадают.
+    alias = 'replica_0'
+    path = tmp_path / 'replica.sqlite3'
+    connection.ensure_connection()
+    target = sqlite3.connect(path)
+    connection.connection.backup(target)
+    target.close()
+    # Соединение регистрируется напрямую, а не через DATABASES: изоляция
+    # тестов Django допускает такие динамические соединения.
+    replica_connection = DatabaseWrapper({
+        **connection.settings_dict,
+        'NAME': str(path),
+        'OPTIONS': {'init_command': 'PRAGMA query_only = ON'},
+    }, alias)
+    connections[alias] = replica_connection
+    settings.DATABASE_REPLICAS = [alias]
+    yield alias
+    replica_connection.close()
+    del connections[alias]
+
+
+@pytest.mark.django_db(transaction=True)
+class TestReplicaRouting:
+
+    url = '/api/v1/posts/'
+
+    def make_client(self, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+        )
+        return client
+
+    def test_reads_go_to_replica(self, user_client, another_user, replica):
+        another_client = self.make_client(another_user)
+        response = user_client.post(self.url, data={'text': 'Новый пост'})
+        assert response.status_code == HTTPStatus.CREATED
+        post_url = f'{self.url}{response.json()["id"]}/'
+
+        assert user_client.get(post_url).status_code == HTTPStatus.OK, (
+            'Проверьте, что сразу после записи автор читает из основной '
+            'базы и видит свой пост.'
+        )
+        assert another_client.get(post_url).status_code == (
+            HTTPStatus.NOT_FOUND
+        ), (
+            'Проверьте, что GET-запросы других пользователей читают из '
+            'реплики.'
+        )
+
+        # Окно после записи истекло.
+        cache.clear()
+        assert user_client.get(post_url).status_code == (
+            HTTPStatus.NOT_FOUND
+        ), (
+            'Проверьте, что после окна `DATABASE_REPLICA_STICKY_SECONDS` '
+            'автор снова читает из реплики.'
+        )
+
+    def test_writes_go_to_primary(self, user_client, replica):
+        response = user_client.post(self.url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что при настроенных репликах POST-запросы пишут в '
+            'основную базу.'
+        )
+
+    def test_async_reads_go_to_replica(self, user_client, another_user,
+                                       replica):
+        async def get_response(request):
+            return None
+
+        assert iscoroutinefunction(ReplicaRoutingMiddleware(get_response)), (
+            'Проверьте, что `ReplicaRoutingMiddleware` поддерживает '
+            'асинхронные запросы без перехода в поток.'
+        )
+        response = user_client.post(self.url, data={'text': 'Новый пост'})
+        post_url = f'/api/v1/async/posts/{response.json()["id"]}/'
+        token = AccessToken.for_user(another_user)
+        async_response = async_to_sync(AsyncClient().get)(
+            post_url, headers={'Authorization': f'Bearer {token}'}
+        )
+        assert async_response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что асинхронные GET-запросы читают из реплики.'
+        )
+
+    def test_one_replica_per_request(self, settings):
+        settings.DATABASE_REPLICAS = [
+            f'replica_{number}' for number in range(4)
+        ]
+        router = ReplicaRouter()
+        aliases = set()
+
+        def get_response(request):
+            aliases.update(router.db_for_read(Post) for _ in range(50))
+
+        ReplicaRoutingMiddleware(get_response)(
+            RequestFactory().get(self.url)
+        )
+        assert len(aliases) == 1 and aliases <= set(
+            settings.DATABASE_REPLICAS
+        ), (
+            'Проверьте, что все чтения одного запроса уходят в одну '
+            'реплику.'
+        )
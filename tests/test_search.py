@@ -0,0 +1,82 @@
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from django.core.management import call_command
+from django.db import connection
+import pytest
+
+from posts.models import Post
+from posts.search import SEARCH_TRIGGERS
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPostSearch:
+
+    url = '/api/v1/posts/'
+
+    def search(self, client, query, page_size=10):
+        received_ids = []
+        params = urlencode({'search': query, 'page_size': page_size})
+        url = f'{self.url}?{params}'
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что поиск по `{self.url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            test_data = response.json()
+            received_ids += [item['id'] for item in test_data['results']]
+            url = test_data['next']
+        return received_ids
+
+    def test_search_ranked(self, client, user):
+        rare = Post.objects.create(author=user, text='Кот')
+        frequent = Post.objects.create(author=user, text='Кот, кот и кот')
+        Post.objects.create(author=user, text='Собака')
+        assert self.search(client, 'кот', page_size=1) == [
+            frequent.id, rare.id
+        ], (
+            'Проверьте, что поиск возвращает только подходящие посты, '
+            'упорядоченные по релевантности, с курсорной пагинацией.'
+        )
+
+    def test_search_index_in_sync(self, client, user, post):
+        assert self.search(client, 'Тестовый') == [post.id]
+
+        post.text = 'Обновлённый текст'
+        post.save()
+        assert self.search(client, 'Тестовый') == [], (
+            'Проверьте, что поисковый индекс обновляется при изменении поста.'
+        )
+        assert self.search(client, 'обновлённый') == [post.id]
+
+        post.delete()
+        assert self.search(client, 'обновлённый') == [], (
+            'Проверьте, что поисковый индекс очищается при удалении поста.'
+        )
+
+    def test_search_syntax_is_escaped(self, client, post):
+        assert self.search(client, '"пост" OR NEAR(') == [], (
+            'Проверьте, что операторы FTS5 в поисковой строке не приводят '
+            'к ошибке.'
+        )
+
+    def test_triggers_restored_after_migrate(self, client, user):
+        # Так триггеры теряются при пересоздании таблицы posts_post.
+        with connection.cursor() as cursor:
+            for name in SEARCH_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+        post = Post.objects.create(author=user, text='Жираф')
+
+        call_command('migrate', verbosity=0)
+
+        assert self.search(client, 'жираф') == [post.id], (
+            'Проверьте, что после `migrate` поисковый индекс перестраивается '
+            'и находит посты, созданные без триггеров.'
+        )
+        post.text = 'Слон'
+        post.save()
+        assert self.search(client, 'слон') == [post.id], (
+            'Проверьте, что `migrate` создает недостающие триггеры '
+            'поискового индекса.'
+        )
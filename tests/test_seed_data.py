@@ -0,0 +1,96 @@
+from django.core.management import call_command
+from django.db import connection
+import pytest
+
+from posts.counters import recount_all
+from posts.feed import backfill_timelines
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.search import search_posts
+
+SIZES = {
+    'users': 50,
+    'groups': 3,
+    'posts': 300,
+    'comments': 500,
+    'follows': 150,
+}
+
+
+def schema_objects():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT type, name, sql FROM sqlite_master "
+            "WHERE type IN ('index', 'trigger') ORDER BY name"
+        )
+        return cursor.fetchall()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestSeedData:
+
+    def seed(self, **options):
+        call_command(
+            'seed_data', batch_size=40, transaction_size=100,
+            **{**SIZES, **options}
+        )
+
+    def test_seed_data(self, user):
+        schema = schema_objects()
+        self.seed()
+
+        assert Post.objects.count() == SIZES['posts'], (
+            'Проверьте, что команда `seed_data` создает заданное число '
+            'постов.'
+        )
+        assert Comment.objects.count() == SIZES['comments']
+        assert Follow.objects.exists()
+        assert schema_objects() == schema, (
+            'Проверьте, что команда `seed_data` восстанавливает индексы '
+            'и триггеры после загрузки.'
+        )
+        assert not any(recount_all(100).values()), (
+            'Проверьте, что команда `seed_data` пересчитывает счетчики.'
+        )
+        assert search_posts(Post.objects.all(), 'море').exists(), (
+            'Проверьте, что команда `seed_data` перестраивает поисковый '
+            'индекс.'
+        )
+        assert Post.objects.dates('pub_date', 'day').count() > 1, (
+            'Проверьте, что даты постов распределены по периоду.'
+        )
+
+        follow = Follow.objects.order_by('pk').first()
+        expected = set(
+            TimelineEntry.objects.filter(user=follow.user).values_list(
+                'post_id', flat=True
+            )
+        )
+        TimelineEntry.objects.filter(user=follow.user).delete()
+        backfill_timelines(
+            follow.user_id,
+            list(follow.user.follower.values_list('following_id', flat=True))
+        )
+        assert set(
+            TimelineEntry.objects.filter(user=follow.user).values_list(
+                'post_id', flat=True
+            )
+        ) == expected, (
+            'Проверьте, что команда `seed_data` заполняет ленты так же, '
+            'как подписка.'
+        )
+
+    def test_seed_data_reproducible(self, django_user_model):
+        self.seed(seed=7)
+        first = list(Post.objects.order_by('pk').values_list(
+            'author__username', 'group__slug', 'text'
+        ))
+        django_user_model.objects.all().delete()
+        Group.objects.all().delete()
+
+        self.seed(seed=7)
+        assert list(Post.objects.order_by('pk').values_list(
+            'author__username', 'group__slug', 'text'
+        )) == first, (
+            'Проверьте, что команда `seed_data` с одинаковым зерном '
+            'создает одинаковые данные.'
+        )
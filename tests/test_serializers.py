@@ -0,0 +1,52 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+import pytest
+
+from api.fast_serializers import (
+    CommentValuesSerializer,
+    PostValuesSerializer
+)
+from api.serializers import CommentSerializer, PostSerializer
+from posts.models import Comment, Post
+
+
+@pytest.mark.django_db(transaction=True)
+class TestValuesSerializers:
+
+    @pytest.fixture
+    def context(self):
+        return {'request': Request(APIRequestFactory().get('/api/v1/posts/'))}
+
+    @pytest.fixture
+    def posts(self, post, another_post, comment_1_post, comment_2_post):
+        Post.objects.filter(pk=post.pk).update(
+            image='posts/photo.jpg',
+            image_variants={
+                'source': 'posts/photo.jpg',
+                'thumbnail': 'posts/variants/1/photo_thumbnail.jpg',
+            }
+        )
+        Post.objects.filter(pk=another_post.pk).update(
+            image='posts/new.jpg',
+            image_variants={'source': 'posts/old.jpg'}
+        )
+
+    @pytest.mark.parametrize('serializer, values_serializer, queryset', (
+        (PostSerializer, PostValuesSerializer,
+         Post.objects.select_related('author', 'group')),
+        (CommentSerializer, CommentValuesSerializer,
+         Comment.objects.select_related('author')),
+    ))
+    def test_values_serializer_output(self, posts, context, serializer,
+                                      values_serializer, queryset):
+        expected = JSONRenderer().render(
+            serializer(queryset.all(), many=True, context=context).data
+        )
+        rows = values_serializer.values(queryset.all())
+        assert JSONRenderer().render(
+            values_serializer(rows, context=context).data
+        ) == expected, (
+            f'Проверьте, что `{values_serializer.__name__}` возвращает тот '
+            f'же JSON, что и `{serializer.__name__}`.'
+        )
@@ -0,0 +1,76 @@
+from http import HTTPStatus
+import multiprocessing
+
+import pytest
+
+from api.throttling import get_table
+
+
+@pytest.fixture
+def write_rates(settings):
+    rates = {'user_write': '2/min', 'ip_write': '100/min'}
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates
+    }
+    return rates
+
+
+def take_tokens(count):
+    table = get_table()
+    return sum(
+        not table.take('shared', 60, 1e-6, 1000.0) for _ in range(count)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWriteThrottling:
+
+    def test_user_write_throttled(self, user_client, another_user, post,
+                                  write_rates):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        for _ in range(2):
+            response = user_client.post(url, data={'text': 'Комментарий'})
+            assert response.status_code == HTTPStatus.CREATED
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что запись сверх частоты `user_write` возвращает '
+            'ответ со статусом 429.'
+        )
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 сообщает время ожидания '
+            'в заголовке `Retry-After`.'
+        )
+        assert user_client.get(url).status_code == HTTPStatus.OK, (
+            'Проверьте, что чтение не ограничивается.'
+        )
+
+        user_client.force_authenticate(another_user)
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'Пост другого автора'}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что корзина `user_write` своя у каждого '
+            'пользователя.'
+        )
+
+    def test_ip_write_throttled(self, user_client, another_user,
+                                write_rates):
+        write_rates.update(user_write='100/min', ip_write='2/min')
+        url = '/api/v1/posts/'
+        for _ in range(2):
+            response = user_client.post(url, data={'text': 'Пост'})
+            assert response.status_code == HTTPStatus.CREATED
+        user_client.force_authenticate(another_user)
+        response = user_client.post(url, data={'text': 'Пост'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что запись сверх частоты `ip_write` с одного '
+            'адреса возвращает ответ со статусом 429.'
+        )
+
+    def test_table_shared_between_processes(self):
+        with multiprocessing.get_context('fork').Pool(2) as pool:
+            allowed = sum(pool.map(take_tokens, (50, 50)))
+        assert allowed == 60, (
+            'Проверьте, что корзины ограничения записи общие для всех '
+            'процессов на хосте.'
+        )
@@ -0,0 +1,217 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import BytesIO
+import os
+
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+import pytest
+
+from posts.models import ImageUpload
+from posts.uploads import (
+    UploadOffsetMismatch,
+    append_chunk,
+    finish_upload,
+    get_upload_path,
+    start_upload
+)
+
+
+@pytest.fixture
+def upload_settings(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.POST_IMAGE_WORKERS = 0
+    settings.UPLOAD_CHUNK_SIZE = 1024
+    return settings
+
+
+@pytest.fixture
+def png_bytes():
+    buffer = BytesIO()
+    Image.effect_noise((200, 200), 64).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestImageUploadAPI:
+
+    url = '/api/v1/uploads/'
+
+    def start(self, client, size, filename='photo.png'):
+        response = client.post(
+            self.url, data={'filename': filename, 'total_size': size}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{self.url}` создает загрузку и '
+            'возвращает ответ со статусом 201.'
+        )
+        return response.json()['id']
+
+    def send(self, client, upload_id, offset, chunk):
+        return client.patch(
+            f'{self.url}{upload_id}/',
+            data=chunk,
+            content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_upload_not_auth(self, client):
+        response = client.post(self.url, data={'total_size': 10})
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            f'Проверьте, что POST-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+
+    def test_resumable_upload(self, user_client, post, upload_settings,
+                              png_bytes):
+        upload_id = self.start(user_client, len(png_bytes))
+        half = len(png_bytes) // 2
+        response = self.send(user_client, upload_id, 0, png_bytes[:half])
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что PATCH-запрос к `{self.url}{{id}}/` принимает '
+            'часть файла и возвращает ответ со статусом 200.'
+        )
+        assert response.json()['content_type'] == 'image/png', (
+            'Проверьте, что тип изображения определяется по первым байтам '
+            'файла.'
+        )
+
+        response = self.send(user_client, upload_id, 0, png_bytes[:half])
+        assert response.status_code == HTTPStatus.CONFLICT, (
+            'Проверьте, что часть с неверным `Upload-Offset` отклоняется '
+            'со статусом 409.'
+        )
+        response = user_client.head(f'{self.url}{upload_id}/')
+        assert response.headers['Upload-Offset'] == str(half), (
+            'Проверьте, что HEAD-запрос к загрузке сообщает принятое '
+            'смещение в заголовке `Upload-Offset`.'
+        )
+
+        response = user_client.post(
+            f'{self.url}{upload_id}/finish/', data={'post': post.id}
+        )
+        assert response.status_code == HTTPStatus.CONFLICT, (
+            'Проверьте, что незавершенную загрузку нельзя прикрепить к посту.'
+        )
+
+        self.send(user_client, upload_id, half, png_bytes[half:])
+        response = user_client.post(
+            f'{self.url}{upload_id}/finish/', data={'post': post.id}
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что POST-запрос к `{self.url}{{id}}/finish/` '
+            'прикрепляет изображение и возвращает ответ со статусом 200.'
+        )
+        post.refresh_from_db()
+        with post.image.open() as file:
+            assert file.read() == png_bytes, (
+                'Проверьте, что к посту прикрепляется собранный из частей '
+                'файл.'
+            )
+        assert not ImageUpload.objects.exists(), (
+            'Проверьте, что завершенная загрузка удаляется.'
+        )
+        assert not list((upload_settings.MEDIA_ROOT / 'uploads').iterdir()), (
+            'Проверьте, что файл частей удаляется после завершения загрузки.'
+        )
+
+    def test_stale_chunk_keeps_received_bytes(self, user, upload_settings,
+                                              png_bytes):
+        upload = start_upload(user.pk, 'photo.png', len(png_bytes))
+        stale = ImageUpload.objects.get(pk=upload.pk)
+        half = len(png_bytes) // 2
+        append_chunk(upload, 0, BytesIO(png_bytes[:half]))
+
+        with pytest.raises(UploadOffsetMismatch):
+            append_chunk(stale, 0, BytesIO(b'\0' * half))
+        assert get_upload_path(upload).read_bytes() == png_bytes[:half], (
+            'Проверьте, что часть с уже принятым смещением не '
+            'перезаписывает файл загрузки.'
+        )
+        assert stale.offset == half
+
+    def test_upload_rejects_non_image(self, user_client, upload_settings):
+        upload_id = self.start(user_client, 100, 'script.png')
+        response = self.send(user_client, upload_id, 0, b'#!/bin/sh\n' * 10)
+        assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE, (
+            'Проверьте, что файл с сигнатурой не изображения отклоняется '
+            'со статусом 415.'
+        )
+        assert not ImageUpload.objects.exists(), (
+            'Проверьте, что загрузка не изображения отменяется.'
+        )
+
+    def test_upload_rejects_extra_bytes(self, user_client, upload_settings,
+                                        png_bytes):
+        upload_id = self.start(user_client, 100)
+        response = self.send(user_client, upload_id, 0, png_bytes[:200])
+        assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE, (
+            'Проверьте, что часть, выходящая за объявленный размер, '
+            'отклоняется со статусом 413.'
+        )
+        assert response.json()['offset'] == 0, (
+            'Проверьте, что отклоненная часть не сдвигает смещение загрузки.'
+        )
+
+    def test_upload_size_limit(self, user_client, upload_settings):
+        response = user_client.post(self.url, data={
+            'filename': 'big.png',
+            'total_size': upload_settings.POST_IMAGE_MAX_SIZE + 1
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что загрузку больше `POST_IMAGE_MAX_SIZE` нельзя '
+            'начать.'
+        )
+
+    def test_finish_foreign_post(self, user_client, another_post,
+                                 upload_settings, png_bytes):
+        upload_id = self.start(user_client, len(png_bytes))
+        self.send(user_client, upload_id, 0, png_bytes)
+        response = user_client.post(
+            f'{self.url}{upload_id}/finish/', data={'post': another_post.id}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что изображение нельзя прикрепить к чужому посту.'
+        )
+
+    def test_finish_keeps_file_on_rollback(self, post, upload_settings,
+                                           png_bytes):
+        upload = start_upload(post.author_id, 'photo.png', len(png_bytes))
+        append_chunk(upload, 0, BytesIO(png_bytes))
+        path = get_upload_path(upload)
+
+        with pytest.raises(RuntimeError), transaction.atomic():
+            finish_upload(upload, post)
+            raise RuntimeError
+        assert path.exists() and ImageUpload.objects.exists(), (
+            'Проверьте, что файл частей удаляется только после фиксации '
+            'транзакции и остается вместе с загрузкой при откате.'
+        )
+
+    def test_expire_uploads_command(self, user, upload_settings,
+                                    png_bytes):
+        expired = start_upload(user.pk, 'old.png', len(png_bytes))
+        fresh = start_upload(user.pk, 'new.png', len(png_bytes))
+        for upload in (expired, fresh):
+            append_chunk(upload, 0, BytesIO(png_bytes[:100]))
+        cutoff = timezone.now() - timedelta(
+            seconds=upload_settings.UPLOAD_EXPIRE_SECONDS + 1
+        )
+        ImageUpload.objects.filter(pk=expired.pk).update(created=cutoff)
+        orphan = get_upload_path(expired).with_name('orphan.part')
+        orphan.write_bytes(b'\0')
+        os.utime(orphan, (cutoff.timestamp(), cutoff.timestamp()))
+
+        call_command('expire_uploads')
+
+        assert list(ImageUpload.objects.values_list('pk', flat=True)) == [
+            fresh.pk
+        ], 'Проверьте, что команда `expire_uploads` удаляет старые загрузки.'
+        assert list(
+            (upload_settings.MEDIA_ROOT / 'uploads').iterdir()
+        ) == [get_upload_path(fresh)], (
+            'Проверьте, что команда `expire_uploads` удаляет файлы частей '
+            'старых загрузок и файлы без загрузки.'
+        )
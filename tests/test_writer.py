@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+import threading
+
+from django.db import IntegrityError, connection
+import pytest
+
+from posts.models import Comment, Group, Post
+from posts.writer import run_write
+
+
+@pytest.fixture
+def write_queue(settings):
+    settings.WRITE_QUEUE_ENABLED = True
+    settings.WRITE_QUEUE_INTERVAL = 0.2
+    return settings
+
+
+@pytest.mark.django_db(transaction=True)
+class TestWriteQueue:
+
+    def test_writes_coalesced_into_one_transaction(self, write_queue, user):
+        barrier = threading.Barrier(5)
+        transactions = []
+
+        def create(number):
+            def write():
+                transactions.append(id(connection.atomic_blocks[0]))
+                return Post.objects.create(author=user, text=f'Пост {number}')
+
+            barrier.wait()
+            return run_write(write)
+
+        with ThreadPoolExecutor(5) as executor:
+            posts = list(executor.map(create, range(5)))
+
+        assert [post.text for post in posts] == [
+            f'Пост {number}' for number in range(5)
+        ], (
+            'Проверьте, что каждый запрос получает созданную им запись '
+            'после фиксации пакета.'
+        )
+        assert Post.objects.count() == 5
+        assert len(set(transactions)) == 1, (
+            'Проверьте, что записи, поступившие за интервал очереди, '
+            'выполняются в одной транзакции.'
+        )
+
+    def test_failed_write_does_not_roll_back_batch(self, write_queue, user):
+        barrier = threading.Barrier(2)
+
+        def create():
+            barrier.wait()
+            return run_write(
+                lambda: Post.objects.create(author=user, text='Пост')
+            )
+
+        def fail():
+            barrier.wait()
+            return run_write(
+                lambda: Post.objects.create(author=user, text=None)
+            )
+
+        with ThreadPoolExecutor(2) as executor:
+            created = executor.submit(create)
+            failed = executor.submit(fail)
+            with pytest.raises(IntegrityError):
+                failed.result()
+            post = created.result()
+
+        assert Post.objects.filter(pk=post.pk).exists(), (
+            'Проверьте, что ошибка одной записи в очереди не откатывает '
+            'остальные записи пакета.'
+        )
+
+    def test_foreign_key_error_does_not_roll_back_batch(self, write_queue,
+                                                        user):
+        barrier = threading.Barrier(2)
+
+        def create():
+            barrier.wait()
+            return run_write(
+                lambda: Post.objects.create(author=user, text='Пост')
+            )
+
+        def dangling():
+            barrier.wait()
+            return run_write(
+                lambda: Comment.objects.create(
+                    author=user, post_id=10 ** 6, text='Комментарий'
+                )
+            )
+
+        with ThreadPoolExecutor(2) as executor:
+            created = executor.submit(create)
+            failed = executor.submit(dangling)
+            with pytest.raises(IntegrityError):
+                failed.result()
+            post = created.result()
+
+        assert Post.objects.filter(pk=post.pk).exists(), (
+            'Проверьте, что ошибка внешнего ключа при фиксации пакета '
+            'не отменяет остальные записи.'
+        )
+        assert not Comment.objects.exists()
+
+    def test_timed_out_write_is_cancelled(self, write_queue, user):
+        write_queue.WRITE_QUEUE_INTERVAL = 0
+        write_queue.WRITE_QUEUE_TIMEOUT = 0.5
+        running = threading.Event()
+        release = threading.Event()
+
+        def block():
+            running.set()
+            release.wait(5)
+            return Post.objects.create(author=user, text='Первый')
+
+        with ThreadPoolExecutor(1) as executor:
+            blocked = executor.submit(run_write, block)
+            running.wait(5)
+            with pytest.raises(TimeoutError):
+                run_write(
+                    lambda: Post.objects.create(author=user, text='Второй')
+                )
+            release.set()
+            assert blocked.result().text == 'Первый', (
+                'Проверьте, что уже выполняемая запись после таймаута '
+                'дожидается фиксации и возвращает результат.'
+            )
+
+        write_queue.WRITE_QUEUE_TIMEOUT = 5
+        run_write(lambda: Post.objects.create(author=user, text='Третий'))
+        assert set(Post.objects.values_list('text', flat=True)) == {
+            'Первый', 'Третий'
+        }, (
+            'Проверьте, что запись, не дождавшаяся очереди, отменяется и '
+            'не фиксируется после ошибки.'
+        )
+
+    def test_api_create_through_queue(self, write_queue, user_client, post,
+                                      group_1):
+        url = f'/api/v1/posts/{post.id}/comments/'
+        response = user_client.post(url, data={'text': 'Комментарий'})
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос к `{url}` при включенной очереди '
+            'записи возвращает ответ со статусом 201.'
+        )
+        assert Comment.objects.filter(pk=response.json()['id']).exists()
+        post.refresh_from_db()
+        assert post.comments_count == 1, (
+            'Проверьте, что при включенной очереди записи счетчик '
+            'комментариев поста обновляется.'
+        )
+
+        response = user_client.post(
+            '/api/v1/posts/', data={'text': 'Пост', 'group': group_1.id}
+        )
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что POST-запрос к `/api/v1/posts/` при включенной '
+            'очереди записи возвращает ответ со статусом 201.'
+        )
+        assert Group.objects.get(pk=group_1.pk).posts_count == 1, (
+            'Проверьте, что при включенной очереди записи счетчик постов '
+            'группы обновляется.'
+        )
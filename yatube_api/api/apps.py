@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self) -> None:
+        """Подключает обработчики сигналов приложения."""
+        import api.signals  # noqa: F401
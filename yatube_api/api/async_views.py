@@ -0,0 +1,281 @@
+"""
+Асинхронные представления чтения для работы под ASGI.
+
+Повторяют ответы list и retrieve синхронных ViewSet, но читают базу
+асинхронным ORM (`aiterator`, `aget`, `acount`) и не занимают поток
+из пула на время запроса. Связанные объекты загружаются через
+select_related, поэтому сериализация не обращается к базе.
+"""
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import QuerySet
+from django.http import HttpRequest, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.filters import SearchFilter
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api.authentication import CachedJWTAuthentication
+from api.serializers import (
+    CommentSerializer,
+    FollowSerializer,
+    GroupSerializer,
+    PostSerializer
+)
+from posts.models import Comment, Follow, Group, Post
+
+
+class AsyncReadOnlyView(View):
+    """
+    Базовое представление списка и объекта для асинхронного чтения.
+
+    Объект запрашивается, если в URL передан `lookup_url_kwarg`,
+    иначе возвращается список. Пагинация — `limit` и `offset`.
+    """
+
+    queryset = None
+    serializer_class = None
+    authentication = CachedJWTAuthentication()
+    require_authentication = False
+    lookup_url_kwarg = 'pk'
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Получает набор объектов представления, как GenericAPIView:
+        `all()` не дает запросам делить кэш результатов `queryset`.
+        Returns:
+            QuerySet: Набор объектов
+        """
+        return self.queryset.all()
+
+    async def get(self, request: HttpRequest, **kwargs: Any) -> HttpResponse:
+        """
+        Возвращает список или объект в формате синхронного API.
+        Args:
+            request: Объект запроса
+        Returns:
+            HttpResponse: JSON-ответ
+        """
+        self.drf_request = Request(request)
+        try:
+            self.user = await self.authenticate(request)
+            if self.lookup_url_kwarg in kwargs:
+                data = await self.retrieve(kwargs[self.lookup_url_kwarg])
+            else:
+                data = await self.list()
+        except exceptions.APIException as exc:
+            return self.error_response(exc)
+        return self.render(data)
+
+    async def authenticate(self, request: HttpRequest) -> Any:
+        """
+        Определяет пользователя по JWT-токену.
+        Args:
+            request: Объект запроса
+        Returns:
+            User: Пользователь или AnonymousUser
+        Raises:
+            NotAuthenticated: Токен обязателен, но не передан
+        """
+        result = await sync_to_async(self.authentication.authenticate)(
+            request
+        )
+        if result is not None:
+            return result[0]
+        if self.require_authentication:
+            raise exceptions.NotAuthenticated()
+        return AnonymousUser()
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Фильтрует набор по параметрам запроса.
+        Args:
+            queryset: Набор объектов
+        Returns:
+            QuerySet: Отфильтрованный набор
+        """
+        return queryset
+
+    async def list(self) -> Any:
+        """
+        Получает список объектов, постранично при переданном `limit`.
+        Returns:
+            Any: Данные ответа
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        paginator = LimitOffsetPagination()
+        limit = paginator.get_limit(self.drf_request)
+        if limit is None:
+            objects = [obj async for obj in queryset.aiterator()]
+            await self.check_empty_list(objects)
+            return self.serialize(objects, many=True)
+
+        paginator.request = self.drf_request
+        paginator.limit = limit
+        paginator.offset = paginator.get_offset(self.drf_request)
+        paginator.count = await queryset.acount()
+        objects = [
+            obj async for obj in
+            queryset[paginator.offset:paginator.offset + limit]
+        ]
+        await self.check_empty_list(objects)
+        return paginator.get_paginated_response(
+            self.serialize(objects, many=True)
+        ).data
+
+    async def check_empty_list(self, objects: list) -> None:
+        """
+        Проверяет пустой список, например существование родителя.
+        Args:
+            objects: Объекты страницы
+        """
+
+    async def retrieve(self, pk: Any) -> Any:
+        """
+        Получает объект по первичному ключу.
+        Args:
+            pk: Первичный ключ
+        Returns:
+            Any: Данные ответа
+        Raises:
+            NotFound: Объект не найден
+        """
+        queryset = self.get_queryset()
+        try:
+            obj = await queryset.aget(pk=pk)
+        except queryset.model.DoesNotExist:
+            raise exceptions.NotFound(
+                f'No {queryset.model._meta.object_name} matches the given '
+                'query.'
+            )
+        return self.serialize(obj)
+
+    def serialize(self, instance: Any, many: bool = False) -> Any:
+        """
+        Сериализует объекты сериализатором синхронного API.
+        Args:
+            instance: Объект или список объектов
+            many: Передан список
+        Returns:
+            Any: Данные ответа
+        """
+        return self.serializer_class(
+            instance,
+            many=many,
+            context={'request': self.drf_request, 'view': self}
+        ).data
+
+    def render(self, data: Any, status: int = 200,
+               headers: Optional[dict] = None) -> HttpResponse:
+        """
+        Формирует JSON-ответ тем же рендерером, что и DRF.
+        Args:
+            data: Данные ответа
+            status: Код ответа
+            headers: Дополнительные заголовки
+        Returns:
+            HttpResponse: Ответ
+        """
+        return HttpResponse(
+            JSONRenderer().render(data),
+            status=status,
+            headers=headers,
+            content_type='application/json'
+        )
+
+    def error_response(self, exc: exceptions.APIException) -> HttpResponse:
+        """
+        Формирует ответ об ошибке как обработчик исключений DRF.
+        Args:
+            exc: Исключение API
+        Returns:
+            HttpResponse: Ответ с описанием ошибки
+        """
+        headers = None
+        if isinstance(exc, (exceptions.NotAuthenticated,
+                            exceptions.AuthenticationFailed)):
+            headers = {
+                'WWW-Authenticate':
+                    self.authentication.authenticate_header(self.request)
+            }
+        if isinstance(exc.detail, (list, dict)):
+            data = exc.detail
+        else:
+            data = {'detail': exc.detail}
+        return self.render(data, status=exc.status_code, headers=headers)
+
+
+class AsyncPostView(AsyncReadOnlyView):
+    """Асинхронное чтение постов."""
+
+    queryset = Post.objects.select_related('author', 'group')
+    serializer_class = PostSerializer
+
+
+class AsyncGroupView(AsyncReadOnlyView):
+    """Асинхронное чтение групп."""
+
+    queryset = Group.objects.all()
+    serializer_class = GroupSerializer
+
+
+class AsyncCommentView(AsyncReadOnlyView):
+    """Асинхронное чтение комментариев поста."""
+
+    serializer_class = CommentSerializer
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Получает комментарии поста из URL.
+        Returns:
+            QuerySet: Набор комментариев
+        """
+        return Comment.objects.filter(
+            post_id=self.kwargs['post_id']
+        ).select_related('author')
+
+    async def check_empty_list(self, objects: list) -> None:
+        """
+        Отличает пост без комментариев от несуществующего поста.
+        Args:
+            objects: Комментарии страницы
+        Raises:
+            NotFound: Пост не найден
+        """
+        if not objects and not await Post.objects.filter(
+            pk=self.kwargs['post_id']
+        ).aexists():
+            raise exceptions.NotFound('No Post matches the given query.')
+
+
+class AsyncFollowView(AsyncReadOnlyView):
+    """Асинхронное чтение подписок текущего пользователя."""
+
+    serializer_class = FollowSerializer
+    require_authentication = True
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Получает подписки пользователя из токена.
+        Returns:
+            QuerySet: Набор подписок
+        """
+        return Follow.objects.filter(user=self.user).select_related(
+            'user', 'following'
+        )
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Ищет по имени автора, как SearchFilter синхронного API.
+        Args:
+            queryset: Набор подписок
+        Returns:
+            QuerySet: Отфильтрованный набор
+        """
+        for term in SearchFilter().get_search_terms(self.drf_request):
+            queryset = queryset.filter(following__username__icontains=term)
+        return queryset
@@ -0,0 +1,137 @@
+"""
+Аутентификация по JWT с кэшированием пользователей.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from api.cache import get_version
+
+
+class LRUCache:
+    """Потокобезопасный LRU-кэш процесса с ограниченным временем жизни."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        """
+        Args:
+            maxsize: Максимальное число записей
+            ttl: Время жизни записи в секундах
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Получает значение и отмечает его как недавно использованное.
+
+        Args:
+            key: Ключ
+        Returns:
+            Any: Значение или None, если его нет или оно устарело
+        """
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Сохраняет значение, вытесняя самую старую запись при переполнении.
+
+        Args:
+            key: Ключ
+            value: Значение
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """Удаляет все записи."""
+        with self._lock:
+            self._data.clear()
+
+
+user_cache = LRUCache(
+    settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL
+)
+
+
+def auth_namespace(user_id: Any) -> str:
+    """
+    Формирует пространство имен версии учетных данных пользователя.
+
+    Args:
+        user_id: Идентификатор пользователя
+    Returns:
+        str: Пространство имен
+    """
+    return f'user:{user_id}'
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, берущая пользователя из кэша процесса.
+
+    Ключ кэша — идентификатор пользователя и версия его учетных данных.
+    Сохранение или удаление пользователя (смена пароля, деактивация)
+    увеличивает версию, и следующий запрос снова читает пользователя из БД.
+    """
+
+    def get_user(self, validated_token: Token) -> Any:
+        """
+        Получает пользователя по токену без запроса к БД при попадании в кэш.
+
+        Args:
+            validated_token: Проверенный токен
+        Returns:
+            User: Копия пользователя
+        Raises:
+            InvalidToken: Если в токене нет идентификатора пользователя
+            AuthenticationFailed: Если пользователь не найден, неактивен
+                или токен отозван сменой пароля
+        """
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+
+        key = (user_id, get_version(auth_namespace(user_id)))
+        user = user_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set(key, user)
+        elif api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code='password_changed'
+            )
+        # Копия не дает запросам делить изменяемый объект пользователя.
+        return copy.copy(user)
@@ -0,0 +1,95 @@
+"""
+Версионированные ключи кэша ответов API.
+
+Версия пространства имен хранится в самом кэше. Изменение данных
+увеличивает версию, и все процессы, читающие общий кэш, перестают
+находить старые ключи без блокировок и рассылки уведомлений.
+"""
+import time
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _version_key(namespace: str) -> str:
+    """
+    Формирует ключ версии пространства имен.
+
+    Args:
+        namespace: Пространство имен кэша
+    Returns:
+        str: Ключ версии
+    """
+    return f'api:version:{namespace}'
+
+
+def get_version(namespace: str) -> int:
+    """
+    Получает текущую версию пространства имен.
+
+    Args:
+        namespace: Пространство имен кэша
+    Returns:
+        int: Версия
+    """
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Начальная версия от времени не совпадет с вытесненной.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_modified(namespace: str) -> Optional[float]:
+    """
+    Получает время последнего изменения данных пространства имен.
+
+    Args:
+        namespace: Пространство имен кэша
+    Returns:
+        float | None: Метка времени или None, если она неизвестна
+    """
+    return cache.get(f'api:modified:{namespace}')
+
+
+def bump_version(namespace: str) -> None:
+    """
+    Увеличивает версию, делая недоступными все ключи пространства имен.
+
+    Args:
+        namespace: Пространство имен кэша
+    """
+    key = _version_key(namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+    cache.set(f'api:modified:{namespace}', time.time(), timeout=None)
+
+
+def bump_version_on_commit(namespace: str) -> None:
+    """
+    Увеличивает версию после фиксации текущей транзакции.
+    Изменения через `QuerySet.update()` и `bulk_create` не отправляют
+    сигналы, поэтому версию меняет код, который их выполняет.
+
+    Args:
+        namespace: Пространство имен кэша
+    """
+    transaction.on_commit(lambda: bump_version(namespace))
+
+
+def make_key(namespace: str, *parts: object) -> str:
+    """
+    Формирует ключ кэша для текущей версии пространства имен.
+
+    Args:
+        namespace: Пространство имен кэша
+        parts: Составные части ключа
+    Returns:
+        str: Ключ кэша
+    """
+    suffix = ':'.join(str(part) for part in parts)
+    return f'api:{namespace}:{get_version(namespace)}:{suffix}'
@@ -0,0 +1,175 @@
+"""
+Сериализаторы списков, читающие строки из values().
+
+ModelSerializer на каждую строку создает экземпляр модели и проходит
+по объектам полей. Для списков строки берутся через `values()` вместе
+с именами авторов из JOIN и сразу собираются в словари с теми же
+ключами, в том же порядке и с тем же форматом значений, поэтому JSON
+ответа совпадает побайтно. Только для чтения.
+"""
+from typing import Any, Callable, Iterable, Optional
+
+from django.core.files.storage import default_storage
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+from api.serializers import build_variant_urls
+
+# Поле DRF используется только для форматирования дат, без привязки
+# к сериализатору.
+datetime_field = serializers.DateTimeField()
+
+
+class ValuesSerializer:
+    """
+    Базовый сериализатор списка строк values().
+
+    Поле `name` берется из колонки `name`, если у класса нет метода
+    `represent_<name>`. Колонки, которые читает поле, задает
+    `field_lookups`; по умолчанию это колонка с именем поля.
+    """
+
+    field_names: tuple[str, ...] = ()
+    field_lookups: dict[str, tuple[str, ...]] = {}
+
+    def __init__(self, rows: Iterable[dict], context: Optional[dict] = None,
+                 fields: Optional[list[str]] = None) -> None:
+        """
+        Args:
+            rows: Строки из `values()`
+            context: Контекст сериализатора с запросом
+            fields: Поля ответа или None для всех полей
+        """
+        self.rows = rows
+        self.context = context or {}
+        self.fields = [
+            name for name in self.field_names
+            if fields is None or name in fields
+        ]
+
+    @classmethod
+    def get_lookups(cls, fields: Optional[list[str]] = None) -> list[str]:
+        """
+        Получает колонки, нужные для полей ответа.
+
+        Args:
+            fields: Поля ответа или None для всех полей
+        Returns:
+            list: Колонки для `values()` или `only()`
+        """
+        lookups = []
+        for name in fields if fields is not None else cls.field_names:
+            for lookup in cls.field_lookups.get(name, (name,)):
+                if lookup not in lookups:
+                    lookups.append(lookup)
+        return lookups
+
+    @classmethod
+    def values(cls, queryset: QuerySet,
+               fields: Optional[list[str]] = None) -> QuerySet:
+        """
+        Переводит набор на выборку словарей.
+        Поля сортировки модели и аннотации набора читаются всегда:
+        по ним строит позицию курсорная пагинация.
+
+        Args:
+            queryset: Отфильтрованный набор моделей
+            fields: Поля ответа или None для всех полей
+        Returns:
+            QuerySet: Набор словарей
+        """
+        lookups = cls.get_lookups(fields)
+        for name in queryset.model._meta.ordering:
+            if name.lstrip('-') not in lookups:
+                lookups.append(name.lstrip('-'))
+        return queryset.values(*lookups, *queryset.query.annotations)
+
+    @property
+    def data(self) -> list[dict]:
+        """
+        Returns:
+            list: Представления строк
+        """
+        request = self.context.get('request')
+        getters = [(name, self.get_getter(name)) for name in self.fields]
+        return [
+            {name: getter(row, request) for name, getter in getters}
+            for row in self.rows
+        ]
+
+    def get_getter(self, name: str) -> Callable[[dict, Any], Any]:
+        """
+        Получает функцию, строящую значение поля из строки.
+
+        Args:
+            name: Имя поля
+        Returns:
+            Callable: Функция от строки и запроса
+        """
+        method = getattr(self, f'represent_{name}', None)
+        if method is not None:
+            return method
+        return lambda row, request: row[name]
+
+    @staticmethod
+    def file_url(name: Optional[str], request: Any) -> Optional[str]:
+        """
+        Строит ссылку на файл как `FileField` DRF.
+
+        Args:
+            name: Имя файла в хранилище
+            request: Объект запроса или None
+        Returns:
+            str | None: Абсолютная ссылка, если известен запрос
+        """
+        if not name:
+            return None
+        url = default_storage.url(name)
+        return request.build_absolute_uri(url) if request else url
+
+
+class PostValuesSerializer(ValuesSerializer):
+    """Список постов в формате PostSerializer."""
+
+    field_names = (
+        'id', 'author', 'image_variants', 'text', 'pub_date', 'image',
+        'comments_count', 'group'
+    )
+    field_lookups = {
+        'author': ('author__username',),
+        'image_variants': ('image', 'image_variants'),
+    }
+
+    def represent_author(self, row: dict, request: Any) -> str:
+        """Имя автора из JOIN."""
+        return row['author__username']
+
+    def represent_image_variants(self, row: dict,
+                                 request: Any) -> dict[str, str]:
+        """Ссылки на варианты текущего изображения."""
+        return build_variant_urls(
+            row['image'], row['image_variants'], request
+        )
+
+    def represent_pub_date(self, row: dict, request: Any) -> str:
+        """Дата публикации в формате DRF."""
+        return datetime_field.to_representation(row['pub_date'])
+
+    def represent_image(self, row: dict, request: Any) -> Optional[str]:
+        """Ссылка на изображение."""
+        return self.file_url(row['image'], request)
+
+
+class CommentValuesSerializer(ValuesSerializer):
+    """Список комментариев в формате CommentSerializer."""
+
+    field_names = ('id', 'author', 'text', 'created', 'post')
+    field_lookups = {'author': ('author__username',)}
+
+    def represent_author(self, row: dict, request: Any) -> str:
+        """Имя автора из JOIN."""
+        return row['author__username']
+
+    def represent_created(self, row: dict, request: Any) -> str:
+        """Дата комментария в формате DRF."""
+        return datetime_field.to_representation(row['created'])
@@ -0,0 +1,35 @@
+"""
+Фильтры для API endpoints.
+"""
+from typing import Any
+
+from rest_framework.filters import BaseFilterBackend
+
+from posts.search import search_posts
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """
+    Полнотекстовый поиск постов по параметру `search`.
+
+    Найденные посты получают аннотацию `search_rank`, по которой их
+    упорядочивает курсорная пагинация.
+    """
+
+    search_param = 'search'
+
+    def filter_queryset(self, request: Any, queryset: Any, view: Any) -> Any:
+        """
+        Отбирает посты, подходящие под запрос.
+
+        Args:
+            request: Объект запроса
+            queryset: Набор постов
+            view: Представление
+        Returns:
+            QuerySet: Найденные посты или исходный набор без запроса
+        """
+        query = request.query_params.get(self.search_param)
+        if query is None:
+            return queryset
+        return search_posts(queryset, query)
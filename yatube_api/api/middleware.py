@@ -0,0 +1,151 @@
+"""
+Промежуточные слои API.
+"""
+from typing import Any, Callable, Optional
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async
+)
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from api.routers import (
+    choose_replica,
+    is_sticky,
+    reset_read_replica,
+    set_read_replica,
+    stick_to_primary
+)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Разрешает чтение из реплик для безопасных запросов к API.
+
+    Пользователь определяется по JWT без обращения к базе. После его
+    успешной записи чтение на короткое окно остается в основной базе,
+    чтобы следующий GET увидел новый пост или комментарий.
+    """
+
+    authentication = JWTAuthentication()
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        """
+        Args:
+            get_response: Следующий обработчик
+        """
+        self.get_response = get_response
+        # Под ASGI асинхронные представления вызываются без переходов
+        # в поток, как в django.utils.deprecation.MiddlewareMixin.
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Обрабатывает запрос с выбранной базой для чтения.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            HttpResponse: Ответ
+        """
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        user_id = self.get_user_id(request)
+        sticky = user_id is not None and is_sticky(user_id)
+        token = self.route(request, sticky)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_replica(token)
+        if self.wrote(request, user_id, response):
+            stick_to_primary(user_id)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        """
+        Асинхронный вариант `__call__`.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            HttpResponse: Ответ
+        """
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        user_id = self.get_user_id(request)
+        sticky = user_id is not None and await sync_to_async(is_sticky)(
+            user_id
+        )
+        token = self.route(request, sticky)
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_read_replica(token)
+        if self.wrote(request, user_id, response):
+            await sync_to_async(stick_to_primary)(user_id)
+        return response
+
+    @staticmethod
+    def route(request: HttpRequest, sticky: bool) -> Any:
+        """
+        Выбирает одну реплику на весь безопасный запрос.
+
+        Args:
+            request: Объект запроса
+            sticky: Пользователь недавно записывал данные
+        Returns:
+            Any: Токен для восстановления прежнего значения
+        """
+        if request.method in SAFE_METHODS and not sticky:
+            return set_read_replica(choose_replica())
+        return set_read_replica(None)
+
+    @staticmethod
+    def wrote(request: HttpRequest, user_id: Optional[Any],
+              response: HttpResponse) -> bool:
+        """
+        Проверяет, записал ли пользователь данные этим запросом.
+
+        Args:
+            request: Объект запроса
+            user_id: Идентификатор пользователя или None
+            response: Ответ
+        Returns:
+            bool: Успешный небезопасный запрос пользователя
+        """
+        return (
+            request.method not in SAFE_METHODS and user_id is not None
+            and response.status_code < 400
+        )
+
+    def get_user_id(self, request: HttpRequest) -> Optional[Any]:
+        """
+        Получает идентификатор пользователя из проверенного токена.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            Any: Идентификатор или None без действительного токена
+        """
+        header = self.authentication.get_header(request)
+        if header is None:
+            return None
+        try:
+            raw_token = self.authentication.get_raw_token(header)
+            if raw_token is None:
+                return None
+            validated = self.authentication.get_validated_token(raw_token)
+        except AuthenticationFailed:
+            return None
+        return validated.get(api_settings.USER_ID_CLAIM)
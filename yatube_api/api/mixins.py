@@ -0,0 +1,269 @@
+"""
+Примеси для представлений API.
+"""
+from hashlib import md5
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+
+from api.cache import get_modified, get_version, make_key
+
+
+class CachedResponseMixin:
+    """
+    Кэширует ответы list и retrieve по версионированному ключу.
+
+    Ключ включает путь с параметрами запроса, а версия пространства
+    имен `cache_namespace` увеличивается при изменении данных.
+    """
+
+    cache_namespace: str = ''
+    cache_timeout: int = settings.API_CACHE_TIMEOUT
+
+    def get_cached_response(self, action: Callable, request: Any,
+                            *args: Any, **kwargs: Any) -> Response:
+        """
+        Возвращает ответ из кэша или выполняет действие и кэширует его.
+
+        Args:
+            action: Действие представления
+            request: Объект запроса
+        Returns:
+            Response: Ответ представления
+        """
+        key = make_key(self.cache_namespace, request.get_full_path())
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = action(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.cache_timeout)
+        return response
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        """Возвращает список объектов с учетом кэша."""
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        """Возвращает объект с учетом кэша."""
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+
+class ConditionalListMixin:
+    """
+    Условные GET-запросы к списку по ETag и Last-Modified.
+
+    Валидаторы считаются одним агрегатным запросом по `conditional_aggregates`
+    и версии пространства имен `conditional_namespace`, без сериализации.
+    Совпадение с `If-None-Match` или `If-Modified-Since` дает ответ 304.
+    Версия хранится в общем кэше, поэтому изменение и удаление, которые
+    не сдвигают агрегаты, меняют ETag во всех процессах.
+    """
+
+    conditional_namespace: str = ''
+    conditional_aggregates: dict = {}
+    conditional_date_field: str = 'latest'
+
+    def get_list_validators(self, request: Any) -> tuple[str, Optional[int]]:
+        """
+        Вычисляет ETag и время последнего изменения списка.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            tuple: ETag и метка времени Last-Modified или None
+        """
+        state = self.filter_queryset(self.get_queryset()).order_by(
+        ).aggregate(**self.conditional_aggregates)
+        fingerprint = '|'.join((
+            request.get_full_path(),
+            str(get_version(self.conditional_namespace)),
+            *(str(state[name]) for name in sorted(state)),
+        ))
+        etag = quote_etag(md5(fingerprint.encode()).hexdigest())
+
+        timestamps = [get_modified(self.conditional_namespace)]
+        latest = state.get(self.conditional_date_field)
+        if latest is not None:
+            timestamps.append(latest.timestamp())
+        timestamps = [stamp for stamp in timestamps if stamp is not None]
+        last_modified = int(max(timestamps)) if timestamps else None
+        return etag, last_modified
+
+    def get_not_modified_response(self, request: Any) -> Optional[Any]:
+        """
+        Сравнивает валидаторы с заголовками запроса.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            HttpResponse | None: Ответ 304 или None, если список изменился
+        """
+        self.etag, self.last_modified = self.get_list_validators(request)
+        return get_conditional_response(
+            request, etag=self.etag, last_modified=self.last_modified
+        )
+
+    def set_validators(self, response: Any) -> Any:
+        """
+        Добавляет к ответу заголовки ETag и Last-Modified.
+
+        Args:
+            response: Ответ представления
+        Returns:
+            Response: Тот же ответ с заголовками
+        """
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        """Возвращает список или 304, если он не изменился."""
+        response = self.get_not_modified_response(request)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return self.set_validators(response)
+
+
+class SparseFieldsetMixin:
+    """
+    Разреженные наборы полей: `?fields=id,text` в GET-запросах.
+
+    Сериализатор получает только запрошенные поля, а набор
+    читает только их колонки через `only()`. Колонки поля берутся
+    из `sparse_field_sources`, по умолчанию — колонка с именем поля.
+    """
+
+    fields_param = 'fields'
+    sparse_field_sources: dict[str, tuple[str, ...]] = {}
+
+    def get_sparse_fields(self) -> Optional[list[str]]:
+        """
+        Получает поля из параметра `fields` в порядке сериализатора.
+
+        Returns:
+            list | None: Поля или None, если параметр не передан
+        Raises:
+            ValidationError: Передано неизвестное поле
+        """
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+        self._sparse_fields = None
+        value = self.request.query_params.get(self.fields_param)
+        if self.request.method in SAFE_METHODS and value:
+            requested = {name.strip() for name in value.split(',')} - {''}
+            available = list(self.get_serializer_class()().fields)
+            unknown = requested - set(available)
+            if unknown:
+                raise ValidationError({
+                    self.fields_param: [
+                        'Неизвестные поля: ' + ', '.join(sorted(unknown))
+                    ]
+                })
+            self._sparse_fields = [
+                name for name in available if name in requested
+            ]
+        return self._sparse_fields
+
+    def get_sparse_sources(self, fields: list[str]) -> list[str]:
+        """
+        Получает колонки для полей ответа и сортировки модели.
+
+        Args:
+            fields: Поля ответа
+        Returns:
+            list: Колонки для `only()`
+        """
+        model = self.get_queryset().model
+        sources = [model._meta.pk.name]
+        sources += [name.lstrip('-') for name in model._meta.ordering]
+        for name in fields:
+            sources += self.sparse_field_sources.get(name, (name,))
+        return list(dict.fromkeys(sources))
+
+    def filter_queryset(self, queryset: Any) -> Any:
+        """Сужает выборку до колонок запрошенных полей."""
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None:
+            return queryset
+        sources = self.get_sparse_sources(fields)
+        related = {
+            source.split('__')[0] for source in sources if '__' in source
+        }
+        return queryset.select_related(None).select_related(
+            *related
+        ).only(*sources)
+
+    def get_serializer(self, *args: Any, **kwargs: Any) -> Any:
+        """Передает сериализатору запрошенные поля."""
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+
+class ValuesListMixin(SparseFieldsetMixin):
+    """
+    Список из строк values() вместо экземпляров моделей.
+
+    `values_serializer_class` собирает ответ с тем же JSON, что и
+    `serializer_class`; остальные действия используют ModelSerializer.
+    Колонки разреженных наборов полей задает сам сериализатор строк.
+    """
+
+    values_serializer_class: Any = None
+
+    @property
+    def sparse_field_sources(self) -> dict[str, tuple[str, ...]]:
+        """Колонки полей из сериализатора строк."""
+        return self.values_serializer_class.field_lookups
+
+    def get_list_queryset(self) -> Any:
+        """
+        Получает отфильтрованный набор словарей для списка.
+
+        Returns:
+            QuerySet: Набор строк values()
+        """
+        return self.values_serializer_class.values(
+            self.filter_queryset(self.get_queryset()),
+            self.get_sparse_fields()
+        )
+
+    def get_list_serializer(self, rows: Any) -> Any:
+        """
+        Создает сериализатор списка строк.
+
+        Args:
+            rows: Строки страницы или всего списка
+        Returns:
+            ValuesSerializer: Сериализатор строк
+        """
+        return self.values_serializer_class(
+            rows,
+            context=self.get_serializer_context(),
+            fields=self.get_sparse_fields()
+        )
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        """Возвращает список или страницу, собранные из values()."""
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                self.get_list_serializer(page).data
+            )
+        return Response(self.get_list_serializer(queryset).data)
@@ -0,0 +1,260 @@
+"""
+Классы пагинации для API endpoints.
+"""
+import contextlib
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Any, Optional
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    LimitOffsetPagination,
+    _positive_int
+)
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from posts.feed import HybridFeed, Position
+
+
+class PostCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация постов.
+
+    Смещение по ключу сортировки `Post.Meta.ordering` вместо OFFSET,
+    поэтому стоимость страницы не зависит от её номера.
+    """
+
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-pub_date', '-id')
+
+
+class CommentCursorPagination(PostCursorPagination):
+    """Курсорная пагинация комментариев к посту."""
+
+    ordering = ('-created', '-id')
+
+
+class PostSearchCursorPagination(PostCursorPagination):
+    """Курсорная пагинация результатов поиска по релевантности."""
+
+    ordering = ('search_rank', '-id')
+
+
+class CursorOrLimitOffsetPagination(LimitOffsetPagination):
+    """
+    Пагинация, выбирающая режим по параметрам запроса.
+
+    `cursor` или `page_size` включают курсорную пагинацию,
+    `limit` и `offset` сохраняют прежний контракт.
+    Без параметров список возвращается целиком, как и раньше.
+    """
+
+    cursor_pagination_class = PostCursorPagination
+
+    def use_cursor(self, request: Any) -> bool:
+        """
+        Проверяет, запрошена ли курсорная пагинация.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            bool: True, если в запросе есть параметры курсорной пагинации
+        """
+        cursor_class = self.cursor_pagination_class
+        return (
+            self.limit_query_param not in request.query_params
+            and (
+                cursor_class.cursor_query_param in request.query_params
+                or cursor_class.page_size_query_param in request.query_params
+            )
+        )
+
+    def paginate_queryset(
+        self, queryset: Any, request: Any, view: Any = None
+    ) -> Optional[list]:
+        """
+        Делит набор объектов на страницы выбранным способом.
+
+        Args:
+            queryset: Набор объектов
+            request: Объект запроса
+            view: Представление
+        Returns:
+            list | None: Страница объектов или None без пагинации
+        """
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            page = self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+            self.display_page_controls = (
+                self.cursor_paginator.display_page_controls
+            )
+            return page
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data: Any) -> Response:
+        """
+        Формирует ответ в формате выбранного способа пагинации.
+
+        Args:
+            data: Сериализованные данные страницы
+        Returns:
+            Response: Ответ со страницей и ссылками
+        """
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self) -> str:
+        """Отрисовывает элементы навигации для browsable API."""
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+class CommentPagination(CursorOrLimitOffsetPagination):
+    """Пагинация комментариев с выбором режима по параметрам запроса."""
+
+    cursor_pagination_class = CommentCursorPagination
+
+
+class FeedPagination(BasePagination):
+    """
+    Пагинация ленты по ключу `(pub_date, id)` последнего поста страницы.
+
+    Лента собирается слиянием нескольких источников, поэтому курсор
+    хранит позицию целиком и позволяет листать только вперед.
+    """
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request: Any) -> int:
+        """
+        Получает размер страницы из запроса.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            int: Размер страницы
+        """
+        with contextlib.suppress(KeyError, ValueError):
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        return self.page_size
+
+    def decode_cursor(self, request: Any) -> Optional[Position]:
+        """
+        Получает позицию из курсора запроса.
+
+        Args:
+            request: Объект запроса
+        Returns:
+            tuple | None: Позиция `(pub_date, id)` или None
+        Raises:
+            NotFound: Если курсор поврежден
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            raw_date, raw_id = urlsafe_b64decode(
+                encoded.encode('ascii')
+            ).decode('ascii').split('|')
+            pub_date = parse_datetime(raw_date)
+            post_id = int(raw_id)
+        except (BinasciiError, UnicodeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, post_id
+
+    def encode_cursor(self, position: Position) -> str:
+        """
+        Формирует ссылку на страницу, следующую за позицией.
+
+        Args:
+            position: Позиция `(pub_date, id)` последнего поста
+        Returns:
+            str: Ссылка со значением курсора
+        """
+        pub_date, post_id = position
+        encoded = urlsafe_b64encode(
+            f'{pub_date.isoformat()}|{post_id}'.encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def paginate_queryset(self, feed: HybridFeed, request: Any,
+                          view: Any = None) -> list:
+        """
+        Получает страницу ленты после позиции курсора.
+
+        Args:
+            feed: Лента пользователя
+            request: Объект запроса
+            view: Представление
+        Returns:
+            list: Посты страницы
+        """
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        posts = feed.page(self.decode_cursor(request), page_size + 1)
+        self.page = posts[:page_size]
+        self.has_next = len(posts) > page_size
+        return self.page
+
+    def get_next_link(self) -> Optional[str]:
+        """Возвращает ссылку на следующую страницу."""
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        return self.encode_cursor((last.pub_date, last.pk))
+
+    def get_paginated_response(self, data: Any) -> Response:
+        """
+        Формирует ответ со страницей ленты.
+
+        Args:
+            data: Сериализованные посты страницы
+        Returns:
+            Response: Ответ со ссылкой на следующую страницу
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+
+class PostPagination(CursorOrLimitOffsetPagination):
+    """
+    Пагинация постов.
+
+    Результаты поиска всегда отдаются курсорной пагинацией
+    по релевантности.
+    """
+
+    search_param = 'search'
+    search_pagination_class = PostSearchCursorPagination
+
+    def use_cursor(self, request: Any) -> bool:
+        """Включает курсорную пагинацию для поискового запроса."""
+        if self.search_param in request.query_params:
+            self.cursor_pagination_class = self.search_pagination_class
+            return True
+        return super().use_cursor(request)
@@ -0,0 +1,129 @@
+"""
+Маршрутизация запросов к базе между основной базой и репликами.
+
+Чтение уходит в реплику только внутри безопасного запроса к API,
+для которого `ReplicaRoutingMiddleware` выбрал реплику. Реплика
+выбирается один раз на запрос: реплики отстают по-разному, и чтения
+одного ответа не должны видеть разные состояния базы.
+Все остальное — записи, команды управления, фоновые задачи — работает
+с основной базой.
+"""
+import random
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY = 'default'
+
+_read_replica: ContextVar[Optional[str]] = ContextVar(
+    'read_replica', default=None
+)
+
+
+def choose_replica() -> Optional[str]:
+    """
+    Выбирает случайную реплику.
+
+    Returns:
+        str: Псевдоним реплики или None, если реплики не настроены
+    """
+    if not settings.DATABASE_REPLICAS:
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def set_read_replica(alias: Optional[str]) -> Any:
+    """
+    Задает реплику для чтения в текущем контексте.
+
+    Args:
+        alias: Псевдоним реплики или None для чтения из основной базы
+    Returns:
+        Token: Токен для восстановления прежнего значения
+    """
+    return _read_replica.set(alias)
+
+
+def reset_read_replica(token: Any) -> None:
+    """
+    Восстанавливает значение, действовавшее до `set_read_replica`.
+
+    Args:
+        token: Токен из `set_read_replica`
+    """
+    _read_replica.reset(token)
+
+
+def sticky_key(user_id: Any) -> str:
+    """
+    Строит ключ окна чтения из основной базы после записи пользователя.
+
+    Args:
+        user_id: Идентификатор пользователя
+    Returns:
+        str: Ключ кэша
+    """
+    return f'db:sticky:{user_id}'
+
+
+def stick_to_primary(user_id: Any) -> None:
+    """
+    Направляет чтение пользователя в основную базу на время
+    `DATABASE_REPLICA_STICKY_SECONDS`, пока реплики догоняют запись.
+
+    Args:
+        user_id: Идентификатор пользователя
+    """
+    cache.set(
+        sticky_key(user_id), True, settings.DATABASE_REPLICA_STICKY_SECONDS
+    )
+
+
+def is_sticky(user_id: Any) -> bool:
+    """
+    Проверяет, открыто ли окно чтения из основной базы.
+
+    Args:
+        user_id: Идентификатор пользователя
+    Returns:
+        bool: True, если пользователь недавно писал
+    """
+    return bool(cache.get(sticky_key(user_id)))
+
+
+class ReplicaRouter:
+    """Роутер: запись в основную базу, чтение в запросе — из реплики."""
+
+    def db_for_read(self, model: Any, **hints: Any) -> Optional[str]:
+        """
+        Выбирает базу для чтения.
+
+        Args:
+            model: Модель запроса
+        Returns:
+            str: Псевдоним реплики текущего запроса или основной базы
+        """
+        return _read_replica.get() or PRIMARY
+
+    def db_for_write(self, model: Any, **hints: Any) -> Optional[str]:
+        """
+        Выбирает базу для записи.
+
+        Args:
+            model: Модель запроса
+        Returns:
+            str: Псевдоним основной базы
+        """
+        return PRIMARY
+
+    def allow_relation(self, obj1: Any, obj2: Any,
+                       **hints: Any) -> Optional[bool]:
+        """Реплики содержат те же данные: связи между базами допустимы."""
+        return True
+
+    def allow_migrate(self, db: str, app_label: str,
+                      **hints: Any) -> Optional[bool]:
+        """Миграции применяются только к основной базе."""
+        return db == PRIMARY
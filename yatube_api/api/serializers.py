@@ -1,15 +1,79 @@
-from typing import Any
+from typing import Any, Optional
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import IntegrityError
+from djoser.serializers import UserSerializer as DjoserUserSerializer
 from rest_framework import serializers
 
-from posts.models import Group, Post, Comment, Follow
+from posts.models import Group, ImageUpload, Post, Comment, Follow
 
 
 User = get_user_model()
 
 
-class GroupSerializer(serializers.ModelSerializer):
+def build_variant_urls(image: Optional[str], variants: dict,
+                       request: Any) -> dict[str, str]:
+    """
+    Строит ссылки на варианты изображения, построенные для его текущего файла.
+
+    Args:
+        image: Имя файла изображения поста
+        variants: Значение `Post.image_variants`
+        request: Объект запроса для абсолютных ссылок или None
+    Returns:
+        dict: Ссылки по названиям вариантов
+    """
+    if not image or variants.get('source') != image:
+        return {}
+    urls = {}
+    for name, path in variants.items():
+        if name == 'source':
+            continue
+        url = default_storage.url(path)
+        urls[name] = request.build_absolute_uri(url) if request else url
+    return urls
+
+
+class SparseFieldsMixin:
+    """Оставляет в сериализаторе только поля из аргумента `fields`."""
+
+    def __init__(self, *args: Any, fields: Optional[list[str]] = None,
+                 **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class UserSerializer(DjoserUserSerializer):
+    """Сериализатор пользователя со счетчиками подписок."""
+
+    followers_count = serializers.SerializerMethodField()
+    following_count = serializers.SerializerMethodField()
+
+    class Meta(DjoserUserSerializer.Meta):
+        fields = DjoserUserSerializer.Meta.fields + (
+            'followers_count', 'following_count'
+        )
+
+    @staticmethod
+    def get_profile_counter(user: Any, field: str) -> int:
+        """Возвращает счетчик профиля или 0, если профиля еще нет."""
+        profile = getattr(user, 'profile', None)
+        return getattr(profile, field, 0)
+
+    def get_followers_count(self, user: Any) -> int:
+        """Возвращает количество подписчиков пользователя."""
+        return self.get_profile_counter(user, 'followers_count')
+
+    def get_following_count(self, user: Any) -> int:
+        """Возвращает количество подписок пользователя."""
+        return self.get_profile_counter(user, 'following_count')
+
+
+class GroupSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Group."""
 
     class Meta:
@@ -17,20 +81,51 @@ class GroupSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class PostSerializer(serializers.ModelSerializer):
+class PostSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Post."""
 
     author = serializers.SlugRelatedField(
         slug_field='username',
         read_only=True
     )
+    image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Post
         fields = '__all__'
+        read_only_fields = ('comments_count',)
 
+    def update(self, instance: Post, validated_data: dict) -> Post:
+        """
+        Сохраняет только переданные поля поста.
+        Полное сохранение записало бы прочитанный `comments_count`
+        поверх параллельных изменений счетчика через F().
 
-class CommentSerializer(serializers.ModelSerializer):
+        Args:
+            instance: Изменяемый пост
+            validated_data: Проверенные данные
+        Returns:
+            Post: Обновленный пост
+        """
+        if not validated_data:
+            # save(update_fields=[]) ничего не пишет и не отправляет сигналы.
+            return instance
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        instance.save(update_fields=list(validated_data))
+        return instance
+
+    def get_image_variants(self, post: Post) -> dict[str, str]:
+        """
+        Получает ссылки на уменьшенные варианты изображения.
+        Пока изображение обрабатывается, словарь пуст.
+        """
+        return build_variant_urls(
+            post.image.name, post.image_variants, self.context.get('request')
+        )
+
+
+class CommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Сериализатор для модели Comment."""
 
     author = serializers.SlugRelatedField(
@@ -60,22 +155,108 @@ class FollowSerializer(serializers.ModelSerializer):
         model = Follow
         fields = ('user', 'following')
 
-    def validate_following(self, value: Any) -> Any:
-        """Пользователь не подписывается на себя и подписка не дублируется."""
-        user = self.context['request'].user
-        following = value
+    # Ошибки ограничений Follow.Meta.constraints по их именам.
+    constraint_errors = {
+        'unique_follow': 'Вы уже подписаны на этого пользователя',
+        'posts_follow_prevent_self_follow': (
+            'Нельзя подписаться на самого себя'
+        ),
+    }
+
+    def create(self, validated_data: dict) -> Follow:
+        """
+        Создает подписку одним INSERT, проверки выполняют ограничения базы.
+        Args:
+            validated_data: Проверенные данные подписки
+        Returns:
+            Follow: Новая подписка
+        Raises:
+            ValidationError: Подписка на себя или повторная подписка
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError as error:
+            raise serializers.ValidationError(
+                {'following': [self.get_constraint_error(error)]}
+            ) from error
+
+    def get_constraint_error(self, error: IntegrityError) -> str:
+        """
+        Находит сообщение для нарушенного ограничения.
+        Args:
+            error: Ошибка базы данных
+        Returns:
+            str: Текст ошибки валидации
+        Raises:
+            IntegrityError: Ограничение не относится к подписке
+        """
+        # PostgreSQL сообщает имя ограничения в diag, SQLite — в тексте.
+        diag = getattr(error.__cause__, 'diag', None)
+        name = getattr(diag, 'constraint_name', None)
+        message = str(error)
+        for constraint, text in self.constraint_errors.items():
+            if constraint == name or constraint in message:
+                return text
+        # SQLite не называет уникальные ограничения, только их поля.
+        if message.startswith('UNIQUE constraint failed'):
+            return self.constraint_errors['unique_follow']
+        raise error
+
 
-        if user == following:
+class FollowBatchSerializer(serializers.Serializer):
+    """Сериализатор пакетной подписки и отписки по списку имен."""
+
+    following = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=settings.FOLLOW_BATCH_MAX_ITEMS
+    )
+
+    def validate_following(self, value: list[str]) -> list[Any]:
+        """Все имена существуют и среди них нет текущего пользователя."""
+        usernames = set(value)
+        users = list(User.objects.filter(username__in=usernames))
+        missing = usernames - {user.username for user in users}
+        if missing:
+            raise serializers.ValidationError(
+                'Пользователи не найдены: ' + ', '.join(sorted(missing))
+            )
+        if self.context['request'].user in users:
             raise serializers.ValidationError(
                 'Нельзя подписаться на самого себя'
             )
+        return users
+
 
-        if Follow.objects.filter(
-            user=user,
-            following=following
-        ).exists():
+class ImageUploadSerializer(serializers.ModelSerializer):
+    """Сериализатор загрузки изображения по частям."""
+
+    class Meta:
+        model = ImageUpload
+        fields = (
+            'id', 'filename', 'total_size', 'offset', 'content_type',
+            'created'
+        )
+        read_only_fields = ('offset', 'content_type', 'created')
+
+    def validate_filename(self, value: str) -> str:
+        """Из имени файла отбрасываются каталоги."""
+        name = value.replace('\\', '/').rsplit('/', 1)[-1]
+        if not name:
+            raise serializers.ValidationError('Укажите имя файла')
+        return name
+
+    def validate_total_size(self, value: int) -> int:
+        """Размер файла не больше `POST_IMAGE_MAX_SIZE`."""
+        if not 0 < value <= settings.POST_IMAGE_MAX_SIZE:
             raise serializers.ValidationError(
-                'Вы уже подписаны на этого пользователя'
+                'Размер файла должен быть от 1 до '
+                f'{settings.POST_IMAGE_MAX_SIZE} байт'
             )
-
         return value
+
+
+class ImageUploadFinishSerializer(serializers.Serializer):
+    """Сериализатор завершения загрузки: пост для изображения."""
+
+    post = serializers.PrimaryKeyRelatedField(queryset=Post.objects.all())
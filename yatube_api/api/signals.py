@@ -0,0 +1,38 @@
+"""
+Обработчики сигналов, сбрасывающие кэши API.
+"""
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import auth_namespace
+from api.cache import bump_version
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+@receiver((post_save, post_delete), sender=Group)
+def group_changed(sender: Any, **kwargs: Any) -> None:
+    """Сбрасывает кэш ответов о группах."""
+    bump_version('groups')
+
+
+@receiver((post_save, post_delete), sender=Post)
+def post_changed(sender: Any, **kwargs: Any) -> None:
+    """Меняет валидаторы условных запросов к постам."""
+    bump_version('posts')
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender: Any, **kwargs: Any) -> None:
+    """Меняет валидаторы условных запросов к комментариям."""
+    bump_version('comments')
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(sender: Any, instance: Any, **kwargs: Any) -> None:
+    """Сбрасывает закэшированного пользователя во всех процессах."""
+    bump_version(auth_namespace(instance.pk))
@@ -0,0 +1,173 @@
+"""
+Ограничение частоты записи по алгоритму token bucket.
+
+Состояние корзин хранится в файле `THROTTLE_STATE_PATH`, отображенном
+в память всеми процессами сервера на хосте. Файл — таблица из
+`THROTTLE_SLOTS` ячеек фиксированного размера; ключ корзины хэшируется
+в номер ячейки, поэтому запрос читает и пишет одну ячейку под блокировкой
+`fcntl` только ее байтов. При совпадении ячеек разных ключей новый ключ
+вытесняет старый и начинает с полной корзины.
+"""
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from hashlib import blake2b
+from typing import Any, Optional
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+# Ячейка: хэш ключа, число жетонов и время последнего пополнения.
+SLOT = struct.Struct('<Qdd')
+
+_table: Optional['TokenBucketTable'] = None
+_table_lock = threading.Lock()
+
+
+class TokenBucketTable:
+    """Таблица корзин в общем для процессов файле."""
+
+    def __init__(self, path: str, slots: int) -> None:
+        """
+        Args:
+            path: Путь к файлу состояния
+            slots: Число ячеек
+        """
+        self.path = str(path)
+        self.slots = slots
+        size = slots * SLOT.size
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size != size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        # Блокировки fcntl принадлежат процессу и не разделяют его потоки.
+        self.lock = threading.Lock()
+
+    def take(self, key: str, capacity: float, rate: float,
+             now: float) -> float:
+        """
+        Пополняет корзину ключа и забирает из нее один жетон.
+
+        Args:
+            key: Ключ корзины
+            capacity: Емкость корзины
+            rate: Пополнение в жетонах в секунду
+            now: Текущее время в секундах
+        Returns:
+            float: 0, если жетон выдан, иначе секунды до следующего
+        """
+        digest = int.from_bytes(
+            blake2b(key.encode(), digest_size=8).digest(), 'little'
+        ) | 1
+        offset = digest % self.slots * SLOT.size
+        with self.lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, SLOT.size, offset)
+            try:
+                stored, tokens, updated = SLOT.unpack_from(self.map, offset)
+                if stored != digest:
+                    tokens, updated = capacity, now
+                tokens = min(
+                    capacity, tokens + max(0.0, now - updated) * rate
+                )
+                if tokens >= 1:
+                    tokens -= 1
+                    wait = 0.0
+                else:
+                    wait = (1 - tokens) / rate
+                SLOT.pack_into(self.map, offset, digest, tokens, now)
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN, SLOT.size, offset)
+        return wait
+
+
+def get_table() -> TokenBucketTable:
+    """
+    Открывает таблицу корзин при первом обращении или смене настроек.
+
+    Returns:
+        TokenBucketTable: Таблица процесса
+    """
+    global _table
+    path, slots = str(settings.THROTTLE_STATE_PATH), settings.THROTTLE_SLOTS
+    with _table_lock:
+        if _table is None or (_table.path, _table.slots) != (path, slots):
+            _table = TokenBucketTable(path, slots)
+    return _table
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Базовое ограничение записи: корзина на `num_requests` запросов
+    пополняется равномерно за `duration` секунд. Безопасные запросы
+    не ограничиваются.
+    """
+
+    wait_time = 0.0
+
+    def get_rate(self) -> Optional[str]:
+        """
+        Получает частоту области из текущих настроек DRF.
+
+        Returns:
+            str: Частота вида `60/min` или None без ограничения
+        """
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request: Any, view: Any) -> bool:
+        """
+        Проверяет, есть ли в корзине клиента жетон для запроса.
+
+        Args:
+            request: Объект запроса
+            view: Представление
+        Returns:
+            bool: True, если запрос разрешен
+        """
+        if request.method in SAFE_METHODS or self.rate is None:
+            return True
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        self.wait_time = get_table().take(
+            key, self.num_requests, self.num_requests / self.duration,
+            time.time()
+        )
+        return not self.wait_time
+
+    def wait(self) -> float:
+        """
+        Returns:
+            float: Секунды до появления жетона
+        """
+        return self.wait_time
+
+
+class UserWriteThrottle(TokenBucketThrottle):
+    """Ограничение записи для пользователя."""
+
+    scope = 'user_write'
+
+    def get_cache_key(self, request: Any, view: Any) -> Optional[str]:
+        """Ключ пользователя; анонимов ограничивает `IPWriteThrottle`."""
+        if not request.user or not request.user.is_authenticated:
+            return None
+        return self.cache_format % {
+            'scope': self.scope, 'ident': request.user.pk
+        }
+
+
+class IPWriteThrottle(TokenBucketThrottle):
+    """Ограничение записи для IP-адреса клиента."""
+
+    scope = 'ip_write'
+
+    def get_cache_key(self, request: Any, view: Any) -> Optional[str]:
+        """Ключ адреса с учетом `NUM_PROXIES`."""
+        return self.cache_format % {
+            'scope': self.scope, 'ident': self.get_ident(request)
+        }
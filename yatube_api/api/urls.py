@@ -2,13 +2,22 @@
 Конфигурация URL для API endpoints.
 """
 from django.urls import include, path
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import DefaultRouter, SimpleRouter
 
+from api.async_views import (
+    AsyncCommentView,
+    AsyncFollowView,
+    AsyncGroupView,
+    AsyncPostView
+)
 from api.views import (
     CommentViewSet,
     PostViewSet,
     GroupViewSet,
-    FollowViewSet
+    FeedViewSet,
+    FollowViewSet,
+    ImageUploadViewSet,
+    UserViewSet
 )
 
 api_v1_router = DefaultRouter()
@@ -20,8 +29,41 @@ api_v1_router.register(
 )
 api_v1_router.register('groups', GroupViewSet, basename='groups')
 api_v1_router.register('follow', FollowViewSet, basename='follow')
+api_v1_router.register('feed', FeedViewSet, basename='feed')
+api_v1_router.register('uploads', ImageUploadViewSet, basename='uploads')
+
+# Пользователи djoser с профилями: маршруты перекрывают djoser.urls.
+users_router = SimpleRouter()
+users_router.register('users', UserViewSet)
+
+# Асинхронные варианты чтения для запуска под ASGI.
+async_urlpatterns = [
+    path('posts/', AsyncPostView.as_view(), name='async-posts-list'),
+    path(
+        'posts/<int:pk>/', AsyncPostView.as_view(), name='async-posts-detail'
+    ),
+    path(
+        'posts/<int:post_id>/comments/',
+        AsyncCommentView.as_view(),
+        name='async-comments-list'
+    ),
+    path(
+        'posts/<int:post_id>/comments/<int:pk>/',
+        AsyncCommentView.as_view(),
+        name='async-comments-detail'
+    ),
+    path('groups/', AsyncGroupView.as_view(), name='async-groups-list'),
+    path(
+        'groups/<int:pk>/',
+        AsyncGroupView.as_view(),
+        name='async-groups-detail'
+    ),
+    path('follow/', AsyncFollowView.as_view(), name='async-follow-list'),
+]
 
 urlpatterns = [
+    path('v1/async/', include(async_urlpatterns)),
+    path('v1/', include(users_router.urls)),
     path('v1/', include('djoser.urls')),
     path('v1/', include('djoser.urls.jwt')),
     path('v1/', include(api_v1_router.urls)),
@@ -1,80 +1,301 @@
+from collections import Counter
+from io import BytesIO
 from typing import Any
 
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
 from django.shortcuts import get_object_or_404
-from rest_framework import filters, viewsets
-from rest_framework.mixins import CreateModelMixin, ListModelMixin
-from rest_framework.pagination import LimitOffsetPagination
+from djoser.views import UserViewSet as DjoserUserViewSet
+from rest_framework import filters, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.mixins import (
+    CreateModelMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+    RetrieveModelMixin
+)
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 
 from api.serializers import (
     CommentSerializer,
     GroupSerializer,
     PostSerializer,
-    FollowSerializer
+    FollowBatchSerializer,
+    FollowSerializer,
+    ImageUploadFinishSerializer,
+    ImageUploadSerializer
+)
+from api.cache import bump_version_on_commit
+from api.filters import PostSearchFilter
+from api.fast_serializers import (
+    CommentValuesSerializer,
+    PostValuesSerializer
+)
+from api.mixins import (
+    CachedResponseMixin,
+    ConditionalListMixin,
+    SparseFieldsetMixin,
+    ValuesListMixin
+)
+from api.pagination import (
+    CommentPagination,
+    FeedPagination,
+    PostPagination
 )
 from api.permissions import IsAuthorOrReadOnly
-from posts.models import Group, Post
+from api.throttling import IPWriteThrottle, UserWriteThrottle
+from posts.counters import (
+    change_counter,
+    change_follow_counters,
+    change_followers_counters
+)
+from posts.feed import (
+    HybridFeed,
+    backfill_timelines,
+    drop_timelines,
+    fan_out_posts,
+    restore_fan_out
+)
+from posts.follows import delete_follows, insert_follows
+from posts.models import Comment, Follow, Group, ImageUpload, Post
+from posts.uploads import (
+    UploadError,
+    UploadIncomplete,
+    UploadOffsetMismatch,
+    UploadTooLarge,
+    UploadTypeInvalid,
+    append_chunk,
+    cancel_upload,
+    finish_upload,
+    start_upload
+)
+from posts.writer import run_write
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalListMixin, ValuesListMixin,
+                     viewsets.ModelViewSet):
     """Представление для модели Comment."""
 
     serializer_class = CommentSerializer
+    values_serializer_class = CommentValuesSerializer
+    pagination_class = CommentPagination
     permission_classes = (IsAuthorOrReadOnly,)
+    throttle_classes = (UserWriteThrottle, IPWriteThrottle)
+    conditional_namespace = 'comments'
+    conditional_aggregates = {'latest': Max('created'), 'count': Count('pk')}
 
     def get_post(self) -> Post:
         """
-        Получает пост для комментария.
+        Получает пост для комментария один раз за запрос.
+        Загружается только первичный ключ: вложенным маршрутам
+        остальные поля поста не нужны.
         Returns:
             Post: Экземпляр поста
         Raises:
             Http404: Если пост не найден
         """
-        return get_object_or_404(Post, pk=self.kwargs.get('post_id'))
+        if not hasattr(self, '_post'):
+            self._post = get_object_or_404(
+                Post.objects.only('pk'), pk=self.kwargs.get('post_id')
+            )
+        return self._post
 
     def get_queryset(self) -> Any:
         """
         Получает список комментариев для поста.
+        Фильтрует по `post_id` без отдельного запроса к посту:
+        для несуществующего поста набор просто окажется пустым.
         Returns:
             QuerySet: Набор комментариев
         """
-        return self.get_post().comments.all()
+        return Comment.objects.filter(
+            post_id=self.kwargs.get('post_id')
+        ).select_related('author')
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        """
+        Возвращает комментарии поста или 304, если они не изменились.
+        Существование поста проверяется только для пустой выборки.
+        Args:
+            request: Объект запроса
+        Returns:
+            Response: Список или страница комментариев
+        Raises:
+            Http404: Если пост не найден
+        """
+        not_modified = self.get_not_modified_response(request)
+        if not_modified is not None:
+            return self.set_validators(not_modified)
+        queryset = self.get_list_queryset()
+        page = self.paginate_queryset(queryset)
+        comments = list(queryset) if page is None else page
+        if not comments:
+            self.get_post()
+        serializer = self.get_list_serializer(comments)
+        if page is None:
+            return self.set_validators(Response(serializer.data))
+        return self.set_validators(
+            self.get_paginated_response(serializer.data)
+        )
 
     def perform_create(self, serializer: CommentSerializer) -> None:
         """
-        Создает новый комментарий.
+        Создает новый комментарий и увеличивает счетчик поста.
 
         Args:
             serializer: Сериализатор комментария
         """
-        serializer.save(
-            author=self.request.user,
-            post=self.get_post()
+        post = self.get_post()
+
+        def create() -> None:
+            serializer.save(author=self.request.user, post=post)
+            self.change_comments_counter(post.pk, 1)
+
+        run_write(create)
+
+    def perform_destroy(self, instance: Comment) -> None:
+        """
+        Удаляет комментарий и уменьшает счетчик поста.
+
+        Args:
+            instance: Удаляемый комментарий
+        """
+        with transaction.atomic():
+            instance.delete()
+            self.change_comments_counter(instance.post_id, -1)
+
+    @staticmethod
+    def change_comments_counter(post_id: int, delta: int) -> None:
+        """
+        Изменяет счетчик комментариев поста и версию списков постов.
+
+        Args:
+            post_id: Идентификатор поста
+            delta: Изменение счетчика
+        """
+        change_counter(
+            Post.objects.filter(pk=post_id), 'comments_count', delta
         )
+        # UPDATE не отправляет post_save: ETag списков постов меняем явно.
+        bump_version_on_commit('posts')
 
 
-class GroupViewSet(viewsets.ReadOnlyModelViewSet):
+class GroupViewSet(SparseFieldsetMixin, CachedResponseMixin,
+                   viewsets.ReadOnlyModelViewSet):
     """Представление для модели Group."""
 
+    cache_namespace = 'groups'
     queryset = Group.objects.all()
     serializer_class = GroupSerializer
 
 
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(ConditionalListMixin, ValuesListMixin,
+                  viewsets.ModelViewSet):
     """Представление для модели Post."""
 
-    queryset = Post.objects.all()
+    queryset = Post.objects.select_related('author', 'group')
     serializer_class = PostSerializer
-    pagination_class = LimitOffsetPagination
+    values_serializer_class = PostValuesSerializer
+    pagination_class = PostPagination
     permission_classes = (IsAuthorOrReadOnly,)
+    throttle_classes = (UserWriteThrottle, IPWriteThrottle)
+    filter_backends = (PostSearchFilter,)
+    conditional_namespace = 'posts'
+    # MAX по индексу pub_date — один переход по индексу, COUNT(*) был бы
+    # полным сканированием; удаления отражает версия пространства имен.
+    conditional_aggregates = {'latest': Max('pub_date')}
 
     def perform_create(self, serializer: PostSerializer) -> None:
         """
-        Создает новый пост.
+        Создает новый пост и увеличивает счетчик группы.
         Args:
             serializer: Сериализатор поста
         """
-        serializer.save(author=self.request.user)
+
+        def create() -> None:
+            post = serializer.save(author=self.request.user)
+            self.change_group_counter(post.group_id, 1)
+
+        run_write(create)
+
+    def perform_update(self, serializer: PostSerializer) -> None:
+        """
+        Обновляет пост и переносит его в счетчик новой группы.
+        Args:
+            serializer: Сериализатор поста
+        """
+        old_group_id = serializer.instance.group_id
+        with transaction.atomic():
+            post = serializer.save()
+            if post.group_id != old_group_id:
+                self.change_group_counter(old_group_id, -1)
+                self.change_group_counter(post.group_id, 1)
+
+    def perform_destroy(self, instance: Post) -> None:
+        """
+        Удаляет пост и уменьшает счетчик группы.
+        Args:
+            instance: Удаляемый пост
+        """
+        with transaction.atomic():
+            instance.delete()
+            self.change_group_counter(instance.group_id, -1)
+
+    @action(detail=False, methods=('post',), url_path='bulk')
+    def bulk_create(self, request: Any) -> Response:
+        """
+        Создает пачку постов одной транзакцией.
+        Посты проверяются вместе; при ошибке ответ содержит ошибки
+        по каждому элементу в том же порядке, и ничего не создается.
+        Args:
+            request: Объект запроса со списком постов
+        Returns:
+            Response: Созданные посты
+        """
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.POSTS_BULK_MAX_ITEMS
+        )
+        serializer.is_valid(raise_exception=True)
+        posts = [
+            Post(author=request.user, **item)
+            for item in serializer.validated_data
+        ]
+        with transaction.atomic():
+            posts = Post.objects.bulk_create(
+                posts, batch_size=settings.POSTS_BULK_BATCH_SIZE
+            )
+            groups = Counter(post.group_id for post in posts)
+            for group_id, count in groups.items():
+                self.change_group_counter(group_id, count)
+            fan_out_posts(posts)
+            # bulk_create не отправляет сигналы, версию меняем явно.
+            bump_version_on_commit('posts')
+        return Response(
+            self.get_serializer(posts, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @staticmethod
+    def change_group_counter(group_id: Any, delta: int) -> None:
+        """
+        Изменяет счетчик постов группы и версию кэша групп,
+        если пост в группе.
+        Args:
+            group_id: Идентификатор группы или None
+            delta: Изменение счетчика
+        """
+        if group_id is not None:
+            change_counter(
+                Group.objects.filter(pk=group_id), 'posts_count', delta
+            )
+            # UPDATE не отправляет post_save: кэш групп сбрасываем явно.
+            bump_version_on_commit('groups')
 
 
 class FollowViewSet(ListModelMixin, CreateModelMixin, viewsets.GenericViewSet):
@@ -83,6 +304,7 @@ class FollowViewSet(ListModelMixin, CreateModelMixin, viewsets.GenericViewSet):
     serializer_class = FollowSerializer
     permission_classes = (IsAuthenticated,)
     filter_backends = (filters.SearchFilter,)
+    throttle_classes = (UserWriteThrottle, IPWriteThrottle)
     search_fields = ('following__username',)
 
     def get_queryset(self) -> Any:
@@ -91,12 +313,270 @@ class FollowViewSet(ListModelMixin, CreateModelMixin, viewsets.GenericViewSet):
         Returns:
             QuerySet: Набор подписок пользователя
         """
-        return self.request.user.follower.all()
+        return self.request.user.follower.select_related(
+            'user', 'following'
+        )
 
     def perform_create(self, serializer: FollowSerializer) -> None:
         """
-        Создает новую подписку.
+        Создает новую подписку и обновляет счетчики профилей.
         Args:
             serializer: Сериализатор подписки
         """
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            follow = serializer.save(user=self.request.user)
+            change_follow_counters(follow.user_id, follow.following_id, 1)
+
+    def get_serializer_class(self) -> Any:
+        """
+        Выбирает сериализатор пакетных операций для действий `bulk`.
+        Returns:
+            type: Класс сериализатора
+        """
+        if self.action in ('bulk_follow', 'bulk_unfollow'):
+            return FollowBatchSerializer
+        return super().get_serializer_class()
+
+    def get_batch_authors(self, request: Any) -> list[Any]:
+        """
+        Проверяет список имен и загружает авторов одним запросом.
+        Args:
+            request: Объект запроса со списком `following`
+        Returns:
+            list: Авторы из запроса
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return serializer.validated_data['following']
+
+    @action(detail=False, methods=('post',), url_path='bulk')
+    def bulk_follow(self, request: Any) -> Response:
+        """
+        Подписывает текущего пользователя на список авторов.
+        Существующие подписки пропускаются.
+        Args:
+            request: Объект запроса со списком `following`
+        Returns:
+            Response: Созданные подписки
+        """
+        authors = {
+            author.pk: author for author in self.get_batch_authors(request)
+        }
+        with transaction.atomic():
+            created = insert_follows(request.user.pk, list(authors))
+            # Вставка не отправляет сигналы: счетчики и ленты явно.
+            author_ids = [author_id for _, author_id in created]
+            change_followers_counters(request.user.pk, author_ids, 1)
+            backfill_timelines(request.user.pk, author_ids)
+        follows = [
+            Follow(pk=pk, user=request.user, following=authors[author_id])
+            for pk, author_id in created
+        ]
+        return Response(
+            FollowSerializer(follows, many=True).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=('post',), url_path='bulk/delete')
+    def bulk_unfollow(self, request: Any) -> Response:
+        """
+        Отписывает текущего пользователя от списка авторов.
+        Args:
+            request: Объект запроса со списком `following`
+        Returns:
+            Response: Пустой ответ
+        """
+        authors = self.get_batch_authors(request)
+        with transaction.atomic():
+            author_ids = delete_follows(
+                request.user.pk, [author.pk for author in authors]
+            )
+            drop_timelines(request.user.pk, author_ids)
+            restore_fan_out(author_ids)
+            change_followers_counters(request.user.pk, author_ids, -1)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UserViewSet(DjoserUserViewSet):
+    """Пользователи djoser со счетчиками профилей без запроса на строку."""
+
+    def get_queryset(self) -> Any:
+        """
+        Получает пользователей вместе с профилями.
+        Returns:
+            QuerySet: Набор пользователей
+        """
+        return super().get_queryset().select_related('profile')
+
+
+class FeedViewSet(viewsets.GenericViewSet):
+    """Персональная лента постов авторов, на которых подписан пользователь."""
+
+    serializer_class = PostSerializer
+    pagination_class = FeedPagination
+    permission_classes = (IsAuthenticated,)
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        """
+        Возвращает страницу ленты текущего пользователя.
+        Args:
+            request: Объект запроса
+        Returns:
+            Response: Страница постов ленты
+        """
+        page = self.paginate_queryset(HybridFeed(request.user.pk))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+
+class ImageUploadViewSet(CreateModelMixin, RetrieveModelMixin,
+                         DestroyModelMixin, viewsets.GenericViewSet):
+    """
+    Загрузка изображения поста по частям.
+
+    POST создает загрузку, PATCH с заголовком `Upload-Offset` дописывает
+    часть из тела запроса, GET или HEAD сообщают принятое смещение,
+    `finish` прикрепляет файл к посту, DELETE отменяет загрузку.
+    """
+
+    serializer_class = ImageUploadSerializer
+    permission_classes = (IsAuthenticated,)
+    offset_header = 'Upload-Offset'
+    # Ответы на ошибки приема: код и сообщение.
+    upload_errors = {
+        UploadOffsetMismatch: (
+            status.HTTP_409_CONFLICT, 'Смещение не совпадает с принятым'
+        ),
+        UploadTooLarge: (
+            status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            'Принято больше байт, чем объявлено'
+        ),
+        UploadTypeInvalid: (
+            status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            'Файл не является изображением JPEG, PNG, GIF или WebP'
+        ),
+        UploadIncomplete: (
+            status.HTTP_409_CONFLICT, 'Файл принят не полностью'
+        ),
+    }
+
+    def get_queryset(self) -> Any:
+        """
+        Получает загрузки текущего пользователя.
+        Returns:
+            QuerySet: Набор загрузок
+        """
+        return self.request.user.image_uploads.all()
+
+    def perform_create(self, serializer: ImageUploadSerializer) -> None:
+        """
+        Создает загрузку и пустой файл для частей.
+        Args:
+            serializer: Сериализатор загрузки
+        """
+        serializer.instance = start_upload(
+            self.request.user.pk, **serializer.validated_data
+        )
+
+    def perform_destroy(self, instance: ImageUpload) -> None:
+        """
+        Отменяет загрузку и удаляет принятые части.
+        Args:
+            instance: Загрузка
+        """
+        cancel_upload(instance)
+
+    def retrieve(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        """
+        Возвращает состояние загрузки для ее продолжения.
+        Args:
+            request: Объект запроса
+        Returns:
+            Response: Загрузка с заголовком `Upload-Offset`
+        """
+        return self.upload_response(self.get_object())
+
+    def partial_update(self, request: Any, *args: Any,
+                       **kwargs: Any) -> Response:
+        """
+        Дописывает часть файла из тела запроса.
+        Тело читается потоком и не разбирается парсерами DRF.
+        Args:
+            request: Объект запроса с заголовком `Upload-Offset`
+        Returns:
+            Response: Загрузка с новым смещением
+        """
+        upload = self.get_object()
+        try:
+            offset = int(request.headers[self.offset_header])
+        except (KeyError, ValueError):
+            raise ValidationError(
+                {self.offset_header: 'Передайте смещение части в байтах'}
+            )
+        try:
+            append_chunk(upload, offset, request.stream or BytesIO())
+        except UploadError as error:
+            return self.upload_error_response(upload, error)
+        return self.upload_response(upload)
+
+    @action(detail=True, methods=('post',))
+    def finish(self, request: Any, pk: Any = None) -> Response:
+        """
+        Прикрепляет полностью принятый файл к посту автора.
+        Args:
+            request: Объект запроса с идентификатором поста
+            pk: Идентификатор загрузки
+        Returns:
+            Response: Пост с новым изображением
+        """
+        upload = self.get_object()
+        serializer = ImageUploadFinishSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        post = serializer.validated_data['post']
+        if post.author_id != request.user.pk:
+            raise PermissionDenied()
+        try:
+            post = finish_upload(upload, post)
+        except UploadError as error:
+            return self.upload_error_response(upload, error)
+        return Response(
+            PostSerializer(post, context=self.get_serializer_context()).data
+        )
+
+    def upload_response(self, upload: ImageUpload) -> Response:
+        """
+        Формирует ответ с состоянием загрузки.
+        Args:
+            upload: Загрузка
+        Returns:
+            Response: Данные загрузки и заголовок `Upload-Offset`
+        """
+        return Response(
+            self.get_serializer(upload).data,
+            headers={self.offset_header: str(upload.offset)}
+        )
+
+    def upload_error_response(self, upload: ImageUpload,
+                              error: UploadError) -> Response:
+        """
+        Формирует ответ на ошибку приема.
+        Загрузка не изображения отменяется целиком.
+        Args:
+            upload: Загрузка
+            error: Ошибка приема
+        Returns:
+            Response: Описание ошибки и принятое смещение
+        """
+        if isinstance(error, UploadTypeInvalid):
+            cancel_upload(upload)
+            return Response(
+                {'detail': self.upload_errors[UploadTypeInvalid][1]},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        upload.refresh_from_db(fields=('offset',))
+        code, message = self.upload_errors[type(error)]
+        return Response(
+            {'detail': message, 'offset': upload.offset},
+            status=code,
+            headers={self.offset_header: str(upload.offset)}
+        )
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self) -> None:
+        """Подключает обработчики сигналов приложения."""
+        import posts.signals  # noqa: F401
+        from posts.search import create_search_triggers
+
+        post_migrate.connect(create_search_triggers, sender=self)
@@ -0,0 +1,210 @@
+"""
+Денормализованные счетчики постов, комментариев и подписок.
+"""
+from typing import Any, Iterator
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import Comment, Follow, Group, Post, Profile
+
+User = get_user_model()
+
+
+def change_counter(queryset: Any, field: str, delta: int) -> int:
+    """
+    Атомарно изменяет счетчик выражением F() на стороне базы.
+    Уменьшение не опускает счетчик ниже нуля.
+
+    Args:
+        queryset: Набор строк со счетчиком
+        field: Поле счетчика
+        delta: Изменение
+    Returns:
+        int: Количество измененных строк
+    """
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_profile_counter(user_id: int, field: str, delta: int) -> None:
+    """
+    Изменяет счетчик профиля, создавая профиль при его отсутствии.
+
+    Args:
+        user_id: Идентификатор пользователя
+        field: Поле счетчика
+        delta: Изменение
+    """
+    profile = Profile.objects.filter(user_id=user_id)
+    if not change_counter(profile, field, delta) and delta > 0:
+        Profile.objects.bulk_create(
+            (Profile(user_id=user_id),), ignore_conflicts=True
+        )
+        change_counter(profile, field, delta)
+
+
+def change_follow_counters(user_id: int, author_id: int, delta: int) -> None:
+    """
+    Изменяет счетчики подписок читателя и подписчиков автора.
+
+    Args:
+        user_id: Идентификатор подписчика
+        author_id: Идентификатор автора
+        delta: Изменение
+    """
+    change_profile_counter(user_id, 'following_count', delta)
+    change_profile_counter(author_id, 'followers_count', delta)
+
+
+def change_followers_counters(user_id: int, author_ids: list[int],
+                              delta: int) -> None:
+    """
+    Изменяет счетчики после пакетной подписки или отписки.
+    Счетчики всех авторов меняются одним UPDATE.
+
+    Args:
+        user_id: Идентификатор подписчика
+        author_ids: Идентификаторы авторов
+        delta: Изменение для каждого автора
+    """
+    if not author_ids:
+        return
+    change_profile_counter(user_id, 'following_count', delta * len(author_ids))
+    if delta > 0:
+        Profile.objects.bulk_create(
+            (Profile(user_id=author_id) for author_id in author_ids),
+            ignore_conflicts=True
+        )
+    change_counter(
+        Profile.objects.filter(user_id__in=author_ids),
+        'followers_count',
+        delta
+    )
+
+
+def count_of(model: Any, **lookups: Any) -> Coalesce:
+    """
+    Строит подзапрос количества связанных строк.
+
+    Args:
+        model: Модель связанных строк
+        lookups: Условия связи с внешней строкой через OuterRef
+    Returns:
+        Coalesce: Выражение количества, 0 для строк без связей
+    """
+    return Coalesce(
+        Subquery(
+            model.objects.filter(**lookups).order_by().values(
+                *lookups
+            ).annotate(total=Count('pk')).values('total')
+        ),
+        0
+    )
+
+
+def _pk_batches(model: Any, batch_size: int) -> Iterator[list]:
+    """
+    Перебирает первичные ключи модели порциями по возрастанию.
+
+    Args:
+        model: Модель
+        batch_size: Размер порции
+    Yields:
+        list: Первичные ключи порции
+    """
+    queryset = model.objects.order_by('pk').values_list('pk', flat=True)
+    batch = list(queryset[:batch_size])
+    while batch:
+        yield batch
+        batch = list(queryset.filter(pk__gt=batch[-1])[:batch_size])
+
+
+def recount(model: Any, counters: dict, batch_size: int) -> int:
+    """
+    Пересчитывает разошедшиеся счетчики модели порциями.
+
+    Args:
+        model: Модель со счетчиками
+        counters: Поле счетчика и выражение его настоящего значения
+        batch_size: Размер порции
+    Returns:
+        int: Количество исправленных счетчиков
+    """
+    fixed = 0
+    for batch in _pk_batches(model, batch_size):
+        with transaction.atomic():
+            for field, actual in counters.items():
+                drifted = list(
+                    model.objects.filter(pk__in=batch).annotate(
+                        actual=actual
+                    ).exclude(**{field: F('actual')}).values_list(
+                        'pk', flat=True
+                    )
+                )
+                if drifted:
+                    fixed += model.objects.filter(pk__in=drifted).update(
+                        **{field: actual}
+                    )
+    return fixed
+
+
+def create_missing_profiles(batch_size: int) -> int:
+    """
+    Создает профили пользователям, у которых их нет.
+
+    Args:
+        batch_size: Размер порции
+    Returns:
+        int: Количество пользователей без профиля
+    """
+    created = 0
+    for batch in _pk_batches(User, batch_size):
+        missing = set(batch) - set(
+            Profile.objects.filter(user_id__in=batch).values_list(
+                'pk', flat=True
+            )
+        )
+        Profile.objects.bulk_create(
+            (Profile(user_id=user_id) for user_id in missing),
+            ignore_conflicts=True
+        )
+        created += len(missing)
+    return created
+
+
+def recount_all(batch_size: int) -> dict:
+    """
+    Пересчитывает все денормализованные счетчики.
+
+    Args:
+        batch_size: Размер порции
+    Returns:
+        dict: Количество исправлений по моделям
+    """
+    return {
+        'profiles_created': create_missing_profiles(batch_size),
+        'posts': recount(
+            Post,
+            {'comments_count': count_of(Comment, post=OuterRef('pk'))},
+            batch_size
+        ),
+        'groups': recount(
+            Group,
+            {'posts_count': count_of(Post, group=OuterRef('pk'))},
+            batch_size
+        ),
+        'profiles': recount(
+            Profile,
+            {
+                'followers_count': count_of(
+                    Follow, following=OuterRef('pk')
+                ),
+                'following_count': count_of(Follow, user=OuterRef('pk')),
+            },
+            batch_size
+        ),
+    }
@@ -0,0 +1,361 @@
+"""
+Ленты подписок.
+
+Посты обычных авторов раздаются в материализованные ленты подписчиков
+при публикации (fan-out-on-write). Посты авторов, у которых не меньше
+`FEED_CELEBRITY_FOLLOWERS` подписчиков, в ленты не пишутся и подмешиваются
+при чтении (fan-out-on-read) слиянием упорядоченных потоков. Когда
+автор после отписки опускается ниже порога, его последние посты
+дописываются в ленты оставшихся подписчиков.
+"""
+import heapq
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from posts.models import Follow, Post, TimelineEntry
+
+Position = tuple[datetime, int]
+
+
+def _chunked(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Делит поток элементов на списки фиксированного размера.
+
+    Args:
+        items: Поток элементов
+        size: Размер списка
+    Yields:
+        list: Очередная порция элементов
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def is_celebrity(author_id: int) -> bool:
+    """
+    Проверяет, читаются ли посты автора при чтении ленты.
+
+    Args:
+        author_id: Идентификатор автора
+    Returns:
+        bool: True, если подписчиков не меньше порога
+    """
+    return Follow.objects.filter(
+        following_id=author_id
+    ).count() >= settings.FEED_CELEBRITY_FOLLOWERS
+
+
+def get_celebrity_ids(author_ids: Any) -> list[int]:
+    """
+    Отбирает авторов, посты которых не раздаются в ленты.
+
+    Args:
+        author_ids: Идентификаторы авторов или подзапрос с ними
+    Returns:
+        list: Идентификаторы авторов с числом подписчиков не меньше порога
+    """
+    return list(
+        Follow.objects.filter(following_id__in=author_ids)
+        .order_by()
+        .values('following_id')
+        .annotate(followers=Count('id'))
+        .filter(followers__gte=settings.FEED_CELEBRITY_FOLLOWERS)
+        .values_list('following_id', flat=True)
+    )
+
+
+def fan_out_post(post: Post) -> None:
+    """
+    Добавляет новый пост в ленты всех подписчиков автора.
+    Посты авторов с большим числом подписчиков не раздаются.
+
+    Args:
+        post: Опубликованный пост
+    """
+    fan_out_posts([post])
+
+
+def fan_out_posts(posts: list[Post]) -> None:
+    """
+    Раздает пачку постов в ленты подписчиков их авторов.
+    Подписчики каждого автора читаются один раз на всю пачку.
+
+    Args:
+        posts: Опубликованные посты
+    """
+    posts_by_author = {}
+    for post in posts:
+        posts_by_author.setdefault(post.author_id, []).append(post)
+    for author_id, author_posts in posts_by_author.items():
+        if is_celebrity(author_id):
+            continue
+        follower_ids = Follow.objects.filter(
+            following_id=author_id
+        ).order_by().values_list('user_id', flat=True)
+        entries = (
+            TimelineEntry(user_id=user_id, post_id=post.pk,
+                          pub_date=post.pub_date)
+            for user_id in follower_ids.iterator()
+            for post in author_posts
+        )
+        for chunk in _chunked(entries, settings.FEED_FAN_OUT_BATCH_SIZE):
+            TimelineEntry.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+def backfill_timeline(user_id: int, author_id: int) -> None:
+    """
+    Заполняет ленту последними постами автора после подписки.
+
+    Args:
+        user_id: Идентификатор подписчика
+        author_id: Идентификатор автора
+    """
+    backfill_timelines(user_id, [author_id])
+
+
+def backfill_timelines(user_id: int, author_ids: list[int]) -> None:
+    """
+    Заполняет ленту последними постами нескольких авторов.
+    Последние посты каждого автора отбираются одним запросом
+    с оконной функцией.
+
+    Args:
+        user_id: Идентификатор подписчика
+        author_ids: Идентификаторы авторов
+    """
+    author_ids = set(author_ids) - set(get_celebrity_ids(author_ids))
+    if not author_ids:
+        return
+    recent_posts = get_recent_posts(author_ids).values_list('pk', 'pub_date')
+    for chunk in _chunked(
+        (
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in recent_posts.iterator()
+        ),
+        settings.FEED_FAN_OUT_BATCH_SIZE
+    ):
+        TimelineEntry.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+def get_recent_posts(author_ids: Iterable[int]) -> Any:
+    """
+    Отбирает `FEED_BACKFILL_SIZE` последних постов каждого автора
+    одним запросом с оконной функцией.
+
+    Args:
+        author_ids: Идентификаторы авторов
+    Returns:
+        QuerySet: Посты авторов без сортировки
+    """
+    return Post.objects.filter(author_id__in=author_ids).annotate(
+        number=Window(
+            RowNumber(),
+            partition_by=F('author_id'),
+            order_by=(F('pub_date').desc(), F('id').desc())
+        )
+    ).filter(number__lte=settings.FEED_BACKFILL_SIZE).order_by()
+
+
+def restore_fan_out(author_ids: list[int]) -> None:
+    """
+    Возвращает в ленты авторов, которые после отписки опустились ниже
+    `FEED_CELEBRITY_FOLLOWERS`: их посты больше не подмешиваются при
+    чтении, поэтому последние посты дописываются в ленты подписчиков.
+    Каждая отписка уменьшает число подписчиков автора на один, поэтому
+    порог пересекли авторы, у которых осталось ровно на одного меньше.
+
+    Args:
+        author_ids: Идентификаторы авторов, от которых отписались
+    """
+    if not author_ids:
+        return
+    former_celebrity_ids = list(
+        Follow.objects.filter(following_id__in=author_ids)
+        .order_by()
+        .values('following_id')
+        .annotate(followers=Count('id'))
+        .filter(followers=settings.FEED_CELEBRITY_FOLLOWERS - 1)
+        .values_list('following_id', flat=True)
+    )
+    if not former_celebrity_ids:
+        return
+    posts_by_author = {}
+    for author_id, post_id, pub_date in get_recent_posts(
+        former_celebrity_ids
+    ).values_list('author_id', 'pk', 'pub_date'):
+        posts_by_author.setdefault(author_id, []).append((post_id, pub_date))
+    follows = Follow.objects.filter(
+        following_id__in=posts_by_author
+    ).order_by().values_list('user_id', 'following_id')
+    entries = (
+        TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+        for user_id, author_id in follows.iterator()
+        for post_id, pub_date in posts_by_author[author_id]
+    )
+    for chunk in _chunked(entries, settings.FEED_FAN_OUT_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(chunk, ignore_conflicts=True)
+
+
+def rebuild_timelines() -> int:
+    """
+    Пересобирает все ленты по подпискам одним запросом INSERT ... SELECT.
+    В ленту подписчика попадают `FEED_BACKFILL_SIZE` последних постов
+    каждого автора, кроме авторов с большим числом подписчиков, — как
+    при подписке. Нужно после загрузки данных в обход сигналов.
+
+    Returns:
+        int: Количество записей лент
+    """
+    timeline = TimelineEntry._meta.db_table
+    post = Post._meta.db_table
+    follow = Follow._meta.db_table
+    TimelineEntry.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {timeline} (user_id, post_id, pub_date) '
+            f'SELECT f.user_id, p.id, p.pub_date FROM {follow} f '
+            f'JOIN (SELECT id, author_id, pub_date, ROW_NUMBER() OVER ('
+            f'PARTITION BY author_id ORDER BY pub_date DESC, id DESC'
+            f') AS number FROM {post}) p '
+            f'ON p.author_id = f.following_id AND p.number <= %s '
+            f'WHERE f.following_id NOT IN (SELECT following_id '
+            f'FROM {follow} GROUP BY following_id HAVING COUNT(*) >= %s)',
+            [settings.FEED_BACKFILL_SIZE, settings.FEED_CELEBRITY_FOLLOWERS]
+        )
+        return cursor.rowcount
+
+
+def drop_timeline(user_id: int, author_id: int) -> None:
+    """
+    Удаляет посты автора из ленты после отписки.
+
+    Args:
+        user_id: Идентификатор бывшего подписчика
+        author_id: Идентификатор автора
+    """
+    drop_timelines(user_id, [author_id])
+
+
+def drop_timelines(user_id: int, author_ids: list[int]) -> None:
+    """
+    Удаляет посты нескольких авторов из ленты одним запросом.
+
+    Args:
+        user_id: Идентификатор бывшего подписчика
+        author_ids: Идентификаторы авторов
+    """
+    if author_ids:
+        TimelineEntry.objects.filter(
+            user_id=user_id, post__author_id__in=author_ids
+        ).delete()
+
+
+class HybridFeed:
+    """
+    Лента пользователя: материализованные записи и посты знаменитостей.
+
+    Каждый источник отдает позиции `(pub_date, id)` по убыванию,
+    `heapq.merge` сливает их в одну упорядоченную последовательность.
+    """
+
+    def __init__(self, user_id: int) -> None:
+        """
+        Args:
+            user_id: Идентификатор читателя ленты
+        """
+        self.user_id = user_id
+
+    def get_celebrity_ids(self) -> list[int]:
+        """
+        Получает авторов из подписок, посты которых читаются напрямую.
+
+        Returns:
+            list: Идентификаторы авторов
+        """
+        return get_celebrity_ids(
+            Follow.objects.filter(
+                user_id=self.user_id
+            ).order_by().values('following_id')
+        )
+
+    @staticmethod
+    def _before(position: Optional[Position], date_field: str,
+                id_field: str) -> Q:
+        """
+        Строит условие «строго раньше позиции» для ключа `(дата, id)`.
+
+        Args:
+            position: Позиция курсора или None для первой страницы
+            date_field: Поле даты
+            id_field: Поле идентификатора поста
+        Returns:
+            Q: Условие фильтрации
+        """
+        if position is None:
+            return Q()
+        pub_date, post_id = position
+        return Q(**{f'{date_field}__lt': pub_date}) | Q(
+            **{date_field: pub_date, f'{id_field}__lt': post_id}
+        )
+
+    def get_streams(self, before: Optional[Position],
+                    limit: int) -> list[Iterable[Position]]:
+        """
+        Получает упорядоченные потоки позиций для слияния.
+
+        Args:
+            before: Позиция, после которой начинается страница
+            limit: Максимальное число позиций в потоке
+        Returns:
+            list: Поток ленты и по потоку на каждого автора-знаменитость
+        """
+        streams = [
+            TimelineEntry.objects.filter(
+                self._before(before, 'pub_date', 'post_id'),
+                user_id=self.user_id
+            ).order_by('-pub_date', '-post_id').values_list(
+                'pub_date', 'post_id'
+            )[:limit]
+        ]
+        for author_id in self.get_celebrity_ids():
+            streams.append(
+                Post.objects.filter(
+                    self._before(before, 'pub_date', 'id'),
+                    author_id=author_id
+                ).order_by('-pub_date', '-id').values_list(
+                    'pub_date', 'id'
+                )[:limit]
+            )
+        return streams
+
+    def page(self, before: Optional[Position], limit: int) -> list[Post]:
+        """
+        Получает страницу ленты.
+
+        Args:
+            before: Позиция последнего поста предыдущей страницы
+            limit: Размер страницы
+        Returns:
+            list: Посты страницы от новых к старым
+        """
+        merged = heapq.merge(*self.get_streams(before, limit), reverse=True)
+        post_ids = []
+        # Пост автора, перешедшего порог, может быть и в ленте, и в потоке.
+        for _, post_id in merged:
+            if post_id not in post_ids:
+                post_ids.append(post_id)
+            if len(post_ids) == limit:
+                break
+        posts = Post.objects.select_related('author').in_bulk(post_ids)
+        return [posts[post_id] for post_id in post_ids if post_id in posts]
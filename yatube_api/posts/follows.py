@@ -0,0 +1,60 @@
+"""
+Пакетная подписка и отписка одним запросом.
+
+`bulk_create(ignore_conflicts=True)` не сообщает, какие строки пропущены
+как дубликаты, а повторная выборка после вставки не отличит свои строки
+от подписок, которые параллельный запрос зафиксировал между чтением и
+вставкой. Поэтому вставка и удаление выполняются SQL с `RETURNING`
+(SQLite 3.35+, PostgreSQL): база возвращает ровно измененные строки, и
+счетчики меняются только на них. Удаление в обход ORM не отправляет
+post_delete для каждой подписки; ленты очищает вызывающий код.
+"""
+from django.db import connection
+
+from posts.models import Follow
+
+
+def insert_follows(user_id: int,
+                   author_ids: list[int]) -> list[tuple[int, int]]:
+    """
+    Вставляет подписки, пропуская существующие.
+
+    Args:
+        user_id: Идентификатор подписчика
+        author_ids: Идентификаторы авторов
+    Returns:
+        list: Пары идентификаторов вставленной подписки и автора
+    """
+    if not author_ids:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {Follow._meta.db_table} (user_id, following_id) '
+            f'VALUES {", ".join(["(%s, %s)"] * len(author_ids))} '
+            'ON CONFLICT DO NOTHING RETURNING id, following_id',
+            [value for author_id in author_ids
+             for value in (user_id, author_id)]
+        )
+        return cursor.fetchall()
+
+
+def delete_follows(user_id: int, author_ids: list[int]) -> list[int]:
+    """
+    Удаляет подписки без сигналов post_delete.
+
+    Args:
+        user_id: Идентификатор подписчика
+        author_ids: Идентификаторы авторов
+    Returns:
+        list: Идентификаторы авторов удаленных подписок
+    """
+    if not author_ids:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {Follow._meta.db_table} WHERE user_id = %s '
+            f'AND following_id IN ({", ".join(["%s"] * len(author_ids))}) '
+            'RETURNING following_id',
+            [user_id, *author_ids]
+        )
+        return [author_id for author_id, in cursor.fetchall()]
@@ -0,0 +1,161 @@
+"""
+Фоновая обработка изображений постов.
+
+После сохранения поста с новым изображением задача уходит в локальный
+пул потоков: изображение поворачивается по EXIF, из него строятся
+уменьшенные варианты без метаданных, а их пути записываются
+в `Post.image_variants`. Запрос на загрузку обработки не ждет.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+from threading import Lock
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from posts.models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Создает пул потоков обработки при первом обращении.
+
+    Returns:
+        ThreadPoolExecutor: Пул на `POST_IMAGE_WORKERS` потоков
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.POST_IMAGE_WORKERS,
+                thread_name_prefix='post-images'
+            )
+    return _executor
+
+
+def needs_processing(post: Post) -> bool:
+    """
+    Проверяет, построены ли варианты для текущего изображения поста.
+
+    Args:
+        post: Пост
+    Returns:
+        bool: True, если изображение есть и еще не обработано
+    """
+    return bool(post.image) and (
+        post.image_variants.get('source') != post.image.name
+    )
+
+
+def schedule_image_processing(post: Post) -> None:
+    """
+    Ставит обработку изображения в очередь после фиксации транзакции.
+    При `POST_IMAGE_WORKERS = 0` обработка выполняется сразу.
+
+    Args:
+        post: Сохраненный пост с изображением
+    """
+    post_id, source = post.pk, post.image.name
+
+    def submit() -> None:
+        if settings.POST_IMAGE_WORKERS:
+            get_executor().submit(run_in_worker, post_id, source)
+        else:
+            process_post_image(post_id, source)
+
+    transaction.on_commit(submit)
+
+
+def run_in_worker(post_id: int, source: str) -> None:
+    """
+    Обрабатывает изображение в потоке пула и закрывает его соединения.
+    Результат задачи никто не ждет, поэтому ошибка записывается в журнал.
+
+    Args:
+        post_id: Идентификатор поста
+        source: Имя исходного файла
+    """
+    close_old_connections()
+    try:
+        process_post_image(post_id, source)
+    except Exception:
+        logger.exception(
+            'Не удалось обработать изображение %s поста %s', source, post_id
+        )
+    finally:
+        close_old_connections()
+
+
+def render_variant(image: Image.Image, size: tuple[int, int]) -> bytes:
+    """
+    Уменьшает изображение и кодирует его в JPEG без метаданных.
+
+    Args:
+        image: Исходное изображение
+        size: Максимальные ширина и высота
+    Returns:
+        bytes: Содержимое файла
+    """
+    variant = image.copy()
+    variant.thumbnail(size)
+    if variant.mode != 'RGB':
+        variant = variant.convert('RGB')
+    buffer = BytesIO()
+    # Новый файл пишется без info: EXIF, GPS и ICC не переносятся.
+    variant.save(
+        buffer, 'JPEG', quality=settings.POST_IMAGE_QUALITY, optimize=True
+    )
+    return buffer.getvalue()
+
+
+def process_post_image(post_id: int, source: str) -> None:
+    """
+    Строит варианты изображения и сохраняет их пути в посте.
+    Если изображение поста уже заменено, результат отбрасывается.
+
+    Args:
+        post_id: Идентификатор поста
+        source: Имя исходного файла
+    """
+    with default_storage.open(source) as file:
+        image = ImageOps.exif_transpose(Image.open(file))
+        stem = PurePosixPath(source).stem
+        variants = {'source': source}
+        for name, size in settings.POST_IMAGE_VARIANTS.items():
+            variants[name] = default_storage.save(
+                f'posts/variants/{post_id}/{stem}_{name}.jpg',
+                ContentFile(render_variant(image, size))
+            )
+    with transaction.atomic():
+        post = Post.objects.select_for_update().filter(pk=post_id).first()
+        if post is None or post.image.name != source:
+            delete_variants(variants)
+            return
+        old_variants = post.image_variants
+        post.image_variants = variants
+        # save(), а не update(): сигналы сбрасывают кэш списков постов.
+        post.save(update_fields=('image_variants',))
+    delete_variants(old_variants)
+
+
+def delete_variants(variants: dict) -> None:
+    """
+    Удаляет файлы вариантов изображения.
+
+    Args:
+        variants: Имена файлов по названиям вариантов
+    """
+    for name, path in variants.items():
+        if name != 'source':
+            default_storage.delete(path)
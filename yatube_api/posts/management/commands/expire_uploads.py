@@ -0,0 +1,18 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from posts.uploads import expire_uploads
+
+
+class Command(BaseCommand):
+    """Удаляет брошенные загрузки изображений."""
+
+    help = (
+        'Удаляет незавершенные загрузки старше UPLOAD_EXPIRE_SECONDS '
+        'и файлы их частей.'
+    )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Удаляет загрузки и выводит их количество."""
+        self.stdout.write(f'uploads: {expire_uploads()}')
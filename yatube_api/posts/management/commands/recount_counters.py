@@ -0,0 +1,29 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from posts.counters import recount_all
+
+
+class Command(BaseCommand):
+    """Пересчитывает денормализованные счетчики."""
+
+    help = (
+        'Пересчитывает comments_count постов, posts_count групп и '
+        'счетчики подписок в профилях пользователей.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Добавляет аргументы команды."""
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество строк в одной транзакции.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Запускает пересчет и выводит количество исправлений."""
+        fixed = recount_all(options['batch_size'])
+        for name, count in fixed.items():
+            self.stdout.write(f'{name}: {count}')
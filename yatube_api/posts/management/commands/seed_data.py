@@ -0,0 +1,88 @@
+from typing import Any
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser
+)
+
+from posts.seeding import Seeder, SeedError
+
+
+class Command(BaseCommand):
+    """Заполняет базу синтетическими данными для нагрузочных проверок."""
+
+    help = (
+        'Создает пользователей, группы, посты, комментарии и подписки '
+        'со степенными распределениями популярности, затем пересобирает '
+        'индексы, поисковый индекс, счетчики и ленты.'
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Добавляет аргументы команды."""
+        sizes = (
+            ('--users', 100000, 'Количество пользователей.'),
+            ('--groups', 1000, 'Количество групп.'),
+            ('--posts', 1000000, 'Количество постов.'),
+            ('--comments', 2000000, 'Количество комментариев.'),
+            ('--follows', 1000000, 'Примерное количество подписок.'),
+        )
+        for name, default, help_text in sizes:
+            parser.add_argument(name, type=int, default=default,
+                                help=help_text)
+        skews = (
+            ('--author-skew', 'авторов постов'),
+            ('--comment-skew', 'комментируемых постов'),
+            ('--follow-skew', 'авторов в подписках'),
+        )
+        for name, subject in skews:
+            parser.add_argument(
+                name, type=float, default=3.0,
+                help=f'Показатель степенного смещения {subject}; '
+                     '1 — равномерно.'
+            )
+        parser.add_argument(
+            '--follow-alpha', type=float, default=1.5,
+            help='Параметр Парето для числа подписок пользователя (> 1).'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько последних дней опубликованы посты.'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=1,
+            help='Зерно генератора: одинаковое зерно дает одинаковые данные.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Количество строк в одном bulk_create.'
+        )
+        parser.add_argument(
+            '--transaction-size', type=int, default=200000,
+            help='Количество строк в одной транзакции.'
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        """Создает набор и выводит количество строк."""
+        try:
+            seeder = Seeder(
+                users=options['users'],
+                groups=options['groups'],
+                posts=options['posts'],
+                comments=options['comments'],
+                follows=options['follows'],
+                author_skew=options['author_skew'],
+                comment_skew=options['comment_skew'],
+                follow_skew=options['follow_skew'],
+                follow_alpha=options['follow_alpha'],
+                days=options['days'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                transaction_size=options['transaction_size'],
+                log=self.stdout.write if options['verbosity'] > 1 else None
+            )
+            created = seeder.run()
+        except SeedError as error:
+            raise CommandError(error) from error
+        for name, count in created.items():
+            self.stdout.write(f'{name}: {count}')
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.1 on 2026-10-17 22:34
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_image_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(max_length=100, verbose_name='Имя файла')),
+                ('total_size', models.PositiveBigIntegerField(verbose_name='Размер файла')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Принято байт')),
+                ('content_type', models.CharField(blank=True, max_length=20, verbose_name='Тип изображения')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата начала')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+            ],
+            options={
+                'verbose_name': 'Загрузка изображения',
+                'verbose_name_plural': 'Загрузки изображений',
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -1,6 +1,8 @@
 """
 Модели для приложения posts.
 """
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.utils.text import Truncator
@@ -23,6 +25,10 @@ class Group(models.Model):
     description = models.TextField(
         verbose_name='Описание'
     )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов'
+    )
 
     class Meta:
         verbose_name = 'Группа'
@@ -61,6 +67,12 @@ class Post(models.Model):
         blank=True,
         verbose_name='Изображение'
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Варианты изображения'
+    )
     group = models.ForeignKey(
         Group,
         on_delete=models.SET_NULL,
@@ -69,11 +81,21 @@ class Post(models.Model):
         blank=True,
         verbose_name='Группа'
     )
+    comments_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество комментариев'
+    )
 
     class Meta:
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date_id_idx'
+            ),
+        )
 
     def __str__(self) -> str:
         """
@@ -85,6 +107,37 @@ class Post(models.Model):
         return Truncator(self.text).chars(20)
 
 
+class PostSearchIndex(models.Model):
+    """
+    Полнотекстовый индекс постов (виртуальная таблица SQLite FTS5).
+
+    Таблица создается миграцией и синхронизируется триггерами
+    при вставке, изменении и удалении постов. Поле `rank` доступно
+    только в запросах с условием `text__match`.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+        verbose_name='Пост'
+    )
+    text = models.TextField(
+        verbose_name='Текст поста'
+    )
+    rank = models.FloatField(
+        verbose_name='Релевантность'
+    )
+
+    class Meta:
+        managed = False
+        db_table = 'posts_post_fts'
+        verbose_name = 'Поисковый индекс поста'
+        verbose_name_plural = 'Поисковый индекс постов'
+
+
 class Comment(models.Model):
     """Модель комментария для обсуждения постов."""
 
@@ -112,7 +165,13 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('-created',)
+        ordering = ('-created', '-id')
+        indexes = (
+            models.Index(
+                fields=('post', '-created', '-id'),
+                name='comment_post_created_idx'
+            ),
+        )
 
     def __str__(self) -> str:
         """
@@ -163,3 +222,143 @@ class Follow(models.Model):
             str: Имена пользователей
         """
         return f'{self.user} подписан на {self.following}'
+
+
+class Profile(models.Model):
+    """Профиль пользователя со счетчиками подписок."""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='profile',
+        verbose_name='Пользователь'
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписчиков'
+    )
+    following_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество подписок'
+    )
+
+    class Meta:
+        verbose_name = 'Профиль'
+        verbose_name_plural = 'Профили'
+
+    def __str__(self) -> str:
+        """
+        Возвращает строковое представление профиля.
+
+        Returns:
+            str: Имя пользователя
+        """
+        return str(self.user)
+
+
+class TimelineEntry(models.Model):
+    """
+    Запись персональной ленты пользователя.
+
+    Лента материализуется при публикации поста: каждый подписчик автора
+    получает запись, поэтому чтение ленты не требует объединения подписок.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField(
+        'Дата публикации'
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        ordering = ('-pub_date', '-post_id')
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_pub_date_idx'
+            ),
+        )
+
+    def __str__(self) -> str:
+        """
+        Возвращает строковое представление записи ленты.
+
+        Returns:
+            str: Читатель и пост
+        """
+        return f'{self.user}: {self.post}'
+
+
+class ImageUpload(models.Model):
+    """
+    Незавершенная загрузка изображения по частям.
+
+    Части дописываются в файл `MEDIA_ROOT/uploads/<id>.part`, `offset`
+    хранит число принятых байт, с него загрузка продолжается после обрыва.
+    """
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='image_uploads',
+        verbose_name='Пользователь'
+    )
+    filename = models.CharField(
+        max_length=100,
+        verbose_name='Имя файла'
+    )
+    total_size = models.PositiveBigIntegerField(
+        verbose_name='Размер файла'
+    )
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Принято байт'
+    )
+    content_type = models.CharField(
+        max_length=20,
+        blank=True,
+        verbose_name='Тип изображения'
+    )
+    created = models.DateTimeField(
+        'Дата начала',
+        auto_now_add=True
+    )
+
+    class Meta:
+        verbose_name = 'Загрузка изображения'
+        verbose_name_plural = 'Загрузки изображений'
+        ordering = ('-created',)
+
+    def __str__(self) -> str:
+        """
+        Возвращает строковое представление загрузки.
+
+        Returns:
+            str: Имя файла и прогресс
+        """
+        return f'{self.filename}: {self.offset}/{self.total_size}'
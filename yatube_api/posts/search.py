@@ -0,0 +1,134 @@
+"""
+Полнотекстовый поиск по постам.
+"""
+import re
+from typing import Any
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import F, FloatField, Lookup, Value
+
+from posts.models import PostSearchIndex
+
+TOKEN_RE = re.compile(r'\w+')
+
+# Триггеры синхронизации индекса с posts_post. SQLite удаляет их при
+# пересоздании таблицы в миграциях, поэтому они создаются после каждой
+# команды migrate, а не в миграции.
+SEARCH_TRIGGERS = {
+    'posts_post_fts_insert': (
+        'AFTER INSERT ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+    'posts_post_fts_delete': (
+        'AFTER DELETE ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(posts_post_fts, rowid, text) '
+        "VALUES ('delete', old.id, old.text); "
+        'END'
+    ),
+    'posts_post_fts_update': (
+        'AFTER UPDATE OF text ON posts_post BEGIN '
+        'INSERT INTO posts_post_fts(posts_post_fts, rowid, text) '
+        "VALUES ('delete', old.id, old.text); "
+        'INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text); '
+        'END'
+    ),
+}
+
+
+class Match(Lookup):
+    """Условие FTS5 `MATCH` для столбца полнотекстового индекса."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler: Any, connection: Any) -> tuple[str, list]:
+        """Формирует SQL условия."""
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+PostSearchIndex._meta.get_field('text').register_lookup(Match)
+
+
+def build_match_query(query: str) -> str:
+    """
+    Превращает пользовательский запрос в безопасный запрос FTS5.
+    Каждое слово берется в кавычки, слова объединяются по И.
+
+    Args:
+        query: Строка поиска
+    Returns:
+        str: Запрос FTS5 или пустая строка, если слов нет
+    """
+    return ' '.join(f'"{token}"' for token in TOKEN_RE.findall(query))
+
+
+def search_posts(queryset: Any, query: str) -> Any:
+    """
+    Отбирает посты по запросу и добавляет релевантность `search_rank`.
+    Чем меньше `search_rank`, тем выше пост в выдаче.
+
+    Args:
+        queryset: Набор постов
+        query: Строка поиска
+    Returns:
+        QuerySet: Найденные посты
+    """
+    match_query = build_match_query(query)
+    if not match_query:
+        return queryset.none()
+    if connection.vendor != 'sqlite':
+        for token in TOKEN_RE.findall(query):
+            queryset = queryset.filter(text__icontains=token)
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+    return queryset.filter(
+        search_index__text__match=match_query
+    ).annotate(search_rank=F('search_index__rank'))
+
+
+def rebuild_search_index() -> None:
+    """
+    Перестраивает полнотекстовый индекс по таблице постов.
+    Нужно после загрузки постов без триггеров индекса.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    table = PostSearchIndex._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def create_search_triggers(using: str = DEFAULT_DB_ALIAS,
+                           **kwargs: Any) -> None:
+    """
+    Создает недостающие триггеры поискового индекса после migrate.
+    Если триггеров не было, посты могли меняться без них, поэтому
+    индекс перестраивается.
+
+    Args:
+        using: Псевдоним базы
+        kwargs: Остальные аргументы сигнала post_migrate
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return
+    table = PostSearchIndex._meta.db_table
+    with db.cursor() as cursor:
+        cursor.execute(
+            'SELECT type, name FROM sqlite_master '
+            "WHERE name = %s OR type = 'trigger' AND tbl_name = 'posts_post'",
+            [table]
+        )
+        existing = {name for _, name in cursor.fetchall()}
+        if table not in existing:
+            return
+        missing = set(SEARCH_TRIGGERS) - existing
+        for name in sorted(missing):
+            cursor.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {name} {SEARCH_TRIGGERS[name]}'
+            )
+        if missing:
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
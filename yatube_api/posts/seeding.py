@@ -0,0 +1,381 @@
+"""
+Генерация больших синтетических наборов данных.
+
+Строки создаются генераторами и вставляются пачками `bulk_create`
+в крупных транзакциях, поэтому память не зависит от объема набора.
+На время загрузки индексы таблиц постов, комментариев, подписок и лент
+и триггеры поискового индекса удаляются: построить индекс по готовой
+таблице быстрее, чем обновлять его на каждую строку. `bulk_create`
+не вызывает сигналы, поэтому поисковый индекс, счетчики и ленты
+пересобираются после загрузки.
+
+Популярность распределена по степенному закону: номер автора поста,
+комментируемого поста или автора в подписке равен `n * random() ** skew`,
+так что доля `x` самых популярных получает долю `x ** (1 / skew)` строк.
+Число подписок пользователя распределено по Парето.
+"""
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from functools import lru_cache
+from itertools import islice
+from math import gcd
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.db.models import Max, Min, Model
+from django.utils import timezone
+
+from posts.counters import recount_all
+from posts.feed import rebuild_timelines
+from posts.models import Comment, Follow, Group, Post, TimelineEntry
+from posts.search import rebuild_search_index
+
+User = get_user_model()
+
+WORDS = (
+    'город', 'море', 'книга', 'музыка', 'кино', 'спорт', 'утро', 'кофе',
+    'работа', 'отпуск', 'горы', 'дорога', 'кот', 'собака', 'сад', 'код',
+    'поезд', 'дождь', 'лето', 'зима', 'друзья', 'выставка', 'театр', 'река',
+)
+# Множитель, переставляющий номера популярности по таблице: популярные
+# посты и авторы не скапливаются в начале диапазона ключей.
+SCATTER = 2654435761
+
+
+class SeedError(Exception):
+    """Набор нельзя создать в текущей базе."""
+
+
+def skewed(rng: random.Random, count: int, skew: float) -> int:
+    """
+    Выбирает номер от 0 до count - 1 со смещением к популярным.
+
+    Args:
+        rng: Генератор случайных чисел
+        count: Размер диапазона
+        skew: Показатель смещения; 1 — равномерно
+    Returns:
+        int: Номер
+    """
+    return int(count * rng.random() ** skew)
+
+
+@lru_cache
+def scatter_stride(count: int) -> int:
+    """
+    Подбирает множитель, взаимно простой с размером диапазона.
+
+    Args:
+        count: Размер диапазона
+    Returns:
+        int: Множитель
+    """
+    stride = SCATTER
+    while gcd(stride, count) != 1:
+        stride += 1
+    return stride
+
+
+def scatter(number: int, count: int) -> int:
+    """
+    Переставляет номера диапазона взаимно однозначно.
+
+    Args:
+        number: Номер от 0 до count - 1
+        count: Размер диапазона
+    Returns:
+        int: Номер после перестановки
+    """
+    return number * scatter_stride(count) % count
+
+
+@contextmanager
+def dropped_schema(kind: str, models: Iterable[type[Model]]) -> Iterator:
+    """
+    Удаляет индексы или триггеры таблиц и создает их заново на выходе.
+    Индексы первичных ключей и ограничений столбцов не удаляются.
+    Работает только в SQLite, в других базах ничего не делает.
+
+    Args:
+        kind: 'index' или 'trigger'
+        models: Модели, таблицы которых затрагиваются
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT name, sql FROM sqlite_master WHERE type = %s '
+            'AND sql IS NOT NULL AND tbl_name IN '
+            f'({", ".join(["%s"] * len(tables))})',
+            [kind, *tables]
+        )
+        objects = cursor.fetchall()
+        for name, _ in objects:
+            cursor.execute(f'DROP {kind.upper()} "{name}"')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for _, sql in objects:
+                cursor.execute(sql)
+
+
+@contextmanager
+def explicit_dates(*fields: Any) -> Iterator:
+    """
+    Отключает `auto_now_add`, чтобы `bulk_create` сохранил заданные даты.
+
+    Args:
+        fields: Поля дат моделей
+    """
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Seeder:
+    """Генератор набора данных с заданными размерами и распределениями."""
+
+    def __init__(self, users: int, groups: int, posts: int, comments: int,
+                 follows: int, author_skew: float = 3.0,
+                 comment_skew: float = 3.0, follow_skew: float = 3.0,
+                 follow_alpha: float = 1.5, days: int = 365, seed: int = 1,
+                 batch_size: int = 10000, transaction_size: int = 200000,
+                 log: Optional[Callable[[str], None]] = None) -> None:
+        """
+        Args:
+            users: Число пользователей
+            groups: Число групп
+            posts: Число постов
+            comments: Число комментариев
+            follows: Примерное число подписок
+            author_skew: Смещение авторов постов
+            comment_skew: Смещение комментируемых постов
+            follow_skew: Смещение авторов в подписках
+            follow_alpha: Параметр Парето для числа подписок пользователя
+            days: За сколько последних дней опубликованы посты
+            seed: Зерно генератора
+            batch_size: Строк в одном `bulk_create`
+            transaction_size: Строк в одной транзакции
+            log: Функция вывода хода загрузки
+        Raises:
+            SeedError: Параметры не позволяют построить набор
+        """
+        if users < 2 and follows:
+            raise SeedError('Для подписок нужно хотя бы два пользователя.')
+        if (posts or comments) and not users or comments and not posts:
+            raise SeedError('Не хватает авторов или постов.')
+        if follow_alpha <= 1:
+            raise SeedError('follow_alpha должен быть больше 1.')
+        self.users = users
+        self.groups = groups
+        self.posts = posts
+        self.comments = comments
+        self.follows = follows
+        self.author_skew = author_skew
+        self.comment_skew = comment_skew
+        self.follow_skew = follow_skew
+        self.follow_alpha = follow_alpha
+        self.batch_size = batch_size
+        self.transaction_size = transaction_size
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=days)
+
+    def run(self) -> dict[str, int]:
+        """
+        Загружает набор и пересобирает производные данные.
+
+        Returns:
+            dict: Число созданных строк по таблицам
+        """
+        created = {}
+        with dropped_schema('index', (TimelineEntry,)):
+            with dropped_schema('index', (Post, Comment, Follow)), \
+                    dropped_schema('trigger', (Post,)), \
+                    explicit_dates(Post._meta.get_field('pub_date'),
+                                   Comment._meta.get_field('created')):
+                created['users'], first_user = self.insert(
+                    User, self.user_rows()
+                )
+                created['groups'], first_group = self.insert(
+                    Group, self.group_rows()
+                )
+                created['posts'], first_post = self.insert(
+                    Post, self.post_rows(first_user, first_group)
+                )
+                created['comments'], _ = self.insert(
+                    Comment, self.comment_rows(first_user, first_post)
+                )
+                created['follows'], _ = self.insert(
+                    Follow, self.follow_rows(first_user)
+                )
+                self.log('Создание индексов')
+            self.stage('Поисковый индекс', rebuild_search_index)
+            self.stage('Счетчики', lambda: recount_all(self.batch_size))
+            created['timeline'] = self.stage('Ленты', rebuild_timelines)
+            self.log('Создание индексов лент')
+        return created
+
+    def stage(self, name: str, run: Callable[[], Any]) -> Any:
+        """
+        Выполняет этап в транзакции и выводит его длительность.
+
+        Args:
+            name: Название этапа
+            run: Функция этапа
+        Returns:
+            Any: Результат функции
+        """
+        started = time.perf_counter()
+        with transaction.atomic():
+            result = run()
+        self.log(f'{name}: {time.perf_counter() - started:.1f} с')
+        return result
+
+    def insert(self, model: type[Model],
+               rows: Iterable[Model]) -> tuple[int, Optional[int]]:
+        """
+        Вставляет поток строк пачками в крупных транзакциях.
+
+        Args:
+            model: Модель
+            rows: Поток несохраненных объектов
+        Returns:
+            tuple: Число строк и первичный ключ первой из них
+        Raises:
+            SeedError: Ключи новых строк идут не подряд
+        """
+        name = model._meta.db_table
+        before = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        started = time.perf_counter()
+        rows = iter(rows)
+        total = 0
+        chunk = list(islice(rows, self.batch_size))
+        while chunk:
+            with transaction.atomic():
+                inserted = 0
+                while chunk and inserted < self.transaction_size:
+                    model.objects.bulk_create(chunk)
+                    inserted += len(chunk)
+                    chunk = list(islice(rows, self.batch_size))
+            total += inserted
+            self.log(f'{name}: {total}')
+        keys = model.objects.filter(pk__gt=before).aggregate(
+            first=Min('pk'), last=Max('pk')
+        )
+        if total and keys['last'] - keys['first'] + 1 != total:
+            raise SeedError(f'{name}: ключи новых строк идут не подряд.')
+        self.log(f'{name}: {total} за {time.perf_counter() - started:.1f} с')
+        return total, keys['first']
+
+    def text(self, number: int) -> str:
+        """
+        Строит текст из словаря, чтобы поиск находил строки.
+
+        Args:
+            number: Номер строки
+        Returns:
+            str: Текст
+        """
+        words = self.rng.choices(WORDS, k=self.rng.randint(5, 30))
+        return f'{" ".join(words)} {number}'
+
+    def post_date(self, number: int) -> Any:
+        """
+        Дата публикации поста: посты с большим номером новее.
+
+        Args:
+            number: Номер поста от 0
+        Returns:
+            datetime: Дата публикации
+        """
+        return self.start + (self.now - self.start) * (number / self.posts)
+
+    def user_rows(self) -> Iterator[User]:
+        """Пользователи с неиспользуемым паролем."""
+        offset = User.objects.aggregate(last=Max('pk'))['last'] or 0
+        password = make_password(None)
+        for number in range(self.users):
+            yield User(username=f'seed_{offset + number}', password=password)
+
+    def group_rows(self) -> Iterator[Group]:
+        """Группы."""
+        offset = Group.objects.aggregate(last=Max('pk'))['last'] or 0
+        for number in range(offset, offset + self.groups):
+            yield Group(
+                title=f'Группа {number}', slug=f'seed-{number}',
+                description=self.text(number)
+            )
+
+    def post_rows(self, first_user: int,
+                  first_group: Optional[int]) -> Iterator[Post]:
+        """Посты популярных авторов чаще, половина — в группах."""
+        for number in range(self.posts):
+            author = scatter(
+                skewed(self.rng, self.users, self.author_skew), self.users
+            )
+            group_id = None
+            if self.groups and self.rng.random() < 0.5:
+                group_id = first_group + self.rng.randrange(self.groups)
+            yield Post(
+                author_id=first_user + author, group_id=group_id,
+                text=self.text(number), pub_date=self.post_date(number)
+            )
+
+    def comment_rows(self, first_user: int,
+                     first_post: int) -> Iterator[Comment]:
+        """Комментарии к популярным постам чаще, после публикации поста."""
+        for number in range(self.comments):
+            post = scatter(
+                skewed(self.rng, self.posts, self.comment_skew), self.posts
+            )
+            published = self.post_date(post)
+            yield Comment(
+                author_id=first_user + self.rng.randrange(self.users),
+                post_id=first_post + post,
+                text=self.text(number),
+                created=published + (self.now - published) * self.rng.random()
+            )
+
+    def follow_rows(self, first_user: int) -> Iterator[Follow]:
+        """
+        Подписки: число на пользователя по Парето со средним
+        `follows / users`, авторы выбираются со смещением к популярным.
+        """
+        if not self.follows:
+            return
+        mean = self.follows / self.users
+        scale = mean * (self.follow_alpha - 1) / self.follow_alpha
+        for user in range(self.users):
+            count = min(
+                self.users - 1,
+                round(scale * self.rng.paretovariate(self.follow_alpha))
+            )
+            authors = set()
+            # Попытки ограничены: у популярных авторов выборка повторяется.
+            for _ in range(count * 3):
+                if len(authors) == count:
+                    break
+                author = scatter(
+                    skewed(self.rng, self.users, self.follow_skew),
+                    self.users
+                )
+                if author != user:
+                    authors.add(author)
+            for author in sorted(authors):
+                yield Follow(
+                    user_id=first_user + user,
+                    following_id=first_user + author
+                )
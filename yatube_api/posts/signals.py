@@ -0,0 +1,63 @@
+"""
+Обработчики сигналов моделей приложения posts.
+"""
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.feed import (
+    backfill_timeline,
+    drop_timeline,
+    fan_out_post,
+    restore_fan_out
+)
+from posts.images import (
+    delete_variants,
+    needs_processing,
+    schedule_image_processing
+)
+from posts.models import Follow, Post
+
+
+@receiver(post_save, sender=Post)
+def post_published(sender: Any, instance: Post, created: bool,
+                   **kwargs: Any) -> None:
+    """Раздает новый пост в ленты подписчиков автора."""
+    if created:
+        fan_out_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def post_image_saved(sender: Any, instance: Post, **kwargs: Any) -> None:
+    """Отправляет новое изображение поста на обработку."""
+    if needs_processing(instance):
+        schedule_image_processing(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender: Any, instance: Post, **kwargs: Any) -> None:
+    """Удаляет файлы вариантов изображения удаленного поста."""
+    if instance.image_variants:
+        transaction.on_commit(
+            lambda: delete_variants(instance.image_variants)
+        )
+
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender: Any, instance: Follow, created: bool,
+                   **kwargs: Any) -> None:
+    """Заполняет ленту подписчика постами нового автора."""
+    if created:
+        backfill_timeline(instance.user_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender: Any, instance: Follow, **kwargs: Any) -> None:
+    """
+    Убирает посты автора из ленты бывшего подписчика и раздает их
+    оставшимся, если автор опустился ниже порога знаменитостей.
+    """
+    drop_timeline(instance.user_id, instance.following_id)
+    restore_fan_out([instance.following_id])
@@ -0,0 +1,234 @@
+"""
+Загрузка изображений по частям с возобновлением.
+
+Части читаются из потока запроса блоками `UPLOAD_CHUNK_SIZE` и сразу
+дописываются на диск, поэтому память не зависит от размера файла.
+Размер проверяется до записи каждого блока, тип — по сигнатуре
+в первых байтах файла, как только они приняты.
+"""
+import fcntl
+from datetime import timedelta
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image
+
+from posts.models import ImageUpload, Post
+
+# Сигнатуры допустимых форматов: смещение, байты и тип.
+SIGNATURES = (
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (8, b'WEBP', 'image/webp'),
+)
+SIGNATURE_SIZE = 12
+
+
+class UploadError(Exception):
+    """Ошибка приема части загрузки."""
+
+
+class UploadOffsetMismatch(UploadError):
+    """Часть начинается не с принятого смещения."""
+
+
+class UploadTooLarge(UploadError):
+    """Принято больше байт, чем объявлено или разрешено."""
+
+
+class UploadTypeInvalid(UploadError):
+    """Начало файла не совпадает с сигнатурой изображения."""
+
+
+class UploadIncomplete(UploadError):
+    """Файл принят не полностью."""
+
+
+def get_upload_path(upload: ImageUpload) -> Path:
+    """
+    Получает путь к файлу принятых частей.
+
+    Args:
+        upload: Загрузка
+    Returns:
+        Path: Путь внутри `MEDIA_ROOT/uploads`
+    """
+    return Path(settings.MEDIA_ROOT) / 'uploads' / f'{upload.pk}.part'
+
+
+def detect_image_type(head: bytes) -> Optional[str]:
+    """
+    Определяет тип изображения по первым байтам файла.
+
+    Args:
+        head: Первые `SIGNATURE_SIZE` байт
+    Returns:
+        str: MIME-тип или None для неизвестного формата
+    """
+    for offset, signature, content_type in SIGNATURES:
+        if head[offset:offset + len(signature)] == signature:
+            return content_type
+    return None
+
+
+def start_upload(user_id: int, filename: str,
+                 total_size: int) -> ImageUpload:
+    """
+    Создает загрузку и пустой файл для ее частей.
+
+    Args:
+        user_id: Идентификатор пользователя
+        filename: Имя исходного файла
+        total_size: Объявленный размер файла
+    Returns:
+        ImageUpload: Новая загрузка
+    """
+    upload = ImageUpload.objects.create(
+        user_id=user_id, filename=filename, total_size=total_size
+    )
+    path = get_upload_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return upload
+
+
+def append_chunk(upload: ImageUpload, offset: int, stream: BinaryIO) -> None:
+    """
+    Дописывает часть из потока и сдвигает смещение загрузки.
+
+    Args:
+        upload: Загрузка
+        offset: Смещение начала части, объявленное клиентом
+        stream: Поток тела запроса
+    Raises:
+        UploadOffsetMismatch: Смещение не совпадает с принятым
+        UploadTooLarge: Часть выходит за объявленный размер
+        UploadTypeInvalid: Файл не является изображением
+    """
+    with open(get_upload_path(upload), 'r+b') as file:
+        # Блокировка снимается при закрытии файла. Смещение читается
+        # под ней, поэтому параллельная часть с тем же смещением ждет
+        # и получает отказ, а не перезаписывает принятые байты.
+        fcntl.flock(file, fcntl.LOCK_EX)
+        upload.offset = ImageUpload.objects.values_list(
+            'offset', flat=True
+        ).get(pk=upload.pk)
+        if offset != upload.offset:
+            raise UploadOffsetMismatch(upload.offset)
+        # Хвост оборванной части, не учтенный в offset, отбрасывается.
+        file.truncate(offset)
+        file.seek(offset)
+        received = offset
+        while True:
+            block = stream.read(settings.UPLOAD_CHUNK_SIZE)
+            if not block:
+                break
+            received += len(block)
+            if received > upload.total_size:
+                raise UploadTooLarge(upload.total_size)
+            file.write(block)
+            if not upload.content_type and received >= min(
+                SIGNATURE_SIZE, upload.total_size
+            ):
+                file.flush()
+                upload.content_type = check_signature(file)
+        ImageUpload.objects.filter(pk=upload.pk).update(
+            offset=received, content_type=upload.content_type
+        )
+    upload.offset = received
+
+
+def check_signature(file: BinaryIO) -> str:
+    """
+    Проверяет сигнатуру в начале файла частей.
+
+    Args:
+        file: Открытый файл частей
+    Returns:
+        str: MIME-тип изображения
+    Raises:
+        UploadTypeInvalid: Формат не поддерживается
+    """
+    position = file.tell()
+    file.seek(0)
+    content_type = detect_image_type(file.read(SIGNATURE_SIZE))
+    file.seek(position)
+    if content_type is None:
+        raise UploadTypeInvalid()
+    return content_type
+
+
+def finish_upload(upload: ImageUpload, post: Post) -> Post:
+    """
+    Проверяет принятый файл и прикрепляет его к посту.
+
+    Args:
+        upload: Полностью принятая загрузка
+        post: Пост, которому назначается изображение
+    Returns:
+        Post: Пост с новым изображением
+    Raises:
+        UploadIncomplete: Приняты не все байты
+        UploadTypeInvalid: Файл не открывается как изображение
+    """
+    if upload.offset != upload.total_size:
+        raise UploadIncomplete(upload.offset)
+    path = get_upload_path(upload)
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except Exception as error:
+        raise UploadTypeInvalid() from error
+    with transaction.atomic(), open(path, 'rb') as file:
+        # Хранилище копирует файл блоками, не загружая его в память.
+        post.image.save(upload.filename, File(file), save=False)
+        # Только изображение: полное сохранение вернуло бы в базу
+        # прочитанный comments_count поверх параллельных F()-изменений.
+        post.save(update_fields=('image',))
+        upload.delete()
+        transaction.on_commit(lambda: path.unlink(missing_ok=True))
+    return post
+
+
+def cancel_upload(upload: ImageUpload) -> None:
+    """
+    Удаляет загрузку и принятые части.
+
+    Args:
+        upload: Загрузка
+    """
+    get_upload_path(upload).unlink(missing_ok=True)
+    upload.delete()
+
+
+def expire_uploads() -> int:
+    """
+    Удаляет загрузки старше `UPLOAD_EXPIRE_SECONDS` вместе с частями,
+    а также файлы частей без загрузки, оставшиеся после сбоя.
+
+    Returns:
+        int: Количество удаленных загрузок
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.UPLOAD_EXPIRE_SECONDS)
+    expired = 0
+    for upload in ImageUpload.objects.filter(created__lt=cutoff).iterator():
+        cancel_upload(upload)
+        expired += 1
+    directory = Path(settings.MEDIA_ROOT) / 'uploads'
+    if not directory.is_dir():
+        return expired
+    active = {
+        str(pk) for pk in ImageUpload.objects.values_list('pk', flat=True)
+    }
+    for path in directory.glob('*.part'):
+        if path.stem not in active and (
+            path.stat().st_mtime < cutoff.timestamp()
+        ):
+            path.unlink(missing_ok=True)
+    return expired
@@ -0,0 +1,166 @@
+"""
+Очередь записи с единственным писателем.
+
+SQLite допускает одну пишущую транзакцию: при всплеске публикаций
+конкурирующие запросы ждут блокировку и получают `database is locked`.
+При `WRITE_QUEUE_ENABLED` запросы передают запись в очередь, а один
+поток собирает их в пакет за `WRITE_QUEUE_INTERVAL` секунд и выполняет
+в одной транзакции. Каждая запись идет в своей точке сохранения:
+ошибка одной откатывает только ее. Запрос ждет фиксации пакета и
+получает результат своей функции. Внешние ключи SQLite проверяет только
+при фиксации, и такую ошибку нельзя отнести к одной записи: тогда записи
+пакета повторяются по одной, каждая в своей транзакции.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+_writer: Optional['WriteQueue'] = None
+_writer_lock = threading.Lock()
+
+
+class WriteQueue:
+    """Очередь функций записи, которые выполняет один поток."""
+
+    def __init__(self) -> None:
+        self.queue: queue.Queue = queue.Queue()
+        self.thread = threading.Thread(
+            target=self.run, name='write-queue', daemon=True
+        )
+        self.thread.start()
+
+    def submit(self, func: Callable[[], Any]) -> Any:
+        """
+        Ставит запись в очередь и ждет фиксации ее пакета.
+
+        Запись, которая к истечению `WRITE_QUEUE_TIMEOUT` еще ждет в
+        очереди, отменяется. Уже выполняемую запись отменить нельзя:
+        тогда ожидание продолжается до фиксации пакета, чтобы клиент не
+        получил ошибку о сохраненной записи и не повторил ее.
+
+        Args:
+            func: Функция записи
+        Returns:
+            Any: Результат функции
+        Raises:
+            Exception: Исключение функции или фиксации пакета
+            TimeoutError: Запись не начала выполняться за
+                `WRITE_QUEUE_TIMEOUT` и отменена
+        """
+        future: Future = Future()
+        self.queue.put((func, future))
+        try:
+            return future.result(timeout=settings.WRITE_QUEUE_TIMEOUT)
+        except FutureTimeoutError:
+            # Клиент получит ошибку: запись, еще ждущая в очереди, не
+            # должна зафиксироваться после ответа и задвоиться при повторе.
+            if future.cancel():
+                raise
+        return future.result()
+
+    def collect(self) -> list[tuple[Callable[[], Any], Future]]:
+        """
+        Ждет первую запись и добирает пакет до конца интервала.
+
+        Returns:
+            list: Функции записи с их результатами
+        """
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + settings.WRITE_QUEUE_INTERVAL
+        while len(batch) < settings.WRITE_QUEUE_MAX_BATCH:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self) -> None:
+        """Выполняет пакеты записей, пока работает процесс."""
+        while True:
+            batch = self.collect()
+            close_old_connections()
+            self.execute(batch)
+
+    def execute(self, batch: list[tuple[Callable[[], Any], Future]]) -> None:
+        """
+        Выполняет пакет в одной транзакции и передает результаты.
+
+        Если пакет не зафиксирован, например из-за внешнего ключа,
+        записи повторяются по одной: ошибка достается только виновной.
+
+        Args:
+            batch: Функции записи с их результатами
+        """
+        running = [
+            (func, future) for func, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        try:
+            with transaction.atomic():
+                outcomes = [self.attempt(func) for func, _ in running]
+        except Exception:
+            outcomes = [self.attempt(func) for func, _ in running]
+        for (_, future), (result, error) in zip(running, outcomes):
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    @staticmethod
+    def attempt(func: Callable[[], Any]) -> tuple[Any, Optional[Exception]]:
+        """
+        Выполняет запись в своей транзакции или точке сохранения.
+
+        Args:
+            func: Функция записи
+        Returns:
+            tuple: Результат функции и исключение или None
+        """
+        try:
+            with transaction.atomic():
+                return func(), None
+        except Exception as error:
+            return None, error
+
+
+def get_writer() -> WriteQueue:
+    """
+    Запускает поток записи при первом обращении.
+
+    Returns:
+        WriteQueue: Очередь записи процесса
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = WriteQueue()
+    return _writer
+
+
+def run_write(func: Callable[[], Any]) -> Any:
+    """
+    Выполняет запись в транзакции: через очередь, если она включена,
+    иначе сразу. Внутри уже открытой транзакции, в том числе в самом
+    потоке записи, функция выполняется сразу: иначе она не увидела бы
+    несохраненные данные вызывающего кода или ждала бы сама себя.
+
+    Args:
+        func: Функция записи
+    Returns:
+        Any: Результат функции
+    """
+    if (
+        not settings.WRITE_QUEUE_ENABLED
+        or connection.in_atomic_block
+    ):
+        with transaction.atomic():
+            return func()
+    return get_writer().submit(func)
@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 from datetime import timedelta
@@ -32,6 +34,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube_api.urls'
@@ -64,6 +67,70 @@ DATABASES = {
     }
 }
 
+# Профиль базы для production включается переменной окружения
+# DB_PROFILE=production: журнал WAL (чтение не блокирует запись),
+# прагмы при открытии соединения и постоянные соединения.
+# Транзакции начинаются с BEGIN IMMEDIATE, чтобы конкурирующие записи
+# ждали busy_timeout, а не падали при повышении блокировки.
+SQLITE_READ_PRAGMAS = (
+    'PRAGMA cache_size = -65536;'
+    'PRAGMA mmap_size = 268435456;'
+    'PRAGMA temp_store = MEMORY;'
+    'PRAGMA busy_timeout = 5000;'
+)
+if os.getenv('DB_PROFILE') == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': (
+                'PRAGMA journal_mode = WAL;'
+                'PRAGMA synchronous = NORMAL;'
+                + SQLITE_READ_PRAGMAS
+            ),
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+# Реплики только для чтения: пути к копиям базы через запятую в переменной
+# окружения DB_REPLICAS. Безопасные запросы к API читают из случайной
+# реплики; после своей записи пользователь DATABASE_REPLICA_STICKY_SECONDS
+# секунд читает из основной базы.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', '').split(','))
+):
+    DATABASE_REPLICAS.append(f'replica_{number}')
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': name.strip(),
+        'CONN_MAX_AGE': DATABASES['default'].get('CONN_MAX_AGE', 0),
+        'OPTIONS': {
+            'init_command': 'PRAGMA query_only = ON;' + SQLITE_READ_PRAGMAS,
+        },
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ('api.routers.ReplicaRouter',)
+DATABASE_REPLICA_STICKY_SECONDS = 5
+
+# Версии кэша ответов, отметки чтения из основной базы и версии учетных
+# данных хранятся в самом кэше, поэтому он общий для всех процессов:
+# по умолчанию каталог на хосте (CACHE_LOCATION), для нескольких хостов
+# замените бэкенд на Memcached или Redis. Кэш в памяти процесса
+# (LocMemCache) не подходит: сброс версии в одном процессе не увидят другие.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'yatube_cache')
+        ),
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+API_CACHE_TIMEOUT = 60 * 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -92,6 +159,9 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -100,14 +170,80 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend'
     ],
+    # Ограничение записи постов, комментариев и подписок (api.throttling).
+    'DEFAULT_THROTTLE_RATES': {
+        'user_write': '60/min',
+        'ip_write': '300/min',
+    },
+}
+
+# Корзины ограничения записи: файл, общий для процессов на хосте
+# (например, в /dev/shm), и число ячеек таблицы в нем.
+THROTTLE_STATE_PATH = os.getenv(
+    'THROTTLE_STATE_PATH',
+    os.path.join(tempfile.gettempdir(), 'yatube_throttle.state')
+)
+THROTTLE_SLOTS = 65536
+
+# Кэш пользователей JWT-аутентификации в памяти процесса. Запись
+# сбрасывается версией из общего кэша; TTL ограничивает задержку отзыва,
+# только если кэш версий недоступен другим процессам.
+AUTH_USER_CACHE_SIZE = 10000
+AUTH_USER_CACHE_TTL = 60
+
+DJOSER = {
+    'SERIALIZERS': {
+        'user': 'api.serializers.UserSerializer',
+        'current_user': 'api.serializers.UserSerializer',
+    },
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+
+# Пакетное создание постов: максимум элементов в запросе и размер
+# одной вставки bulk_create.
+POSTS_BULK_MAX_ITEMS = 10000
+POSTS_BULK_BATCH_SIZE = 500
+
+# Максимум авторов в одном запросе пакетной подписки или отписки.
+FOLLOW_BATCH_MAX_ITEMS = 100
+
+# Обработка изображений постов: варианты (ширина и высота не больше
+# заданных), качество JPEG и число фоновых потоков (0 — в запросе).
+POST_IMAGE_VARIANTS = {
+    'thumbnail': (320, 320),
+    'medium': (1280, 1280),
+}
+POST_IMAGE_QUALITY = 85
+POST_IMAGE_WORKERS = 2
+# Загрузка изображений по частям: предельный размер файла и размер блока,
+# которым тело запроса читается и пишется на диск.
+POST_IMAGE_MAX_SIZE = 20 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Незавершенные загрузки старше срока удаляет команда expire_uploads.
+UPLOAD_EXPIRE_SECONDS = 24 * 60 * 60
+
+# Персональная лента: сколько последних постов автора попадает в ленту
+# при подписке и сколько записей вставляется за один запрос при публикации.
+FEED_BACKFILL_SIZE = 200
+FEED_FAN_OUT_BATCH_SIZE = 1000
+# Посты авторов, у которых подписчиков не меньше порога, не раздаются
+# в ленты, а подмешиваются при чтении ленты.
+FEED_CELEBRITY_FOLLOWERS = 10000
+
+# Очередь записи: посты и комментарии из запросов создает один поток
+# пакетами в одной транзакции (WRITE_QUEUE_ENABLED=1 в окружении).
+# Пакет собирается WRITE_QUEUE_INTERVAL секунд или до MAX_BATCH записей,
+# запрос ждет его фиксации не дольше WRITE_QUEUE_TIMEOUT секунд.
+WRITE_QUEUE_ENABLED = os.getenv('WRITE_QUEUE_ENABLED') == '1'
+WRITE_QUEUE_INTERVAL = 0.005
+WRITE_QUEUE_MAX_BATCH = 100
+WRITE_QUEUE_TIMEOUT = 30